@@ -4,15 +4,32 @@ AI Commit Generator - Automatically generate conventional commit messages using
 This package provides an AI-powered Git commit message generator that analyzes
 staged changes and creates professional, conventional commit messages using
 various AI providers (Groq, OpenRouter, Cohere).
+
+The public classes are imported on first access, so running a submodule
+(e.g. the Git hook's fast path) does not import the whole package.
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "1.1.0"
 __author__ = "AI Commit Generator Team"
 __email__ = "team@ai-commit-generator.dev"
 
-from .api_clients import APIClient, CohereClient, GroqClient, OpenRouterClient
-from .config import Config
-from .core import CommitGenerator
+# Public names and the submodules defining them
+_LAZY_IMPORTS = {
+    "APIClient": "api_clients",
+    "GroqClient": "api_clients",
+    "OpenRouterClient": "api_clients",
+    "CohereClient": "api_clients",
+    "Config": "config",
+    "CommitGenerator": "core",
+}
+
+if TYPE_CHECKING:
+    from .api_clients import APIClient, CohereClient, GroqClient, OpenRouterClient
+    from .config import Config
+    from .core import CommitGenerator
 
 __all__ = [
     "CommitGenerator",
@@ -23,3 +40,17 @@ __all__ = [
     "CohereClient",
     "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public classes on first access."""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -6,39 +6,247 @@ This module provides a unified interface for interacting with different AI provi
 - Cohere: Enterprise-focused AI with Command models
 
 All clients implement the same APIClient interface and handle:
-- HTTP requests with retries and error handling
+- HTTP requests with retries and error handling (see retry.py)
 - Provider-specific API formats and authentication
-- Rate limiting and timeout management
+- Rate limiting (see ratelimit.py), API key pools (see keypool.py) and
+  timeout management
 - Response parsing and validation
 
+HTTP sessions are pooled per provider and base URL for the lifetime of the
+process, so repeated generations reuse open keep-alive connections instead of
+paying for DNS, TCP and TLS setup on every request. ``requests`` itself is
+imported with the first session, so commits answered from the message cache
+never pay for importing the HTTP stack.
+
+With ``stream=True`` responses are streamed (server-sent events for Groq and
+OpenRouter, JSON lines for Cohere) and reading stops as soon as a ``stop``
+predicate is satisfied, e.g. once the first line of the message is complete,
+so the model's trailing explanations are never waited for.
+
 Example:
     client = create_client("groq", api_key, "llama3-70b-8192")
     message = client.generate_commit_message(prompt)
 """
 
+import contextlib
+import json
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Tuple, Type
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from .keypool import AUTH_FAILURE_CODES, KeyPool, PooledKey
+from .ratelimit import RateLimiter
+from .retry import Attempt, RetryPolicy, call_with_retry, parse_retry_after
+from .tokens import estimate_tokens
+from .validation import is_filler
+
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_SIZE = 10
+
+# Timeout of a single HTTP request in seconds
+REQUEST_TIMEOUT = 30
+
+# Characters beyond max_chars read before a streamed first line is cut off;
+# covers quotes and other characters removed when the message is cleaned
+STREAM_SLACK_CHARS = 8
+
+# Status codes worth retrying
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Shared sessions keyed by (provider, base_url, pool_size)
+_sessions: Dict[Tuple[str, str, int], "requests.Session"] = {}
+_sessions_lock = threading.Lock()
+
 
 class APIError(Exception):
     """API-related errors."""
 
-    pass
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        retryable: bool = False,
+    ):
+        """Initialize the error.
+
+        Args:
+            message: Error message
+            status_code: HTTP status code of the failed response, if any
+            retry_after: Seconds the provider asked to wait before retrying
+            retryable: Whether retrying the request may succeed
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def status_error(
+    status: int, retry_after: Optional[float] = None, detail: str = ""
+) -> APIError:
+    """Build the error for a failed HTTP response.
+
+    Args:
+        status: HTTP status code
+        retry_after: Parsed ``Retry-After`` header, if any
+        detail: Description of the failure for unexpected status codes
+
+    Returns:
+        API error, marked retryable for rate limits and server errors
+    """
+    if status == 401:
+        message = "Invalid API key"
+    elif status == 429:
+        message = "Rate limit exceeded. Please try again later"
+    elif status >= 500:
+        message = f"API server error: {status}"
+    else:
+        message = f"API request failed: {detail or status}"
+    return APIError(message, status, retry_after, status in RETRYABLE_STATUS_CODES)
+
+
+def first_line_stop(max_chars: Optional[int] = None) -> Callable[[str], bool]:
+    """Build a stop predicate that ends a stream after the first line.
+
+    Only the first line of an answer is used, so the rest need not be read.
+    Blank lines, code fences and preambles ending with a colon do not count
+    as the first line, so the message after them still arrives for repair.
+
+    Args:
+        max_chars: Also stop once the first line is this long (plus some
+            slack for characters removed by cleaning)
+
+    Returns:
+        Predicate on the text received so far
+    """
+
+    def stop(text: str) -> bool:
+        lines = text.split("\n")
+        while len(lines) > 1 and is_filler(lines[0]):
+            del lines[0]
+        if len(lines) > 1:
+            return True
+        line = lines[0].lstrip()
+        return max_chars is not None and len(line) > max_chars + STREAM_SLACK_CHARS
+
+    return stop
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check if a failed request is worth retrying."""
+    return isinstance(error, APIError) and error.retryable
+
+
+def request_timeout(remaining: Optional[float]) -> float:
+    """Get the timeout of one HTTP request within a retry deadline.
+
+    Args:
+        remaining: Seconds left before the retry deadline, or None
+
+    Returns:
+        Timeout in seconds
+
+    Raises:
+        APIError: If the deadline has passed
+    """
+    if remaining is None:
+        return REQUEST_TIMEOUT
+    if remaining <= 0:
+        raise APIError("API request deadline exceeded")
+    return min(REQUEST_TIMEOUT, remaining)
+
+
+def throttled_timeout(waited: Optional[float], timeout: float) -> float:
+    """Get the request timeout left after waiting for rate-limit quota.
+
+    Args:
+        waited: Seconds waited for quota, or None if none was available in
+            time
+        timeout: Request timeout before waiting
+
+    Returns:
+        Remaining timeout in seconds
+
+    Raises:
+        APIError: If the quota did not allow sending within the timeout
+    """
+    if waited is None:
+        raise APIError("Rate limit quota exhausted for the time budget", 429)
+    return timeout - waited
+
+
+def get_session(
+    provider: str, base_url: str, pool_size: int = DEFAULT_POOL_SIZE
+) -> "requests.Session":
+    """Get the shared HTTP session for a provider endpoint.
+
+    Sessions are created on first use and kept for the lifetime of the
+    process. Connections in the pool stay open (keep-alive) between
+    requests, and the session is safe to share between threads.
+
+    Args:
+        provider: Provider name
+        base_url: Provider API base URL
+        pool_size: Maximum number of connections kept open to the host
+
+    Returns:
+        Pooled session
+    """
+    # Imported here: requests is slow to import and not needed for cached
+    # messages
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    key = (provider, base_url, pool_size)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            logger.debug(f"Creating HTTP session pool for {provider} ({base_url})")
+            session = requests.Session()
+            # Retries are handled by call_with_retry, not by urllib3
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size, max_retries=0
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    """Close all shared HTTP sessions and their open connections."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
 
 
 class APIClient(ABC):
     """Abstract base class for AI API clients."""
 
+    provider = ""
+    base_url = ""
+
     def __init__(
-        self, api_key: str, model: str, max_retries: int = 3, retry_delay: int = 1
+        self,
+        api_key: str,
+        model: str,
+        max_retries: int = 3,
+        retry_delay: float = 1,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retry_delay: float = 10,
+        deadline: Optional[float] = 20,
+        on_attempt: Optional[Callable[[Attempt], None]] = None,
+        stream: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        key_pool: Optional[KeyPool] = None,
     ):
         """Initialize API client.
 
@@ -46,31 +254,51 @@ class APIClient(ABC):
             api_key: API key for the provider
             model: Model name to use
             max_retries: Maximum number of retries
-            retry_delay: Delay between retries in seconds
+            retry_delay: Base backoff delay between retries in seconds
+            pool_size: Maximum number of pooled connections to the provider
+            max_retry_delay: Upper bound of a single backoff delay in seconds
+            deadline: Total seconds allowed for a request including retries
+            on_attempt: Callback receiving every request attempt
+            stream: Stream responses so reading can stop early
+            rate_limiter: Quota shared by the clients of the same API key,
+                or None to send without waiting
+            key_pool: Keys to spread requests over, each with its own rate
+                limiter; replaces ``api_key`` and ``rate_limiter`` for
+                sending
         """
         self.api_key = api_key
         self.model = model
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-
-        # Configure session with retries
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=max_retries,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST"],
-            backoff_factor=retry_delay,
+        self.retry_policy = RetryPolicy(
+            max_retries=max_retries,
+            base_delay=retry_delay,
+            max_delay=max_retry_delay,
+            deadline=deadline,
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-
-    @abstractmethod
-    def generate_commit_message(self, prompt: str) -> str:
+        self.on_attempt = on_attempt or self._log_attempt
+        self.pool_size = pool_size
+        self.stream = stream
+        self.key_pool = key_pool or KeyPool([PooledKey(api_key, rate_limiter)])
+
+    @property
+    def session(self) -> "requests.Session":
+        """Get the process-wide connection pool for this endpoint."""
+        return get_session(self.provider, self.base_url, self.pool_size)
+
+    def generate_commit_message(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
         """Generate a commit message using the AI API.
 
         Args:
             prompt: The prompt to send to the AI
+            timeout: Seconds the caller can wait, including retries
+            stop: When streaming, stop reading once this returns True for the
+                text received so far
 
         Returns:
             Generated commit message
@@ -78,17 +306,252 @@ class APIClient(ABC):
         Raises:
             APIError: If the API call fails
         """
+        url, headers, data = self.build_request(prompt)
+        if self.stream:
+            return call_with_retry(
+                lambda remaining: self._stream(url, headers, data, remaining, stop),
+                self.retry_policy.within(timeout),
+                _is_retryable,
+                on_attempt=self.on_attempt,
+            )
+        return self.parse_response(self._make_request(url, headers, data, timeout))
+
+    @abstractmethod
+    def build_request(self, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build the provider request for a prompt.
+
+        Args:
+            prompt: The prompt to send to the AI
+
+        Returns:
+            Endpoint URL, request headers and JSON payload
+        """
+        pass
+
+    @abstractmethod
+    def parse_response(self, response: Dict[str, Any]) -> str:
+        """Extract the generated message from a provider response.
+
+        Args:
+            response: Response JSON data
+
+        Returns:
+            Generated commit message
+
+        Raises:
+            APIError: If the response has an unexpected format
+        """
         pass
 
+    def parse_stream_line(self, line: str) -> Tuple[str, bool]:
+        """Parse one line of a streamed response.
+
+        The default handles OpenAI-compatible server-sent events.
+
+        Args:
+            line: Line of the response body
+
+        Returns:
+            Text received in the line and whether the stream is finished
+
+        Raises:
+            APIError: If the line is malformed or reports an error
+        """
+        if not line.startswith("data:"):
+            # Blank separators, comments and other SSE fields
+            return "", False
+        payload = line[len("data:") :].strip()
+        if payload == "[DONE]":
+            return "", True
+
+        try:
+            event = json.loads(payload)
+        except ValueError as e:
+            raise APIError(f"Invalid stream event: {e}")
+        if isinstance(event, dict) and "error" in event:
+            raise APIError(f"API stream error: {event['error']}")
+        try:
+            choice = event["choices"][0]
+        except (KeyError, IndexError, TypeError):
+            return "", False
+        text = (choice.get("delta") or {}).get("content") or ""
+        return text, choice.get("finish_reason") is not None
+
+    def feed_stream(
+        self, text: str, line: str, stop: Optional[Callable[[str], bool]]
+    ) -> Tuple[str, bool]:
+        """Add a streamed line to the text received so far.
+
+        Args:
+            text: Text received so far
+            line: Next line of the response body
+            stop: Stop predicate on the text received so far
+
+        Returns:
+            Updated text and whether reading should stop
+        """
+        delta, finished = self.parse_stream_line(line)
+        text += delta
+        return text, finished or bool(stop and delta and stop(text))
+
+    def streamed_message(self, text: str) -> str:
+        """Get the message from a complete or stopped stream.
+
+        Raises:
+            APIError: If nothing was received
+        """
+        message = text.strip()
+        if not message:
+            raise APIError(f"Empty response from {self.provider} API")
+        return message
+
+    def request_tokens(self, data: Dict[str, Any]) -> int:
+        """Estimate the tokens a request uses, including the answer.
+
+        Args:
+            data: Request payload
+
+        Returns:
+            Estimated token count
+        """
+        max_tokens = int(data.get("max_tokens", 0))
+        return estimate_tokens(json.dumps(data), self.model) + max_tokens
+
+    def authorize(self, headers: Dict[str, str], api_key: str) -> Dict[str, str]:
+        """Get request headers authenticating with a key of the pool.
+
+        Args:
+            headers: Request headers built by ``build_request``
+            api_key: API key to send
+
+        Returns:
+            Headers with the key's credentials
+        """
+        return {**headers, "Authorization": f"Bearer {api_key}"}
+
+    def observe_response(
+        self,
+        key: PooledKey,
+        status: int,
+        headers: Mapping[str, str],
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Update the key's health and rate limiter from a response.
+
+        Args:
+            key: Key the request was made with
+            status: HTTP status code
+            headers: Response headers
+            retry_after: Parsed ``Retry-After`` header, if any
+        """
+        if key.rate_limiter is not None:
+            key.rate_limiter.observe(headers)
+            if status == 429:
+                key.rate_limiter.penalize(retry_after)
+        self.key_pool.report(key, status, retry_after)
+
+    def response_error(
+        self, status: int, retry_after: Optional[float], detail: str
+    ) -> APIError:
+        """Build the error for a failed response.
+
+        A rejected key is retried with another key of the pool, if any is
+        healthy.
+
+        Args:
+            status: HTTP status code
+            retry_after: Parsed ``Retry-After`` header, if any
+            detail: Description of the failure
+
+        Returns:
+            API error
+        """
+        error = status_error(status, retry_after, detail)
+        if status in AUTH_FAILURE_CODES and len(self.key_pool) > 1:
+            error.retryable = self.key_pool.has_healthy()
+        return error
+
+    def _throttle(self, key: PooledKey, data: Dict[str, Any], timeout: float) -> float:
+        """Wait until the request fits the key's rate limits.
+
+        Args:
+            key: Key the request is made with
+            data: Request payload
+            timeout: Request timeout in seconds
+
+        Returns:
+            Request timeout left after waiting
+
+        Raises:
+            APIError: If the quota does not allow sending within the timeout
+        """
+        if key.rate_limiter is None:
+            return timeout
+        waited = key.rate_limiter.acquire(self.request_tokens(data), timeout)
+        return throttled_timeout(waited, timeout)
+
+    def _log_attempt(self, attempt: Attempt) -> None:
+        """Log a request attempt (the default ``on_attempt`` callback)."""
+        if attempt.succeeded:
+            logger.debug(
+                f"{self.provider} request succeeded on attempt {attempt.number} "
+                f"in {attempt.elapsed:.2f}s"
+            )
+        elif attempt.delay is not None:
+            logger.warning(
+                f"{self.provider} attempt {attempt.number} failed: {attempt.error}; "
+                f"retrying in {attempt.delay:.1f}s"
+            )
+        else:
+            logger.warning(
+                f"{self.provider} attempt {attempt.number} failed: {attempt.error}"
+            )
+
     def _make_request(
-        self, url: str, headers: Dict[str, str], data: Dict[str, Any]
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Make HTTP request with retries and error handling.
+
+        Timeouts, connection errors, rate limits and server errors are
+        retried within the client's retry policy.
+
+        Args:
+            url: API endpoint URL
+            headers: Request headers
+            data: Request payload
+            timeout: Seconds the caller can wait, including retries
+
+        Returns:
+            Response JSON data
+
+        Raises:
+            APIError: If the request fails
+        """
+        return call_with_retry(
+            lambda remaining: self._send(url, headers, data, remaining),
+            self.retry_policy.within(timeout),
+            _is_retryable,
+            on_attempt=self.on_attempt,
+        )
+
+    def _send(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        remaining: Optional[float] = None,
     ) -> Dict[str, Any]:
-        """Make HTTP request with error handling.
+        """Make a single HTTP request.
 
         Args:
             url: API endpoint URL
             headers: Request headers
             data: Request payload
+            remaining: Seconds left before the retry deadline
 
         Returns:
             Response JSON data
@@ -96,45 +559,130 @@ class APIClient(ABC):
         Raises:
             APIError: If the request fails
         """
+        key = self.key_pool.choose()
+        timeout = self._throttle(key, data, request_timeout(remaining))
+        response = self._post(key, url, headers, data, timeout)
+        try:
+            result: Dict[str, Any] = response.json()
+        except ValueError as e:
+            raise APIError(f"Invalid JSON response: {e}")
+        return result
+
+    def _stream(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        remaining: Optional[float] = None,
+        stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """Make a single streaming HTTP request, stopping early if possible.
+
+        Stopping early closes the connection instead of returning it to the
+        pool, which is cheaper than waiting for the rest of the answer.
+
+        Args:
+            url: API endpoint URL
+            headers: Request headers
+            data: Request payload
+            remaining: Seconds left before the retry deadline
+            stop: Stop predicate on the text received so far
+
+        Returns:
+            Text received
+
+        Raises:
+            APIError: If the request fails
+        """
+        import requests
+
+        key = self.key_pool.choose()
+        timeout = self._throttle(key, data, request_timeout(remaining))
+        started = time.monotonic()
+        response = self._post(key, url, headers, data, timeout, stream=True)
+        text = ""
+        with contextlib.closing(response):
+            # Event streams rarely declare a charset; they are always UTF-8
+            response.encoding = "utf-8"
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    text, done = self.feed_stream(text, line, stop)
+                    if done:
+                        break
+                    if time.monotonic() - started > timeout:
+                        raise APIError("API request timed out", retryable=True)
+            except requests.exceptions.RequestException as e:
+                raise APIError(f"Network error: {e}", retryable=True)
+        return self.streamed_message(text)
+
+    def _post(
+        self,
+        key: PooledKey,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        timeout: float,
+        stream: bool = False,
+    ) -> "requests.Response":
+        """Send a POST request and check its status.
+
+        Args:
+            key: Key to authenticate with
+            url: API endpoint URL
+            headers: Request headers
+            data: Request payload
+            timeout: Seconds to wait for the server
+            stream: Leave the body unread for streaming
+
+        Returns:
+            Successful response
+
+        Raises:
+            APIError: If the request fails
+        """
+        import requests
+
         try:
             logger.debug(f"Making API request to {url}")
             response = self.session.post(
                 url,
-                headers=headers,
+                headers=self.authorize(headers, key.key),
                 json=data,
-                timeout=30,
+                timeout=timeout,
+                stream=stream,
                 verify=True  # Ensure SSL verification
             )
             response.raise_for_status()
-            return response.json()
+            self.observe_response(key, response.status_code, response.headers)
+            return response
         except requests.exceptions.SSLError:
             raise APIError("SSL verification failed")
         except requests.exceptions.Timeout:
-            raise APIError("API request timed out")
+            raise APIError("API request timed out", retryable=True)
         except requests.exceptions.HTTPError as e:
-            if response.status_code == 401:
-                raise APIError("Invalid API key")
-            elif response.status_code == 429:
-                raise APIError("Rate limit exceeded. Please try again later")
-            elif response.status_code >= 500:
-                raise APIError(f"API server error: {response.status_code}")
-            else:
-                raise APIError(f"API request failed: {e}")
+            response.close()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.observe_response(
+                key, response.status_code, response.headers, retry_after
+            )
+            raise self.response_error(response.status_code, retry_after, str(e))
+        except requests.exceptions.ConnectionError as e:
+            raise APIError(f"Network error: {e}", retryable=True)
         except requests.exceptions.RequestException as e:
             raise APIError(f"Network error: {e}")
-        except ValueError as e:
-            raise APIError(f"Invalid JSON response: {e}")
 
 
 class GroqClient(APIClient):
     """Groq API client."""
 
-    def __init__(self, api_key: str, model: str = "llama3-70b-8192", **kwargs):
+    provider = "groq"
+    base_url = "https://api.groq.com/openai/v1"
+
+    def __init__(self, api_key: str, model: str = "llama3-70b-8192", **kwargs: Any):
         super().__init__(api_key, model, **kwargs)
-        self.base_url = "https://api.groq.com/openai/v1"
 
-    def generate_commit_message(self, prompt: str) -> str:
-        """Generate commit message using Groq API."""
+    def build_request(self, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build a Groq API request."""
         url = f"{self.base_url}/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -145,13 +693,14 @@ class GroqClient(APIClient):
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 100,
             "temperature": 0.3,
-            "stream": False,
+            "stream": self.stream,
         }
+        return url, headers, data
 
-        response = self._make_request(url, headers, data)
-
+    def parse_response(self, response: Dict[str, Any]) -> str:
+        """Extract the message from a Groq API response."""
         try:
-            message = response["choices"][0]["message"]["content"].strip()
+            message: str = response["choices"][0]["message"]["content"].strip()
             if not message:
                 raise APIError("Empty response from Groq API")
             return message
@@ -163,14 +712,19 @@ class GroqClient(APIClient):
 class OpenRouterClient(APIClient):
     """OpenRouter API client."""
 
+    provider = "openrouter"
+    base_url = "https://openrouter.ai/api/v1"
+
     def __init__(
-        self, api_key: str, model: str = "meta-llama/llama-3.1-70b-instruct", **kwargs
+        self,
+        api_key: str,
+        model: str = "meta-llama/llama-3.1-70b-instruct",
+        **kwargs: Any,
     ):
         super().__init__(api_key, model, **kwargs)
-        self.base_url = "https://openrouter.ai/api/v1"
 
-    def generate_commit_message(self, prompt: str) -> str:
-        """Generate commit message using OpenRouter API."""
+    def build_request(self, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build a OpenRouter API request."""
         url = f"{self.base_url}/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -183,12 +737,14 @@ class OpenRouterClient(APIClient):
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 100,
             "temperature": 0.3,
+            "stream": self.stream,
         }
+        return url, headers, data
 
-        response = self._make_request(url, headers, data)
-
+    def parse_response(self, response: Dict[str, Any]) -> str:
+        """Extract the message from a OpenRouter API response."""
         try:
-            message = response["choices"][0]["message"]["content"].strip()
+            message: str = response["choices"][0]["message"]["content"].strip()
             if not message:
                 raise APIError("Empty response from OpenRouter API")
             return message
@@ -200,12 +756,14 @@ class OpenRouterClient(APIClient):
 class CohereClient(APIClient):
     """Cohere API client."""
 
-    def __init__(self, api_key: str, model: str = "command-r-plus", **kwargs):
+    provider = "cohere"
+    base_url = "https://api.cohere.ai/v1"
+
+    def __init__(self, api_key: str, model: str = "command-r-plus", **kwargs: Any):
         super().__init__(api_key, model, **kwargs)
-        self.base_url = "https://api.cohere.ai/v1"
 
-    def generate_commit_message(self, prompt: str) -> str:
-        """Generate commit message using Cohere API."""
+    def build_request(self, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build a Cohere API request."""
         url = f"{self.base_url}/chat"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -216,12 +774,14 @@ class CohereClient(APIClient):
             "message": prompt,
             "max_tokens": 100,
             "temperature": 0.3,
+            "stream": self.stream,
         }
+        return url, headers, data
 
-        response = self._make_request(url, headers, data)
-
+    def parse_response(self, response: Dict[str, Any]) -> str:
+        """Extract the message from a Cohere API response."""
         try:
-            message = response["text"].strip()
+            message: str = response["text"].strip()
             if not message:
                 raise APIError("Empty response from Cohere API")
             return message
@@ -229,8 +789,21 @@ class CohereClient(APIClient):
             logger.error(f"Unexpected Cohere API response format: {response}")
             raise APIError(f"Invalid response format from Cohere API: {e}")
 
+    def parse_stream_line(self, line: str) -> Tuple[str, bool]:
+        """Parse one line of Cohere's streamed chat (one JSON event per line)."""
+        if not line.strip():
+            return "", False
+        try:
+            event = json.loads(line)
+        except ValueError as e:
+            raise APIError(f"Invalid stream event: {e}")
+        event_type = event.get("event_type") if isinstance(event, dict) else None
+        if event_type == "text-generation":
+            return event.get("text") or "", False
+        return "", event_type == "stream-end"
+
 
-def create_client(provider: str, api_key: str, model: str, **kwargs) -> APIClient:
+def create_client(provider: str, api_key: str, model: str, **kwargs: Any) -> APIClient:
     """Factory function to create API client based on provider.
 
     Args:
@@ -245,7 +818,7 @@ def create_client(provider: str, api_key: str, model: str, **kwargs) -> APIClien
     Raises:
         ValueError: If provider is not supported
     """
-    clients = {
+    clients: Dict[str, Type[APIClient]] = {
         "groq": GroqClient,
         "openrouter": OpenRouterClient,
         "cohere": CohereClient,
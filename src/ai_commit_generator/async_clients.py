@@ -0,0 +1,364 @@
+"""Asynchronous AI API clients.
+
+The blocking clients in ``api_clients.py`` need one thread per request in
+flight. The async clients send the same requests with ``httpx`` on an event
+loop, so many generations (summaries, hedged requests, batch and history
+rewriting) run concurrently on a single thread.
+
+Each async client wraps a blocking client of the same provider and reuses its
+request building, response parsing and retry policy; only the transport
+differs. Connections are pooled per event loop, provider and base URL, and
+every client bounds its own number of requests in flight.
+
+``httpx`` is an optional dependency: ``pip install smart-commits-ai[async]``.
+
+Example:
+    client = create_async_client("groq", api_key, "llama3-70b-8192")
+    messages = await asyncio.gather(
+        *(client.generate_commit_message(prompt) for prompt in prompts)
+    )
+"""
+
+import asyncio
+import functools
+import logging
+import time
+import weakref
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    MutableMapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .api_clients import (
+    APIClient,
+    APIError,
+    create_client,
+    request_timeout,
+    throttled_timeout,
+)
+from .keypool import PooledKey
+from .retry import async_call_with_retry, parse_retry_after
+
+try:
+    import httpx
+
+    HAS_HTTPX = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAS_HTTPX = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+T = TypeVar("T")
+
+# Shared async clients per event loop, keyed by (provider, base_url, pool_size)
+_pools: MutableMapping[asyncio.AbstractEventLoop, Dict[Tuple[str, str, int], Any]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _require_httpx() -> None:
+    """Fail with an installation hint when httpx is missing."""
+    if not HAS_HTTPX:
+        raise ImportError(
+            "Async clients require httpx. "
+            "Install it with: pip install smart-commits-ai[async]"
+        )
+
+
+def get_async_session(provider: str, base_url: str, pool_size: int) -> Any:
+    """Get the shared ``httpx.AsyncClient`` for a provider on the running loop.
+
+    Args:
+        provider: Provider name
+        base_url: Provider API base URL
+        pool_size: Maximum number of connections kept open to the host
+
+    Returns:
+        Pooled async HTTP client
+    """
+    _require_httpx()
+    loop = asyncio.get_running_loop()
+    sessions = _pools.setdefault(loop, {})
+    key = (provider, base_url, pool_size)
+    session = sessions.get(key)
+    if session is None or session.is_closed:
+        logger.debug(f"Creating async HTTP pool for {provider} ({base_url})")
+        session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            verify=True,  # Ensure SSL verification
+        )
+        sessions[key] = session
+    return session
+
+
+async def aclose_sessions() -> None:
+    """Close the shared async HTTP clients of the running event loop."""
+    sessions = _pools.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.aclose()
+
+
+class AsyncAPIClient:
+    """Async counterpart of an ``APIClient``."""
+
+    def __init__(
+        self, client: APIClient, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ):
+        """Initialize the async client.
+
+        Args:
+            client: Blocking client whose requests, parsing and retry policy
+                are reused
+            max_concurrency: Maximum number of requests in flight
+        """
+        _require_httpx()
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphores: MutableMapping[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    @property
+    def provider(self) -> str:
+        """Get the provider name."""
+        return self.client.provider
+
+    @property
+    def model(self) -> str:
+        """Get the model name."""
+        return self.client.model
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency limit for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def generate_commit_message(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """Generate a commit message using the AI API.
+
+        Args:
+            prompt: The prompt to send to the AI
+            timeout: Seconds the caller can wait, including retries
+            stop: When streaming, stop reading once this returns True for the
+                text received so far
+
+        Returns:
+            Generated commit message
+
+        Raises:
+            APIError: If the API call fails
+        """
+        url, headers, data = self.client.build_request(prompt)
+        if self.client.stream:
+            stream = functools.partial(self._stream, url, headers, data, stop=stop)
+            return await self._with_retry(stream, timeout)
+        send = functools.partial(self._send, url, headers, data)
+        return self.client.parse_response(await self._with_retry(send, timeout))
+
+    async def _with_retry(
+        self, func: Callable[[Optional[float]], Awaitable[T]], timeout: Optional[float]
+    ) -> T:
+        """Await one request with retries, within the concurrency limit.
+
+        Args:
+            func: Coroutine function taking the seconds left before the deadline
+            timeout: Seconds the caller can wait, including retries
+
+        Returns:
+            Result of the successful attempt
+
+        Raises:
+            APIError: If the API call fails
+        """
+        async with self._semaphore():
+            return await async_call_with_retry(
+                func,
+                self.client.retry_policy.within(timeout),
+                lambda e: isinstance(e, APIError) and e.retryable,
+                on_attempt=self.client.on_attempt,
+            )
+
+    async def _send(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        remaining: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Make a single HTTP request.
+
+        Args:
+            url: API endpoint URL
+            headers: Request headers
+            data: Request payload
+            remaining: Seconds left before the retry deadline
+
+        Returns:
+            Response JSON data
+
+        Raises:
+            APIError: If the request fails
+        """
+        key = self.client.key_pool.choose()
+        timeout = await self._throttle(key, data, request_timeout(remaining))
+        session = self._session()
+        try:
+            logger.debug(f"Making async API request to {url}")
+            response = await session.post(
+                url,
+                headers=self.client.authorize(headers, key.key),
+                json=data,
+                timeout=timeout,
+            )
+        except httpx.TimeoutException:
+            raise APIError("API request timed out", retryable=True)
+        except httpx.TransportError as e:
+            raise APIError(f"Network error: {e}", retryable=True)
+        except httpx.HTTPError as e:
+            raise APIError(f"Network error: {e}")
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        self.client.observe_response(
+            key, response.status_code, response.headers, retry_after
+        )
+        if response.is_error:
+            raise self.client.response_error(
+                response.status_code, retry_after, response.reason_phrase
+            )
+        try:
+            result: Dict[str, Any] = response.json()
+        except ValueError as e:
+            raise APIError(f"Invalid JSON response: {e}")
+        return result
+
+    async def _stream(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        remaining: Optional[float] = None,
+        stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """Make a single streaming HTTP request, stopping early if possible.
+
+        Args:
+            url: API endpoint URL
+            headers: Request headers
+            data: Request payload
+            remaining: Seconds left before the retry deadline
+            stop: Stop predicate on the text received so far
+
+        Returns:
+            Text received
+
+        Raises:
+            APIError: If the request fails
+        """
+        key = self.client.key_pool.choose()
+        timeout = await self._throttle(key, data, request_timeout(remaining))
+        started = time.monotonic()
+        text = ""
+        try:
+            logger.debug(f"Making async streaming API request to {url}")
+            async with self._session().stream(
+                "POST",
+                url,
+                headers=self.client.authorize(headers, key.key),
+                json=data,
+                timeout=timeout,
+            ) as response:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                self.client.observe_response(
+                    key, response.status_code, response.headers, retry_after
+                )
+                if response.is_error:
+                    raise self.client.response_error(
+                        response.status_code, retry_after, response.reason_phrase
+                    )
+                async for line in response.aiter_lines():
+                    text, done = self.client.feed_stream(text, line, stop)
+                    if done:
+                        break
+                    if time.monotonic() - started > timeout:
+                        raise APIError("API request timed out", retryable=True)
+        except httpx.TimeoutException:
+            raise APIError("API request timed out", retryable=True)
+        except httpx.TransportError as e:
+            raise APIError(f"Network error: {e}", retryable=True)
+        except httpx.HTTPError as e:
+            raise APIError(f"Network error: {e}")
+        return self.client.streamed_message(text)
+
+    async def _throttle(
+        self, key: PooledKey, data: Dict[str, Any], timeout: float
+    ) -> float:
+        """Wait until the request fits the key's rate limits, without blocking.
+
+        Args:
+            key: Key the request is made with
+            data: Request payload
+            timeout: Request timeout in seconds
+
+        Returns:
+            Request timeout left after waiting
+
+        Raises:
+            APIError: If the quota does not allow sending within the timeout
+        """
+        limiter = key.rate_limiter
+        if limiter is None:
+            return timeout
+        waited = await limiter.aacquire(self.client.request_tokens(data), timeout)
+        return throttled_timeout(waited, timeout)
+
+    def _session(self) -> Any:
+        """Get the shared async HTTP client for this provider."""
+        return get_async_session(
+            self.client.provider, self.client.base_url, self.client.pool_size
+        )
+
+
+def create_async_client(
+    provider: str,
+    api_key: str,
+    model: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    **kwargs: Any,
+) -> AsyncAPIClient:
+    """Factory function to create an async API client based on provider.
+
+    Args:
+        provider: Provider name (groq, openrouter, cohere)
+        api_key: API key for the provider
+        model: Model name to use
+        max_concurrency: Maximum number of requests in flight
+        **kwargs: Additional arguments for the client (see ``create_client``)
+
+    Returns:
+        Configured async API client
+
+    Raises:
+        ValueError: If provider is not supported
+        ImportError: If httpx is not installed
+    """
+    client = create_client(provider, api_key, model, **kwargs)
+    return AsyncAPIClient(client, max_concurrency)
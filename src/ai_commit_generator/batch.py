@@ -0,0 +1,150 @@
+"""Batch generation of commit messages.
+
+Generating messages for many repositories (bot commits, dependency update
+pull requests) by spawning the CLI once per repository pays for interpreter
+start-up, configuration loading and new connections every time. A batch runs
+all items in one process through a bounded worker pool: HTTP sessions are
+shared per provider, and generators are reused for diff files.
+
+Inputs are repository directories (their staged changes) or diff files.
+Results are plain dictionaries, ready to be written as JSON Lines.
+
+Example:
+    for result in run_batch(["repos/api", "repos/web", "bump.diff"]):
+        print(json.dumps(result))
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+from .config import Config
+from .core import CommitGenerator
+
+logger = logging.getLogger(__name__)
+
+REPO = "repo"
+DIFF = "diff"
+
+DEFAULT_WORKERS = 8
+
+
+def item_kind(path: Path) -> str:
+    """Get whether a batch input is a repository or a diff file."""
+    return REPO if path.is_dir() else DIFF
+
+
+class BatchRunner:
+    """Generate messages for many inputs through a bounded worker pool."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_WORKERS,
+        config: Optional[Config] = None,
+        use_cache: bool = True,
+    ):
+        """Initialize the runner.
+
+        Args:
+            max_workers: Maximum number of items processed at once
+            config: Configuration used for diff files. If None, loaded from
+                the current repository on first use.
+            use_cache: If False, bypass the message cache
+        """
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self._config = config
+        self._diff_generator: Optional[CommitGenerator] = None
+
+    def _get_diff_generator(self) -> CommitGenerator:
+        """Get the generator shared by all diff file items."""
+        # Built before the pool starts, so no locking is needed
+        if self._diff_generator is None:
+            self._diff_generator = CommitGenerator(
+                self._config or Config(), use_cache=self.use_cache
+            )
+        return self._diff_generator
+
+    def _run_item(self, source: Union[str, Path]) -> Dict[str, Any]:
+        """Generate the message for one input.
+
+        Args:
+            source: Repository directory or diff file
+
+        Returns:
+            Result record
+        """
+        path = Path(source)
+        kind = item_kind(path)
+        result: Dict[str, Any] = {
+            "input": str(source),
+            "type": kind,
+            "ok": False,
+            "message": None,
+            "provider": None,
+            "model": None,
+            "seconds": None,
+            "error": None,
+        }
+
+        start = time.monotonic()
+        try:
+            if kind == REPO:
+                generator = CommitGenerator(
+                    Config(repo_root=path.resolve()), use_cache=self.use_cache
+                )
+                result["provider"] = generator.config.provider
+                result["model"] = generator.config.model
+                message = generator.generate_commit_message()
+            else:
+                generator = self._get_diff_generator()
+                result["provider"] = generator.config.provider
+                result["model"] = generator.config.model
+                diff = path.read_text(encoding="utf-8", errors="replace")
+                message = generator.generate_from_diff(diff)
+            result["message"] = message
+            result["ok"] = True
+        except Exception as e:
+            # One broken item must not stop the rest of the batch
+            logger.warning(f"Batch item {source} failed: {e}", exc_info=True)
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["seconds"] = round(time.monotonic() - start, 3)
+        return result
+
+    def run(self, sources: Sequence[Union[str, Path]]) -> Iterator[Dict[str, Any]]:
+        """Generate messages for all inputs.
+
+        Args:
+            sources: Repository directories and diff files
+
+        Yields:
+            One result record per input, in input order
+        """
+        if any(item_kind(Path(source)) == DIFF for source in sources):
+            self._get_diff_generator()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            yield from pool.map(self._run_item, sources)
+
+
+def run_batch(
+    sources: Sequence[Union[str, Path]],
+    max_workers: int = DEFAULT_WORKERS,
+    config: Optional[Config] = None,
+    use_cache: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Generate messages for many repositories or diff files.
+
+    Args:
+        sources: Repository directories (staged changes) and diff files
+        max_workers: Maximum number of items processed at once
+        config: Configuration used for diff files
+        use_cache: If False, bypass the message cache
+
+    Yields:
+        One result record per input, in input order
+    """
+    runner = BatchRunner(max_workers=max_workers, config=config, use_cache=use_cache)
+    yield from runner.run(sources)
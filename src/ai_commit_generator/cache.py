@@ -0,0 +1,194 @@
+"""On-disk cache of generated commit messages.
+
+Amend, re-stage and abort-and-retry workflows regularly ask for a message for
+a staged diff that was already seen. The cache stores generated messages
+under ``.git/`` keyed by a hash of everything that shapes the prompt and the
+model that answers it, so repeat requests return without an API call.
+
+Entries are small JSON files in a content-addressed layout. Entries older
+than the configured age are ignored and removed, and the least recently used
+entries are evicted once the entry limit is exceeded.
+
+Example:
+    cache = MessageCache(repo_root / ".git" / "smart-commits-ai" / "cache")
+    key = MessageCache.make_key(diff, template, "groq", model, types)
+    message = cache.get(key)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key composition or entry format changes
+CACHE_VERSION = 1
+
+
+class MessageCache:
+    """Content-addressed store of generated commit messages."""
+
+    def __init__(
+        self, cache_dir: Path, max_entries: int = 500, max_age_days: float = 30
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_entries: Maximum number of entries kept on disk
+            max_age_days: Age after which entries expire
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+
+    @staticmethod
+    def make_key(
+        diff: str,
+        template: str,
+        provider: str,
+        model: str,
+        commit_types: Sequence[str],
+        **extra: Any,
+    ) -> str:
+        """Build the cache key for a generation request.
+
+        Args:
+            diff: Processed diff sent to the model
+            template: Prompt template
+            provider: AI provider name
+            model: Model name
+            commit_types: Allowed commit types
+            **extra: Other settings that change the prompt (e.g. max_chars)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        material = json.dumps(
+            [CACHE_VERSION, template, provider, model, list(commit_types), extra],
+            sort_keys=True,
+        )
+        digest = hashlib.sha256(material.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(diff.encode("utf-8", errors="surrogateescape"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the file path for a cache key."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached message.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            Cached message, or None on a miss or expired entry
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        message = entry.get("message") if isinstance(entry, dict) else None
+        created = entry.get("created", 0) if isinstance(entry, dict) else 0
+        if (
+            not isinstance(message, str)
+            or not isinstance(created, (int, float))
+            or time.time() - created > self.max_age
+        ):
+            self._remove(path)
+            return None
+
+        # Refresh mtime so eviction drops the least recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        logger.debug(f"Cache hit for {key[:12]}")
+        return message
+
+    def put(self, key: str, message: str) -> None:
+        """Store a message and evict old entries if needed.
+
+        Args:
+            key: Cache key from ``make_key``
+            message: Generated commit message
+        """
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically so concurrent hooks never read a partial entry
+            fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"message": message, "created": time.time()}, f)
+            os.replace(temp_name, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry: {e}")
+            return
+
+        self._evict()
+
+    def _entries(self) -> List[Path]:
+        """List all cache entry files."""
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("??/*.json"))
+
+    def _remove(self, path: Path) -> None:
+        """Remove a cache entry, ignoring races with other processes."""
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Drop expired entries and keep at most ``max_entries``."""
+        now = time.time()
+        entries = []
+        for path in self._entries():
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((mtime, path))
+
+        excess = len(entries) - self.max_entries
+        if excess > 0:
+            entries.sort()
+            for _, path in entries[:excess]:
+                self._remove(path)
+
+    def clear(self) -> int:
+        """Remove all cache entries.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = self._entries()
+        for path in entries:
+            self._remove(path)
+        return len(entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of entries and their total size in bytes."""
+        size = 0
+        entries = self._entries()
+        for path in entries:
+            try:
+                size += path.stat().st_size
+            except OSError:
+                pass
+        return {"entries": len(entries), "size": size}
@@ -1,11 +1,12 @@
 """Command-line interface for AI Commit Generator."""
 
 import functools
+import json
 import os
 import re
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, TextIO, Tuple, TypeVar, cast
 
 import click
 from rich.console import Console
@@ -14,12 +15,20 @@ from rich.text import Text
 
 from . import __version__
 from .api_clients import APIError
+from .batch import DEFAULT_WORKERS, run_batch
+from .cache import MessageCache
 from .config import Config, ConfigError, SecurityError
 from .core import CommitGenerator, GitError
+from .daemon import DaemonError, is_running, socket_path, start_daemon, stop_daemon
 from .git_hook import GitHookManager
+from .history import DEFAULT_WORKERS as HISTORY_WORKERS
+from .history import HistoryRewriter
+from .scope_index import ScopeIndex
 
 console = Console()
 
+F = TypeVar("F", bound=Callable[..., Any])
+
 
 def mask_sensitive_data(data: str, visible_chars: int = 4) -> str:
     """Safely mask sensitive data for display."""
@@ -32,7 +41,7 @@ def mask_sensitive_data(data: str, visible_chars: int = 4) -> str:
     return data[:visible_chars] + "*" * (len(data) - visible_chars)
 
 
-def print_banner():
+def print_banner() -> None:
     """Print the application banner."""
     banner = Text()
     banner.append("🤖 AI Commit Message Generator\n", style="bold cyan")
@@ -43,11 +52,11 @@ def print_banner():
     console.print(Panel(banner, border_style="cyan"))
 
 
-def handle_errors(func):
+def handle_errors(func: F) -> F:
     """Decorator to handle common errors securely."""
 
     @functools.wraps(func)
-    def wrapper(*args, **kwargs):
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
         try:
             return func(*args, **kwargs)
         except SecurityError as e:
@@ -62,6 +71,9 @@ def handle_errors(func):
         except APIError as e:
             console.print(f"[red]❌ API Error:[/red] {e}")
             sys.exit(1)
+        except DaemonError as e:
+            console.print(f"[red]❌ Daemon Error:[/red] {e}")
+            sys.exit(1)
         except Exception as e:
             # Log full error for debugging but show generic message to user
             import logging
@@ -77,12 +89,12 @@ def handle_errors(func):
                 traceback.print_exc()
             sys.exit(1)
 
-    return wrapper
+    return cast(F, wrapper)
 
 
 @click.group()
 @click.version_option(version=__version__)
-def main():
+def main() -> None:
     """AI-powered Git commit message generator."""
     pass
 
@@ -93,7 +105,7 @@ def main():
 )
 @click.option("--config", "-c", is_flag=True, help="Also install configuration files")
 @handle_errors
-def install(force: bool, config: bool):
+def install(force: bool, config: bool) -> None:
     """Install the AI commit generator Git hook."""
     print_banner()
     console.print("[blue]🔧 Installing AI commit generator...[/blue]")
@@ -133,7 +145,7 @@ def install(force: bool, config: bool):
 
 @main.command()
 @handle_errors
-def uninstall():
+def uninstall() -> None:
     """Uninstall the AI commit generator Git hook."""
     console.print("[blue]🗑️  Uninstalling AI commit generator...[/blue]")
 
@@ -150,12 +162,13 @@ def uninstall():
 @click.option(
     "--dry-run", is_flag=True, help="Generate message without writing to file"
 )
+@click.option("--no-cache", is_flag=True, help="Ignore cached messages")
 @handle_errors
-def generate(output: Optional[str], dry_run: bool):
+def generate(output: Optional[str], dry_run: bool, no_cache: bool) -> None:
     """Generate a commit message for staged changes."""
     console.print("[blue]🤖 Generating AI commit message...[/blue]")
 
-    generator = CommitGenerator()
+    generator = CommitGenerator(use_cache=not no_cache)
 
     try:
         message = generator.generate_commit_message(
@@ -180,11 +193,149 @@ def generate(output: Optional[str], dry_run: bool):
         sys.exit(1)
 
 
+@main.command()
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+@click.option(
+    "--from-file",
+    "-f",
+    type=click.File("r"),
+    help="Read more paths from a file, one per line ('-' for stdin)",
+)
+@click.option(
+    "--workers",
+    "-w",
+    default=DEFAULT_WORKERS,
+    show_default=True,
+    type=click.IntRange(1, 64),
+    help="Number of items processed at once",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w"),
+    default="-",
+    help="JSON Lines output file (default: stdout)",
+)
+@click.option("--no-cache", is_flag=True, help="Ignore cached messages")
+@handle_errors
+def batch(
+    paths: Tuple[str, ...],
+    from_file: Optional[TextIO],
+    workers: int,
+    output: TextIO,
+    no_cache: bool,
+) -> None:
+    """Generate messages for many repositories or diff files.
+
+    Directories are treated as repositories and get a message for their
+    staged changes; files are treated as diffs and use the configuration of
+    the current repository. One JSON result is written per line.
+    """
+    sources = list(paths)
+    if from_file:
+        sources += [line.strip() for line in from_file if line.strip()]
+    if not sources:
+        raise click.UsageError("No repositories or diff files given")
+
+    # Progress goes to stderr so stdout stays valid JSON Lines
+    progress = Console(stderr=True)
+    progress.print(
+        f"[blue]📦 Generating messages for {len(sources)} items "
+        f"with {workers} workers...[/blue]"
+    )
+
+    failed = 0
+    for result in run_batch(sources, max_workers=workers, use_cache=not no_cache):
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        if not result["ok"]:
+            failed += 1
+
+    if failed:
+        progress.print(f"[yellow]⚠️  {failed} of {len(sources)} items failed[/yellow]")
+        sys.exit(1)
+    progress.print(f"[green]✅ Generated {len(sources)} messages[/green]")
+
+
+@main.command()
+@click.argument("revision_range")
+@click.option(
+    "--mapping",
+    "-m",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="commit-messages.jsonl",
+    show_default=True,
+    help="JSON Lines file mapping commits to new messages (resumed if present)",
+)
+@click.option(
+    "--match",
+    help="Only reword commits whose subject matches this regular expression",
+)
+@click.option(
+    "--workers",
+    "-w",
+    default=HISTORY_WORKERS,
+    show_default=True,
+    type=click.IntRange(1, 32),
+    help="Number of messages generated at once",
+)
+@click.option("--no-cache", is_flag=True, help="Ignore cached messages")
+@handle_errors
+def history(
+    revision_range: str,
+    mapping: Path,
+    match: Optional[str],
+    workers: int,
+    no_cache: bool,
+) -> None:
+    """Generate new messages for the commits of REVISION_RANGE.
+
+    History is not rewritten: the results go to a mapping file that git
+    filter-repo can apply. Rerunning the command skips commits that are
+    already in the mapping file.
+    """
+    if match:
+        try:
+            re.compile(match)
+        except re.error as e:
+            raise click.BadParameter(str(e), param_hint="--match")
+
+    console.print(
+        f"[blue]📜 Generating messages for {revision_range} "
+        f"with {workers} workers...[/blue]"
+    )
+
+    def show(record: Dict[str, Optional[str]]) -> None:
+        sha, message = record["commit"] or "", record["message"]
+        if message:
+            console.print(f"[dim]{sha[:10]}[/dim] {message}")
+
+    rewriter = HistoryRewriter(max_workers=workers, use_cache=not no_cache)
+    stats = rewriter.run(revision_range, mapping, match=match, on_result=show)
+
+    console.print(
+        f"[green]✅ {stats['done']} commits done[/green], "
+        f"{stats['skipped']} skipped, {stats['default']} with the default "
+        f"message, {stats['failed']} failed"
+    )
+    console.print(f"Mapping file: [dim]{mapping}[/dim]")
+    if stats["default"]:
+        console.print(
+            "[yellow]⚠️  Commits with the default message were left out of the "
+            "mapping file; run the command again to retry them[/yellow]"
+        )
+    if stats["failed"]:
+        console.print(
+            "[yellow]⚠️  Run the command again to retry the failed commits[/yellow]"
+        )
+        sys.exit(1)
+
+
 @main.command()
 @click.option("--show", is_flag=True, help="Show current configuration")
 @click.option("--validate", is_flag=True, help="Validate configuration")
 @handle_errors
-def config(show: bool, validate: bool):
+def config(show: bool, validate: bool) -> None:
     """Manage configuration."""
     try:
         cfg = Config()
@@ -221,10 +372,74 @@ def config(show: bool, validate: bool):
             sys.exit(1)
 
 
+@main.command()
+@click.option("--clear", is_flag=True, help="Remove all cached messages")
+@handle_errors
+def cache(clear: bool) -> None:
+    """Show or clear the generated message cache."""
+    cfg = Config()
+    message_cache = MessageCache(
+        cfg.cache_dir,
+        max_entries=cfg.cache_max_entries,
+        max_age_days=cfg.cache_max_age_days,
+    )
+
+    if clear:
+        removed = message_cache.clear()
+        console.print(f"[green]✅ Removed {removed} cached messages[/green]")
+        return
+
+    stats = message_cache.stats()
+    console.print("[blue]🗄️  Message Cache:[/blue]")
+    console.print(f"Enabled: [green]{'yes' if cfg.cache_enabled else 'no'}[/green]")
+    console.print(f"Entries: [green]{stats['entries']}[/green]")
+    console.print(f"Size: [green]{stats['size']} bytes[/green]")
+    console.print(f"Location: [dim]{cfg.cache_dir}[/dim]")
+
+
+@main.command()
+@click.option("--rebuild", is_flag=True, help="Index the history from scratch")
+@click.option(
+    "--top",
+    type=click.IntRange(1, 1000),
+    default=10,
+    show_default=True,
+    help="Number of directories to show",
+)
+@handle_errors
+def scopes(rebuild: bool, top: int) -> None:
+    """Update and show the scopes past commits used per directory."""
+    cfg = Config()
+    index = ScopeIndex(
+        cfg.scope_index_file,
+        cfg.repo_root,
+        max_commits=cfg.scope_index_max_commits,
+        min_samples=cfg.scope_index_min_samples,
+    )
+    if rebuild:
+        index.head = None
+
+    count = index.update()
+    console.print(f"[green]✅ Indexed {count} new commits[/green]")
+    if not cfg.scope_index_enabled:
+        console.print(
+            "[yellow]⚠️  Enable scope_index in .commitgen.yml to use it[/yellow]"
+        )
+
+    ranked = sorted(
+        index.prefixes.items(), key=lambda item: sum(item[1].values()), reverse=True
+    )
+    console.print("[blue]🗂️  Scopes by directory:[/blue]")
+    for prefix, counts in ranked[:top]:
+        scope = max(counts, key=counts.__getitem__)
+        share = counts[scope] / sum(counts.values())
+        console.print(f"  {prefix} [green]{scope}[/green] [dim]({share:.0%})[/dim]")
+
+
 @main.command()
 @click.option("--verbose", "-v", is_flag=True, help="Show detailed status")
 @handle_errors
-def status(verbose: bool):
+def status(verbose: bool) -> None:
     """Show installation and configuration status."""
     console.print("[blue]📊 AI Commit Generator Status[/blue]")
 
@@ -274,9 +489,58 @@ def status(verbose: bool):
         console.print(f"[red]❌ Configuration error:[/red] {e}")
 
 
+@main.command()
+@click.option("--stop", is_flag=True, help="Stop the running daemon")
+@click.option("--status", "show_status", is_flag=True, help="Show daemon status")
+@click.option(
+    "--foreground", is_flag=True, help="Run in the foreground instead of detaching"
+)
+@click.option(
+    "--idle-timeout",
+    type=int,
+    default=None,
+    help="Seconds of inactivity before the daemon exits",
+)
+@handle_errors
+def daemon(
+    stop: bool, show_status: bool, foreground: bool, idle_timeout: Optional[int]
+) -> None:
+    """Run a background daemon that keeps the generator warm for the Git hook."""
+    cfg = Config()
+
+    if show_status:
+        if is_running(cfg.repo_root):
+            console.print(
+                f"[green]✅ Daemon running[/green] ({socket_path(cfg.repo_root)})"
+            )
+        else:
+            console.print("[yellow]⚠️  Daemon not running[/yellow]")
+        return
+
+    if stop:
+        if stop_daemon(cfg.repo_root):
+            console.print("[green]✅ Daemon stopped[/green]")
+        else:
+            console.print("[yellow]⚠️  Daemon not running[/yellow]")
+        return
+
+    if foreground:
+        from .daemon import CommitDaemon
+
+        console.print(
+            f"[blue]🔌 Daemon listening on {socket_path(cfg.repo_root)}[/blue]"
+        )
+        CommitDaemon(cfg.repo_root, idle_timeout=idle_timeout).serve_forever()
+        return
+
+    pid = start_daemon(cfg.repo_root, idle_timeout=idle_timeout)
+    console.print(f"[green]✅ Daemon started[/green] (pid {pid})")
+    console.print("[dim]The Git hook will use it automatically.[/dim]")
+
+
 @main.command()
 @handle_errors
-def test():
+def test() -> None:
     """Test the AI commit generator with current staged changes."""
     console.print("[blue]🧪 Testing AI commit generator...[/blue]")
 
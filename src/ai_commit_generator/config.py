@@ -1,13 +1,19 @@
 """Configuration management for AI Commit Generator."""
 
+import copy
 import logging
+import marshal
 import os
 import re
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-import yaml
-from dotenv import load_dotenv
+from .heuristics import HEURISTICS_MODES
+from .patterns import PathMatcher
+from .tokens import context_window
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +85,9 @@ def secure_yaml_load(file_path: Path) -> Dict[str, Any]:
     if file_size > 1024 * 1024:  # 1MB limit
         raise SecurityError("Configuration file too large")
 
+    # Imported here: yaml is slow to import and only needed with a config file
+    import yaml
+
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             # Use safe_load to prevent code execution
@@ -99,6 +108,185 @@ def secure_yaml_load(file_path: Path) -> Dict[str, Any]:
         raise SecurityError(f"Failed to load configuration: {e}")
 
 
+def freeze(value: Any) -> Any:
+    """Get a read-only copy of a configuration value.
+
+    Args:
+        value: Value parsed from YAML
+
+    Returns:
+        The value with dictionaries as read-only mappings and lists as
+        tuples, at every level
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ConfigSnapshot:
+    """Immutable settings compiled from the merged configuration files.
+
+    Each setting is a typed attribute, so reading one is a plain attribute
+    access instead of a walk through nested dictionaries. Nested settings
+    are frozen too: dictionaries become read-only mappings and lists
+    tuples. Snapshots are built once per version of the configuration
+    files and shared by every ``Config`` of the process (see
+    ``load_snapshot``).
+    """
+
+    # Setting names and their paths in the merged configuration
+    FIELDS: Dict[str, Tuple[str, ...]] = {
+        "provider": ("api", "provider"),
+        "models": ("api", "models"),
+        "context_windows": ("api", "context_windows"),
+        "pool_size": ("api", "pool_size"),
+        "stream": ("api", "stream"),
+        "max_concurrency": ("api", "max_concurrency"),
+        "hedge_enabled": ("api", "hedge", "enabled"),
+        "hedge_providers": ("api", "hedge", "providers"),
+        "hedge_percentile": ("api", "hedge", "percentile"),
+        "hedge_initial_delay": ("api", "hedge", "initial_delay"),
+        "hedge_min_samples": ("api", "hedge", "min_samples"),
+        "key_env": ("api", "keys", "env"),
+        "key_cooldown": ("api", "keys", "cooldown"),
+        "key_auth_cooldown": ("api", "keys", "auth_cooldown"),
+        "rate_limit_enabled": ("api", "rate_limit", "enabled"),
+        "requests_per_minute": ("api", "rate_limit", "requests_per_minute"),
+        "tokens_per_minute": ("api", "rate_limit", "tokens_per_minute"),
+        "rate_limit_shared": ("api", "rate_limit", "shared"),
+        "rate_limit_state_dir": ("api", "rate_limit", "state_dir"),
+        "max_chars": ("commit", "max_chars"),
+        "commit_types": ("commit", "types"),
+        "commit_scopes": ("commit", "scopes"),
+        "max_diff_size": ("processing", "max_diff_size"),
+        "budget_unit": ("processing", "budget_unit"),
+        "max_prompt_tokens": ("processing", "max_prompt_tokens"),
+        "reserve_output_tokens": ("processing", "reserve_output_tokens"),
+        "exclude_patterns": ("processing", "exclude_patterns"),
+        "truncate_files": ("processing", "truncate_files"),
+        "max_file_lines": ("processing", "max_file_lines"),
+        "max_read_size": ("processing", "max_read_size"),
+        "summarize_enabled": ("processing", "summarize", "enabled"),
+        "summarize_max_workers": ("processing", "summarize", "max_workers"),
+        "summarize_chunk_size": ("processing", "summarize", "chunk_size"),
+        "summarize_max_chunks": ("processing", "summarize", "max_chunks"),
+        "summarize_max_input_size": ("processing", "summarize", "max_input_size"),
+        "timeout": ("security", "timeout"),
+        "max_log_size": ("security", "max_log_size"),
+        "default_message": ("fallback", "default_message"),
+        "max_retries": ("fallback", "max_retries"),
+        "retry_delay": ("fallback", "retry_delay"),
+        "max_retry_delay": ("fallback", "max_retry_delay"),
+        "retry_deadline": ("fallback", "deadline"),
+        "cache_enabled": ("cache", "enabled"),
+        "cache_max_entries": ("cache", "max_entries"),
+        "cache_max_age_days": ("cache", "max_age_days"),
+        "config_cache": ("cache", "config"),
+        "heuristics_mode": ("heuristics", "mode"),
+        "heuristics_min_confidence": ("heuristics", "min_confidence"),
+        "scope_index_enabled": ("scope_index", "enabled"),
+        "scope_index_max_commits": ("scope_index", "max_commits"),
+        "scope_index_min_samples": ("scope_index", "min_samples"),
+        "scope_index_min_confidence": ("scope_index", "min_confidence"),
+        "daemon_idle_timeout": ("daemon", "idle_timeout"),
+        "debug_enabled": ("debug", "enabled"),
+        "debug_log_file": ("debug", "log_file"),
+        "prompt_template": ("prompt", "template"),
+    }
+
+    __slots__ = tuple(FIELDS) + ("env", "_settings")
+
+    _settings: Dict[str, Any]
+
+    provider: str
+    models: Mapping[str, Mapping[str, Any]]
+    context_windows: Mapping[str, int]
+    pool_size: int
+    stream: bool
+    max_concurrency: int
+    hedge_enabled: bool
+    hedge_providers: Tuple[str, ...]
+    hedge_percentile: float
+    hedge_initial_delay: float
+    hedge_min_samples: int
+    key_env: Mapping[str, Tuple[str, ...]]
+    key_cooldown: float
+    key_auth_cooldown: float
+    rate_limit_enabled: bool
+    requests_per_minute: Optional[float]
+    tokens_per_minute: Optional[float]
+    rate_limit_shared: bool
+    rate_limit_state_dir: Optional[str]
+    max_chars: int
+    commit_types: Tuple[str, ...]
+    commit_scopes: Tuple[str, ...]
+    max_diff_size: int
+    budget_unit: str
+    max_prompt_tokens: Optional[int]
+    reserve_output_tokens: int
+    exclude_patterns: Tuple[str, ...]
+    truncate_files: bool
+    max_file_lines: int
+    max_read_size: int
+    summarize_enabled: bool
+    summarize_max_workers: int
+    summarize_chunk_size: int
+    summarize_max_chunks: int
+    summarize_max_input_size: int
+    timeout: float
+    max_log_size: int
+    default_message: str
+    max_retries: int
+    retry_delay: int
+    max_retry_delay: float
+    retry_deadline: float
+    cache_enabled: bool
+    cache_max_entries: int
+    cache_max_age_days: float
+    config_cache: bool
+    heuristics_mode: str
+    heuristics_min_confidence: float
+    scope_index_enabled: bool
+    scope_index_max_commits: int
+    scope_index_min_samples: int
+    scope_index_min_confidence: float
+    daemon_idle_timeout: int
+    debug_enabled: bool
+    debug_log_file: str
+    prompt_template: Optional[str]
+    env: Mapping[str, Optional[str]]
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        env: Optional[Dict[str, Optional[str]]] = None,
+    ):
+        """Compile merged settings.
+
+        Args:
+            settings: Configuration merged over ``Config.DEFAULT_CONFIG``
+            env: Variables read from the .env file
+        """
+        for name, path in self.FIELDS.items():
+            value: Any = settings
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            object.__setattr__(self, name, freeze(value))
+        object.__setattr__(self, "env", MappingProxyType(dict(env or {})))
+        object.__setattr__(self, "_settings", settings)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (ConfigSnapshot, (self._settings, dict(self.env)))
+
+
 class Config:
     """Configuration manager for AI Commit Generator."""
 
@@ -123,6 +311,36 @@ class Config:
                     "alternatives": ["command-r", "command-light"],
                 },
             },
+            # Context windows in tokens for models not known to tokens.py
+            "context_windows": {},
+            # Connections kept open per provider for reuse across requests
+            "pool_size": 10,
+            # Stream answers and stop reading after the first line
+            "stream": False,
+            # Requests in flight per provider for async generation
+            "max_concurrency": 16,
+            "hedge": {
+                "enabled": False,
+                "providers": [],  # Backup providers, fired in order
+                "percentile": 90,  # Primary latency percentile to wait for
+                "initial_delay": 2.0,  # Delay until enough latencies are known
+                "min_samples": 10,
+            },
+            # Pools of API keys per provider, in addition to {PROVIDER}_API_KEY
+            # and the comma-separated {PROVIDER}_API_KEYS
+            "keys": {
+                "env": {},  # Extra environment variables holding keys, by provider
+                "cooldown": 60,  # Seconds a key rests after HTTP 429
+                "auth_cooldown": 3600,  # Seconds a key rests after HTTP 401/403
+            },
+            # Client-side quotas per provider API key
+            "rate_limit": {
+                "enabled": True,
+                "requests_per_minute": None,  # None: learn from response headers
+                "tokens_per_minute": None,
+                "shared": False,  # Share quotas with other processes
+                "state_dir": None,  # Shared state directory (default: .git)
+            },
         },
         "commit": {
             "max_chars": 72,
@@ -154,6 +372,9 @@ class Config:
         },
         "processing": {
             "max_diff_size": 4000,  # Reduced for security
+            "budget_unit": "chars",  # "tokens": fill the context, up to max_diff_size
+            "max_prompt_tokens": None,  # Token budget cap (None: context window)
+            "reserve_output_tokens": 100,
             "exclude_patterns": [
                 "*.key",
                 "*.pem",
@@ -169,8 +390,16 @@ class Config:
                 "*.min.js",
                 "*.min.css",
             ],
-            "truncate_files": True,
+            "truncate_files": True,  # Share max_diff_size fairly across files
             "max_file_lines": 100,
+            "max_read_size": 1000000,  # Diff characters read before stopping git
+            "summarize": {
+                "enabled": False,
+                "max_workers": 4,  # Summary requests in flight at once
+                "chunk_size": 3000,  # Characters per summary request
+                "max_chunks": 32,  # Summary requests per diff
+                "max_input_size": 200000,  # Characters read before truncating
+            },
         },
         "security": {
             "validate_inputs": True,
@@ -183,6 +412,32 @@ class Config:
             "default_message": "chore: update files",
             "max_retries": 3,
             "retry_delay": 1,
+            # Upper bound of one backoff delay and of all attempts, in seconds
+            "max_retry_delay": 10,
+            "deadline": 20,
+        },
+        "cache": {
+            "enabled": True,
+            "max_entries": 500,
+            "max_age_days": 30,
+            # Keep parsed configuration files under .git for faster start-up
+            "config": True,
+        },
+        "heuristics": {
+            # "api": always ask the API; "local": skip the API when a local
+            # message is confident enough; "fallback": use a local message
+            # instead of default_message when the API fails
+            "mode": "api",
+            "min_confidence": 0.8,
+        },
+        "scope_index": {
+            "enabled": False,  # Suggest scopes past commits used for the paths
+            "max_commits": 10000,  # Commits read when building the index
+            "min_samples": 3,  # Scoped commits a directory needs to be trusted
+            "min_confidence": 0.6,  # Share of votes a suggested scope needs
+        },
+        "daemon": {
+            "idle_timeout": 3600,  # Seconds without requests before exiting
         },
         "debug": {
             "enabled": False,
@@ -211,8 +466,10 @@ class Config:
         self.env_file = validate_file_path(self.repo_root, Path(".env"))
 
         # Load configuration
-        self._config = self._load_config()
-        self._load_env()
+        self._snapshot = load_snapshot(self.repo_root, self.config_file, self.env_file)
+
+        # Compiled lazily from exclude_patterns on first use
+        self._exclude_matcher: Optional[PathMatcher] = None
 
     def _find_repo_root(self) -> Path:
         """Find the Git repository root directory."""
@@ -252,144 +509,402 @@ class Config:
         # Update repo_root to resolved path
         self.repo_root = resolved_path
 
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from .commitgen.yml file securely."""
-        config = self.DEFAULT_CONFIG.copy()
-
-        if self.config_file.exists():
-            try:
-                # Use secure YAML loading
-                user_config = secure_yaml_load(self.config_file)
-                config = self._merge_config(config, user_config)
-                logger.debug(f"Loaded configuration from {self.config_file}")
-            except (SecurityError, ConfigError):
-                # Re-raise security and config errors as-is
-                raise
-            except Exception as e:
-                raise ConfigError(f"Error reading {self.config_file}: {e}")
-        else:
-            logger.debug("No configuration file found, using defaults")
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Get the immutable settings loaded from the configuration files."""
+        return self._snapshot
 
-        return config
+    def getenv(self, name: str, default: str = "") -> str:
+        """Get an environment variable, falling back to the .env file.
 
-    def _merge_config(
-        self, base: Dict[str, Any], override: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Recursively merge configuration dictionaries."""
-        result = base.copy()
-        for key, value in override.items():
-            if (
-                key in result
-                and isinstance(result[key], dict)
-                and isinstance(value, dict)
-            ):
-                result[key] = self._merge_config(result[key], value)
-            else:
-                result[key] = value
-        return result
+        Like ``load_dotenv``, variables set in the process environment win.
+        The .env values stay with this configuration instead of being copied
+        into ``os.environ``, so configurations of different repositories in
+        one process (batch mode) each see their own keys.
 
-    def _load_env(self) -> None:
-        """Load environment variables from .env file."""
-        if self.env_file.exists():
-            load_dotenv(self.env_file)
-            logger.debug(f"Loaded environment from {self.env_file}")
+        Args:
+            name: Variable name
+            default: Value if the variable is set in neither place
+
+        Returns:
+            Variable value
+        """
+        value = os.environ.get(name)
+        if value is None:
+            value = self._snapshot.env.get(name)
+        return default if value is None else value
 
     @property
     def provider(self) -> str:
         """Get the configured AI provider."""
-        return self._config["api"]["provider"]
+        return self._snapshot.provider
 
     @property
     def model(self) -> str:
         """Get the model for the current provider."""
-        provider = self.provider
-        models = self._config["api"]["models"].get(provider, {})
+        return self.model_for(self.provider)
+
+    def model_for(self, provider: str) -> str:
+        """Get the model configured for a provider.
+
+        Args:
+            provider: Provider name
+
+        Returns:
+            Model name
+        """
+        models = self._snapshot.models.get(provider) or {}
 
         # Check for environment variable override
         env_var = f"{provider.upper()}_MODEL"
-        env_model = os.getenv(env_var)
+        env_model = self.getenv(env_var)
         if env_model:
             return env_model
 
-        return models.get("default", "llama3-70b-8192")
+        return str(models.get("default", "llama3-70b-8192"))
 
     @property
     def api_key(self) -> str:
         """Get the API key for the current provider."""
-        provider = self.provider
-        env_var = f"{provider.upper()}_API_KEY"
-        api_key = os.getenv(env_var)
+        return self.api_key_for(self.provider)
+
+    def api_key_for(self, provider: str) -> str:
+        """Get the API key for a provider.
+
+        Args:
+            provider: Provider name
+
+        Returns:
+            API key (the first key of the provider's pool)
 
-        if not api_key:
+        Raises:
+            ConfigError: If the key is not set
+        """
+        return self.api_keys_for(provider)[0]
+
+    def api_keys_for(self, provider: str) -> List[str]:
+        """Get the pool of API keys for a provider.
+
+        Keys are read from ``{PROVIDER}_API_KEY``, the comma-separated
+        ``{PROVIDER}_API_KEYS`` and the environment variables listed under
+        ``api.keys.env``, in that order, without duplicates.
+
+        Args:
+            provider: Provider name
+
+        Returns:
+            API keys, in order of preference
+
+        Raises:
+            ConfigError: If no key is set
+        """
+        env_var = f"{provider.upper()}_API_KEY"
+        values = [self.getenv(env_var), self.getenv(f"{env_var}S")]
+        extra_vars: Tuple[str, ...] = self._snapshot.key_env.get(provider) or ()
+        values += [self.getenv(name) for name in extra_vars]
+
+        keys: List[str] = []
+        for value in values:
+            for key in value.split(","):
+                key = key.strip()
+                if key and key not in keys:
+                    keys.append(key)
+
+        if not keys:
             raise ConfigError(
                 f"API key not found. Please set {env_var} in your .env file"
             )
 
-        return api_key
+        return keys
+
+    @property
+    def key_cooldown(self) -> float:
+        """Get the seconds a key rests after HTTP 429 without Retry-After."""
+        return self._snapshot.key_cooldown
+
+    @property
+    def key_auth_cooldown(self) -> float:
+        """Get the seconds a key rests after HTTP 401 or 403."""
+        return self._snapshot.key_auth_cooldown
 
     @property
     def max_chars(self) -> int:
         """Get maximum characters for commit message."""
-        return self._config["commit"]["max_chars"]
+        return self._snapshot.max_chars
 
     @property
-    def commit_types(self) -> List[str]:
+    def commit_types(self) -> Tuple[str, ...]:
         """Get allowed commit types."""
-        return self._config["commit"]["types"]
+        return self._snapshot.commit_types
 
     @property
-    def commit_scopes(self) -> List[str]:
+    def commit_scopes(self) -> Tuple[str, ...]:
         """Get allowed commit scopes."""
-        return self._config["commit"]["scopes"]
+        return self._snapshot.commit_scopes
 
     @property
     def max_diff_size(self) -> int:
         """Get maximum diff size to send to AI."""
-        return self._config["processing"]["max_diff_size"]
+        return self._snapshot.max_diff_size
 
     @property
-    def exclude_patterns(self) -> List[str]:
+    def exclude_patterns(self) -> Tuple[str, ...]:
         """Get file patterns to exclude from diff."""
-        return self._config["processing"]["exclude_patterns"]
+        return self._snapshot.exclude_patterns
+
+    @property
+    def budget_unit(self) -> str:
+        """Get the unit of the prompt budget ("chars" or "tokens")."""
+        return self._snapshot.budget_unit
+
+    @property
+    def max_prompt_tokens(self) -> Optional[int]:
+        """Get the token budget cap for a prompt, if any."""
+        return self._snapshot.max_prompt_tokens
+
+    @property
+    def reserve_output_tokens(self) -> int:
+        """Get the tokens reserved for the model's answer."""
+        return self._snapshot.reserve_output_tokens
+
+    @property
+    def context_window(self) -> int:
+        """Get the context window of the current model in tokens."""
+        return context_window(self.model, self._snapshot.context_windows)
+
+    @property
+    def pool_size(self) -> int:
+        """Get the number of pooled HTTP connections per provider."""
+        return self._snapshot.pool_size
+
+    @property
+    def stream(self) -> bool:
+        """Check if answers are streamed and cut off after the first line."""
+        return self._snapshot.stream
+
+    @property
+    def max_concurrency(self) -> int:
+        """Get the maximum number of async requests in flight per provider."""
+        return self._snapshot.max_concurrency
+
+    @property
+    def rate_limit_enabled(self) -> bool:
+        """Check if requests are throttled to the provider quotas."""
+        return self._snapshot.rate_limit_enabled
+
+    @property
+    def requests_per_minute(self) -> Optional[float]:
+        """Get the configured request quota per API key, if any."""
+        return self._snapshot.requests_per_minute
+
+    @property
+    def tokens_per_minute(self) -> Optional[float]:
+        """Get the configured token quota per API key, if any."""
+        return self._snapshot.tokens_per_minute
+
+    @property
+    def rate_limit_dir(self) -> Optional[Path]:
+        """Get the directory of quota state shared between processes.
+
+        Returns:
+            Directory path, or None if quotas are tracked per process
+        """
+        if not self._snapshot.rate_limit_shared:
+            return None
+        if self._snapshot.rate_limit_state_dir:
+            return Path(self._snapshot.rate_limit_state_dir).expanduser()
+        return self.repo_root / ".git" / "smart-commits-ai" / "ratelimit"
+
+    @property
+    def hedge_enabled(self) -> bool:
+        """Check if slow requests are hedged with backup providers."""
+        return self._snapshot.hedge_enabled
+
+    @property
+    def hedge_providers(self) -> Tuple[str, ...]:
+        """Get the backup providers used for hedged requests."""
+        return self._snapshot.hedge_providers
+
+    @property
+    def hedge_percentile(self) -> float:
+        """Get the primary latency percentile after which a backup is fired."""
+        return self._snapshot.hedge_percentile
+
+    @property
+    def hedge_initial_delay(self) -> float:
+        """Get the hedge delay used until enough latencies are recorded."""
+        return self._snapshot.hedge_initial_delay
+
+    @property
+    def hedge_min_samples(self) -> int:
+        """Get the number of latencies needed before using the percentile."""
+        return self._snapshot.hedge_min_samples
+
+    @property
+    def latency_file(self) -> Path:
+        """Get the file holding recorded provider latencies."""
+        return self.repo_root / ".git" / "smart-commits-ai" / "latency.json"
+
+    @property
+    def truncate_files(self) -> bool:
+        """Check if the diff budget is shared per file instead of cut once."""
+        return self._snapshot.truncate_files
+
+    @property
+    def max_file_lines(self) -> int:
+        """Get maximum diff lines kept per file."""
+        return self._snapshot.max_file_lines
+
+    @property
+    def max_read_size(self) -> int:
+        """Get maximum diff characters read from git."""
+        return self._snapshot.max_read_size
+
+    @property
+    def exclude_matcher(self) -> PathMatcher:
+        """Get the compiled matcher for exclude patterns."""
+        if self._exclude_matcher is None:
+            self._exclude_matcher = PathMatcher(self.exclude_patterns)
+        return self._exclude_matcher
+
+    @property
+    def summarize_enabled(self) -> bool:
+        """Check if large diffs are summarized with map-reduce."""
+        return self._snapshot.summarize_enabled
+
+    @property
+    def summarize_max_workers(self) -> int:
+        """Get maximum number of concurrent summary requests."""
+        return self._snapshot.summarize_max_workers
+
+    @property
+    def summarize_chunk_size(self) -> int:
+        """Get maximum characters sent per summary request."""
+        return self._snapshot.summarize_chunk_size
+
+    @property
+    def summarize_max_chunks(self) -> int:
+        """Get maximum number of summary requests per diff."""
+        return self._snapshot.summarize_max_chunks
+
+    @property
+    def summarize_max_input_size(self) -> int:
+        """Get maximum diff size accepted for summarization."""
+        return self._snapshot.summarize_max_input_size
 
     @property
     def max_retries(self) -> int:
         """Get maximum number of API retries."""
-        return self._config["fallback"]["max_retries"]
+        return self._snapshot.max_retries
 
     @property
     def retry_delay(self) -> int:
         """Get delay between retries in seconds."""
-        return self._config["fallback"]["retry_delay"]
+        return self._snapshot.retry_delay
+
+    @property
+    def max_retry_delay(self) -> float:
+        """Get the maximum delay between two retries in seconds."""
+        return self._snapshot.max_retry_delay
+
+    @property
+    def retry_deadline(self) -> float:
+        """Get the total seconds allowed for an API request with retries."""
+        return self._snapshot.retry_deadline
+
+    @property
+    def timeout(self) -> float:
+        """Get the end-to-end time budget for generating a message in seconds."""
+        return self._snapshot.timeout
 
     @property
     def default_message(self) -> str:
         """Get default fallback commit message."""
-        return self._config["fallback"]["default_message"]
+        return self._snapshot.default_message
+
+    @property
+    def cache_enabled(self) -> bool:
+        """Check if generated messages are cached."""
+        return self._snapshot.cache_enabled
+
+    @property
+    def cache_dir(self) -> Path:
+        """Get the directory holding cached messages."""
+        return self.repo_root / ".git" / "smart-commits-ai" / "cache"
+
+    @property
+    def cache_max_entries(self) -> int:
+        """Get maximum number of cached messages."""
+        return self._snapshot.cache_max_entries
+
+    @property
+    def cache_max_age_days(self) -> float:
+        """Get age in days after which cached messages expire."""
+        return self._snapshot.cache_max_age_days
+
+    @property
+    def heuristics_mode(self) -> str:
+        """Get how local messages are used ("api", "local" or "fallback")."""
+        return self._snapshot.heuristics_mode
+
+    @property
+    def heuristics_min_confidence(self) -> float:
+        """Get the confidence a local message needs to skip the API."""
+        return self._snapshot.heuristics_min_confidence
+
+    @property
+    def scope_index_enabled(self) -> bool:
+        """Check if scopes are inferred from past commits."""
+        return self._snapshot.scope_index_enabled
+
+    @property
+    def scope_index_max_commits(self) -> int:
+        """Get the number of commits read when building the scope index."""
+        return self._snapshot.scope_index_max_commits
+
+    @property
+    def scope_index_min_samples(self) -> int:
+        """Get the scoped commits a directory needs before it is trusted."""
+        return self._snapshot.scope_index_min_samples
+
+    @property
+    def scope_index_min_confidence(self) -> float:
+        """Get the share of votes an inferred scope needs to be suggested."""
+        return self._snapshot.scope_index_min_confidence
+
+    @property
+    def scope_index_file(self) -> Path:
+        """Get the file holding the scope index."""
+        return self.repo_root / ".git" / "smart-commits-ai" / "scopes.json"
+
+    @property
+    def daemon_idle_timeout(self) -> int:
+        """Get seconds of inactivity after which the daemon exits."""
+        return self._snapshot.daemon_idle_timeout
 
     @property
     def debug_enabled(self) -> bool:
         """Check if debug mode is enabled."""
         return (
-            self._config["debug"]["enabled"]
-            or os.getenv("DEBUG_ENABLED", "").lower() == "true"
+            self._snapshot.debug_enabled
+            or self.getenv("DEBUG_ENABLED").lower() == "true"
         )
 
     @property
     def log_file(self) -> Path:
         """Get debug log file path."""
-        return self.repo_root / self._config["debug"]["log_file"]
+        return self.repo_root / self._snapshot.debug_log_file
 
     def get_prompt_template(self) -> str:
         """Get the prompt template for AI generation."""
-        template = self._config.get("prompt", {}).get("template")
+        template = self._snapshot.prompt_template
         if not template:
             # Default template
             template = """Generate a conventional commit message under {max_chars} characters for the following git diff.
 
 Use one of these types: {types}
 
-If applicable, include a scope in parentheses after the type.
+If applicable, include a scope in parentheses after the type.{scope_hint}
 
 Format: type(scope): description
 
@@ -411,30 +926,293 @@ Respond with ONLY the commit message, no explanations or additional text."""
                 f"Invalid provider '{self.provider}'. Must be one of: {valid_providers}"
             )
 
-        # Validate API key exists and format
+        # Validate API keys exist and format
         try:
-            api_key = self.api_key
-            if len(api_key) < 20 or len(api_key) > 200:
-                raise SecurityError("API key length is suspicious")
+            api_keys = self.api_keys_for(self.provider)
         except ConfigError:
             raise ConfigError(f"API key not configured for provider '{self.provider}'")
+        for api_key in api_keys:
+            if len(api_key) < 20 or len(api_key) > 200:
+                raise SecurityError("API key length is suspicious")
+        if self.key_cooldown < 0 or self.key_auth_cooldown < 0:
+            raise ConfigError("key cooldowns must not be negative")
 
         # Validate numeric values with security limits
         if self.max_chars <= 0 or self.max_chars > 500:
             raise ConfigError("max_chars must be between 1 and 500")
         if self.max_diff_size <= 0 or self.max_diff_size > 50000:
             raise SecurityError("max_diff_size must be between 1 and 50000")
+        if self.budget_unit not in ("chars", "tokens"):
+            raise ConfigError("budget_unit must be 'chars' or 'tokens'")
+        if self.max_prompt_tokens is not None and self.max_prompt_tokens <= 0:
+            raise ConfigError("max_prompt_tokens must be positive")
+        if self.reserve_output_tokens < 0:
+            raise ConfigError("reserve_output_tokens must not be negative")
+        if self.max_file_lines <= 0 or self.max_file_lines > 100000:
+            raise ConfigError("max_file_lines must be between 1 and 100000")
+        if self.max_read_size <= 0 or self.max_read_size > 104857600:
+            raise SecurityError("max_read_size must be between 1 and 100MB")
+        if self.summarize_enabled:
+            if self.summarize_max_workers <= 0 or self.summarize_max_workers > 32:
+                raise ConfigError("summarize max_workers must be between 1 and 32")
+            if self.summarize_chunk_size <= 0 or self.summarize_chunk_size > 50000:
+                raise SecurityError("summarize chunk_size must be between 1 and 50000")
+            if self.summarize_max_chunks <= 0 or self.summarize_max_chunks > 256:
+                raise ConfigError("summarize max_chunks must be between 1 and 256")
+            if (
+                self.summarize_max_input_size <= 0
+                or self.summarize_max_input_size > 10485760
+            ):
+                raise SecurityError("summarize max_input_size must be at most 10MB")
+        if self.pool_size <= 0 or self.pool_size > 100:
+            raise ConfigError("pool_size must be between 1 and 100")
+        if self.max_concurrency <= 0 or self.max_concurrency > 10000:
+            raise ConfigError("max_concurrency must be between 1 and 10000")
+        for name, quota in (
+            ("requests_per_minute", self.requests_per_minute),
+            ("tokens_per_minute", self.tokens_per_minute),
+        ):
+            if quota is not None and (quota <= 0 or quota > 100000000):
+                raise ConfigError(f"{name} must be between 1 and 100000000")
+        if self.hedge_enabled:
+            for provider in self.hedge_providers:
+                if provider not in valid_providers or provider == self.provider:
+                    raise ConfigError(
+                        f"Invalid hedge provider '{provider}'. Must be one of "
+                        f"{valid_providers} other than the primary provider"
+                    )
+                try:
+                    self.api_key_for(provider)
+                except ConfigError:
+                    raise ConfigError(
+                        f"API key not configured for hedge provider '{provider}'"
+                    )
+            if not 0 < self.hedge_percentile < 100:
+                raise ConfigError("hedge percentile must be between 0 and 100")
+            if self.hedge_initial_delay < 0 or self.hedge_min_samples < 1:
+                raise ConfigError(
+                    "hedge initial_delay must not be negative and min_samples "
+                    "must be at least 1"
+                )
         if self.max_retries < 0 or self.max_retries > 10:
             raise ConfigError("max_retries must be between 0 and 10")
         if self.retry_delay < 0 or self.retry_delay > 60:
             raise ConfigError("retry_delay must be between 0 and 60 seconds")
+        if self.max_retry_delay < self.retry_delay or self.max_retry_delay > 300:
+            raise ConfigError(
+                "max_retry_delay must be between retry_delay and 300 seconds"
+            )
+        if self.retry_deadline <= 0 or self.retry_deadline > 300:
+            raise ConfigError("deadline must be between 1 and 300 seconds")
+        if self.cache_max_entries < 0 or self.cache_max_entries > 100000:
+            raise ConfigError("cache max_entries must be between 0 and 100000")
+        if self.cache_max_age_days < 0:
+            raise ConfigError("cache max_age_days must not be negative")
+        if self.heuristics_mode not in HEURISTICS_MODES:
+            raise ConfigError(f"heuristics mode must be one of: {HEURISTICS_MODES}")
+        if not 0 <= self.heuristics_min_confidence <= 1:
+            raise ConfigError("heuristics min_confidence must be between 0 and 1")
+        if self.scope_index_enabled:
+            if not 1 <= self.scope_index_max_commits <= 1000000:
+                raise ConfigError(
+                    "scope_index max_commits must be between 1 and 1000000"
+                )
+            if self.scope_index_min_samples < 1:
+                raise ConfigError("scope_index min_samples must be at least 1")
+            if not 0 <= self.scope_index_min_confidence <= 1:
+                raise ConfigError("scope_index min_confidence must be between 0 and 1")
 
         # Validate security settings
-        security_config = self._config.get("security", {})
-        timeout = security_config.get("timeout", 30)
-        if timeout <= 0 or timeout > 300:
+        if self.timeout <= 0 or self.timeout > 300:
             raise SecurityError("timeout must be between 1 and 300 seconds")
 
-        max_log_size = security_config.get("max_log_size", 10485760)
+        max_log_size = self._snapshot.max_log_size
         if max_log_size <= 0 or max_log_size > 104857600:  # 100MB max
             raise SecurityError("max_log_size must be between 1 and 100MB")
+
+
+def merge_config(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge configuration dictionaries."""
+    result = base.copy()
+    for key, value in override.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = merge_config(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+# Version of the configuration cache format under .git
+CONFIG_CACHE_VERSION = 1
+
+# Snapshots shared by the process, keyed by configuration file path
+_snapshots: Dict[Path, Tuple[Tuple[Any, ...], ConfigSnapshot]] = {}
+_snapshots_lock = threading.Lock()
+
+
+def _file_key(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Get the identity of a file's version, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+
+
+def config_cache_file(repo_root: Path) -> Optional[Path]:
+    """Get the file caching the parsed configuration of a repository.
+
+    Args:
+        repo_root: Root directory of the Git repository
+
+    Returns:
+        Cache file path, or None if .git is not a directory (e.g. worktrees)
+    """
+    git_dir = repo_root / ".git"
+    if not git_dir.is_dir():
+        return None
+    return git_dir / "smart-commits-ai" / "config.cache"
+
+
+def _read_config_cache(
+    cache_file: Path, key: Tuple[Any, ...]
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Optional[str]]]]:
+    """Read parsed configuration files if they are still up to date.
+
+    Returns:
+        User settings and .env variables, or None on a cache miss
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, user_config, env = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if cached_key != key:
+        return None
+    return user_config, env
+
+
+def _write_config_cache(
+    cache_file: Path,
+    key: Tuple[Any, ...],
+    user_config: Dict[str, Any],
+    env: Dict[str, Optional[str]],
+) -> None:
+    """Store parsed configuration files, ignoring failures.
+
+    The .env variables hold API keys, so the file is readable by its owner only.
+    """
+    try:
+        data = marshal.dumps((key, user_config, env))
+    except ValueError:
+        # YAML values marshal cannot store (e.g. dates) are parsed every time
+        return
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # A stale temporary file would keep its permissions
+        temp_file.unlink(missing_ok=True)
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        logger.debug(f"Could not write configuration cache: {e}")
+        temp_file.unlink(missing_ok=True)
+
+
+def _parse_config_files(
+    config_file: Path, env_file: Path
+) -> Tuple[Dict[str, Any], Dict[str, Optional[str]]]:
+    """Parse .commitgen.yml and .env securely.
+
+    Returns:
+        User settings and .env variables
+
+    Raises:
+        SecurityError: If a file is unsafe
+        ConfigError: If a file cannot be read
+    """
+    user_config: Dict[str, Any] = {}
+    if config_file.exists():
+        try:
+            # Use secure YAML loading
+            user_config = secure_yaml_load(config_file)
+            logger.debug(f"Loaded configuration from {config_file}")
+        except (SecurityError, ConfigError):
+            # Re-raise security and config errors as-is
+            raise
+        except Exception as e:
+            raise ConfigError(f"Error reading {config_file}: {e}")
+    else:
+        logger.debug("No configuration file found, using defaults")
+
+    env: Dict[str, Optional[str]] = {}
+    if env_file.exists():
+        # Imported here: dotenv is only needed with an env file
+        from dotenv import dotenv_values
+
+        env = dict(dotenv_values(env_file))
+        logger.debug(f"Loaded environment from {env_file}")
+
+    return user_config, env
+
+
+def load_snapshot(
+    repo_root: Path, config_file: Path, env_file: Path
+) -> ConfigSnapshot:
+    """Get the settings of a repository, parsing its files only when changed.
+
+    Snapshots are cached in memory, and the parsed files under .git (unless
+    ``cache.config`` is disabled), keyed on the modification times and sizes
+    of .commitgen.yml and .env. The cache holds plain data written with
+    ``marshal``, which cannot run code when loaded.
+
+    Args:
+        repo_root: Root directory of the Git repository
+        config_file: Validated path of .commitgen.yml
+        env_file: Validated path of .env
+
+    Returns:
+        Shared configuration snapshot
+
+    Raises:
+        SecurityError: If a file is unsafe
+        ConfigError: If a file cannot be read
+    """
+    key = (
+        CONFIG_CACHE_VERSION,
+        sys.version_info[:2],
+        str(config_file),
+        _file_key(config_file),
+        str(env_file),
+        _file_key(env_file),
+    )
+    with _snapshots_lock:
+        cached = _snapshots.get(config_file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    cache_file = config_cache_file(repo_root)
+    parsed = _read_config_cache(cache_file, key) if cache_file else None
+    if parsed is None:
+        user_config, env = _parse_config_files(config_file, env_file)
+    else:
+        user_config, env = parsed
+        logger.debug(f"Loaded cached configuration from {cache_file}")
+
+    # Merge over a copy, so no snapshot shares containers with the defaults
+    settings = merge_config(copy.deepcopy(Config.DEFAULT_CONFIG), user_config)
+    snapshot = ConfigSnapshot(settings, env)
+    if parsed is None and cache_file and snapshot.config_cache:
+        _write_config_cache(cache_file, key, user_config, env)
+
+    with _snapshots_lock:
+        _snapshots[config_file] = (key, snapshot)
+    return snapshot
+
+
+def reset_snapshots() -> None:
+    """Forget all configuration snapshots loaded by the process."""
+    with _snapshots_lock:
+        _snapshots.clear()
@@ -18,19 +18,55 @@ Example:
     print(message)  # "feat(auth): add JWT token validation"
 """
 
-import fnmatch
+import contextlib
 import logging
-import re
+import os
 import subprocess
+import tempfile
+import threading
+import time
 import functools
 from pathlib import Path
-from typing import Optional
-
-from .api_clients import APIError, create_client
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .api_clients import APIClient, APIError, create_client, first_line_stop
+from .cache import MessageCache
 from .config import Config
+from .deadline import Deadline, DeadlineExceeded
+from .diff import ParsedDiff, parse_diff, render_budgeted, split_lines
+from .hedge import LatencyTracker, arace, race
+from .heuristics import (
+    FileChange,
+    Suggestion,
+    changes_from_diff,
+    classify,
+    parse_name_status,
+)
+from .keypool import get_key_pool
+from .ratelimit import RateLimiter, get_limiter
+from .scope_index import LOG_TIMEOUT as SCOPE_LOG_TIMEOUT
+from .scope_index import ScopeIndex
+from .summarize import DiffSummarizer
+from .tokens import estimate_tokens, tokens_to_chars
+from .validation import MessageValidator, get_validator
+
+if TYPE_CHECKING:
+    from .async_clients import AsyncAPIClient
 
 logger = logging.getLogger(__name__)
 
+# Share of the token budget actually filled, absorbing estimation error
+TOKEN_SAFETY_MARGIN = 0.9
+
 
 class SecurityError(Exception):
     """Exception raised for security-related errors."""
@@ -42,9 +78,15 @@ class GitError(Exception):
     pass
 
 
-def secure_subprocess_run(cmd: list, cwd: Optional[Path] = None, timeout: int = 30, **kwargs) -> subprocess.CompletedProcess:
-    """Secure wrapper for subprocess.run with validation and timeouts."""
+def _validate_command(cmd: list, cwd: Optional[Path]) -> Optional[Path]:
+    """Validate a command and working directory before running it.
 
+    Returns:
+        Resolved working directory (or None)
+
+    Raises:
+        SecurityError: If the command or working directory is unsafe
+    """
     # Validate command
     if not cmd or not isinstance(cmd, list):
         raise SecurityError("Invalid command")
@@ -63,6 +105,19 @@ def secure_subprocess_run(cmd: list, cwd: Optional[Path] = None, timeout: int =
         if not (cwd / ".git").exists():
             raise SecurityError("Not a Git repository")
 
+    return cwd
+
+
+def secure_subprocess_run(
+    cmd: list,
+    cwd: Optional[Path] = None,
+    timeout: Optional[float] = 30,
+    **kwargs: Any,
+) -> subprocess.CompletedProcess:
+    """Secure wrapper for subprocess.run with validation and timeouts."""
+
+    cwd = _validate_command(cmd, cwd)
+
     # Set secure defaults
     secure_kwargs = {
         'capture_output': True,
@@ -81,6 +136,112 @@ def secure_subprocess_run(cmd: list, cwd: Optional[Path] = None, timeout: int =
         raise GitError(f"Git command failed: {e}")
 
 
+def secure_subprocess_lines(
+    cmd: list, cwd: Optional[Path] = None, timeout: Optional[float] = 30
+) -> Generator[str, None, None]:
+    """Run a command securely and yield its stdout line by line.
+
+    Output is read incrementally instead of buffered in memory. Closing the
+    generator early (e.g. once a size budget is full) terminates the process.
+
+    Args:
+        cmd: Command and arguments
+        cwd: Working directory (must be a Git repository)
+        timeout: Seconds after which the process is killed, None for no limit
+
+    Yields:
+        Output lines including their trailing newline
+
+    Raises:
+        SecurityError: If the command is unsafe or times out
+        GitError: If the command exits with an error
+    """
+    cwd = _validate_command(cmd, cwd)
+
+    # stderr goes to a file so a chatty command can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            encoding="utf-8",
+            errors="replace",
+            shell=False,  # Never use shell
+        )
+        timed_out = threading.Event()
+
+        def kill_on_timeout() -> None:
+            timed_out.set()
+            process.kill()
+
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, kill_on_timeout)
+            timer.start()
+        assert process.stdout is not None  # stdout=PIPE
+        try:
+            for line in process.stdout:
+                yield line
+        finally:
+            # Runs on early close too: stop the command instead of draining it
+            if timer is not None:
+                timer.cancel()
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+
+        if timed_out.is_set():
+            raise SecurityError(f"Command timed out after {timeout} seconds")
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace").strip()
+            raise GitError(f"Git command failed: {stderr}")
+
+
+def exclude_pathspecs(patterns: Sequence[str]) -> List[str]:
+    """Translate exclude patterns into git ``:(exclude)`` pathspecs.
+
+    Git's default pathspec matching is fnmatch without FNM_PATHNAME, so ``*``
+    also matches ``/`` exactly as the exclude matcher does, and excluded
+    files are never generated by git at all. Git may exclude less than the
+    matcher (``**/`` requires at least one directory there), never more.
+    Patterns whose meaning differs between the two are skipped, as is
+    everything a later ``!`` pattern could re-include; the post-filter
+    handles those. These are backslash escapes, ``[^...]`` classes, pathspec
+    magic and patterns without wildcards: git matches a literal pathspec
+    such as ``docs`` as a directory prefix, even with ``literal`` magic,
+    while the matcher only excludes a file named exactly ``docs``.
+
+    Args:
+        patterns: Exclude patterns in configuration order
+
+    Returns:
+        Pathspecs to append after ``--``
+    """
+    # fnmatch follows the platform's case rules, git is case-sensitive
+    magic = "exclude,icase" if os.path.normcase("A") == "a" else "exclude"
+
+    # Only patterns after the last negation are final, whatever follows
+    negations = [i for i, pattern in enumerate(patterns) if pattern.startswith("!")]
+    start = negations[-1] + 1 if negations else 0
+
+    pathspecs = []
+    for pattern in patterns[start:]:
+        untranslatable = pattern.startswith(":") or "\\" in pattern or "[^" in pattern
+        literal = not any(char in pattern for char in "*?[")
+        if not pattern or untranslatable or literal:
+            continue
+        pathspecs.append(f":({magic}){pattern}")
+
+    if pathspecs:
+        # Excludes need a positive pathspec to subtract from
+        pathspecs.insert(0, ".")
+    return pathspecs
+
+
 def sanitize_repo_path(path: str) -> Path:
     """Sanitize and validate repository path."""
     if not path or not isinstance(path, str):
@@ -117,13 +278,20 @@ class GitError(Exception):
 class CommitGenerator:
     """Main class for generating AI-powered commit messages."""
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None, use_cache: bool = True):
         """Initialize the commit generator.
 
         Args:
             config: Configuration object. If None, will create from current directory.
+            use_cache: If False, bypass the message cache for this generator.
         """
         self.config = config or Config()
+        self.use_cache = use_cache
+        self._client: Optional[APIClient] = None
+        self._hedge_clients: Optional[List[APIClient]] = None
+        self._async_clients: Optional[List["AsyncAPIClient"]] = None
+        self._scope_index: Optional[ScopeIndex] = None
+        self._scope_index_lock = threading.Lock()
         self._setup_logging()
 
     def _setup_logging(self) -> None:
@@ -143,6 +311,9 @@ class CommitGenerator:
     def generate_commit_message(self, commit_msg_file: Optional[str] = None) -> str:
         """Generate a commit message for staged changes.
 
+        The whole generation shares the ``security.timeout`` time budget;
+        once it is spent the default message is returned immediately.
+
         Args:
             commit_msg_file: Path to commit message file (for Git hook usage)
 
@@ -158,25 +329,53 @@ class CommitGenerator:
 
         # Validate configuration
         self.config.validate()
+        deadline = Deadline(self.config.timeout)
 
         # Check if this is a merge commit
         if self._is_merge_commit():
             logger.info("Merge commit detected, skipping AI generation")
             return ""
 
-        # Get staged changes
-        diff = self._get_staged_diff()
-        if not diff.strip():
-            logger.info("No staged changes found")
-            return ""
+        suggestion = None
+        try:
+            # Trivial changes may not need the API at all
+            changes = self._list_changes(self._read_staged_changes, deadline)
+            scope = self._likely_scope([c.path for c in changes or ()], deadline)
+            suggestion = self._suggest_locally(changes, scope)
+            if suggestion is not None and self._is_confident(suggestion):
+                message = suggestion.message
+            else:
+                # Get staged changes (already filtered while streaming from git)
+                parsed = self._read_staged_diff(deadline)
+                if not parsed and not self._has_staged_changes(deadline):
+                    logger.info("No staged changes found")
+                    return ""
+
+                # Truncate diff if necessary
+                processed_diff = self._render_diff(parsed)
+                if changes is None:
+                    scope = self._likely_scope(
+                        [f.path for f in parsed.files], deadline
+                    )
+                message = self._message_for_diff(
+                    processed_diff, deadline, suggestion, scope
+                )
+        except DeadlineExceeded as e:
+            logger.warning(f"{e}, using the fallback message")
+            message = self._fallback_message(suggestion)
 
-        # Process and truncate diff if necessary
-        processed_diff = self._process_diff(diff)
+        return self._write_message(message, commit_msg_file)
 
-        # Generate commit message using AI
-        message = self._generate_with_ai(processed_diff)
+    def _write_message(self, message: str, commit_msg_file: Optional[str]) -> str:
+        """Write the message to the commit message file, if any.
 
-        # Write to commit message file if provided
+        Args:
+            message: Generated commit message
+            commit_msg_file: Path to commit message file (for Git hook usage)
+
+        Returns:
+            The message
+        """
         if commit_msg_file:
             with open(commit_msg_file, "w", encoding="utf-8") as f:
                 f.write(message)
@@ -184,6 +383,264 @@ class CommitGenerator:
         logger.info(f"Generated commit message: {message}")
         return message
 
+    def generate_from_diff(self, diff: str) -> str:
+        """Generate a commit message for a diff instead of the staged changes.
+
+        The diff is filtered and truncated like staged changes, and the same
+        cache, time budget and fallback apply. Used for batch processing of
+        diff files.
+
+        Args:
+            diff: Git diff content
+
+        Returns:
+            Generated commit message, or an empty string for an empty diff
+
+        Raises:
+            ConfigError: If configuration is invalid
+        """
+        self.config.validate()
+        deadline = Deadline(self.config.timeout)
+
+        parsed = self._parse_diff_text(diff)
+        if not parsed:
+            logger.info("Diff is empty after filtering")
+            return ""
+
+        suggestion = None
+        try:
+            # Classify all files, including excluded ones
+            changes = self._list_changes(
+                lambda _: changes_from_diff(parse_diff(split_lines(diff))), deadline
+            )
+            scope = self._likely_scope([c.path for c in changes or ()], deadline)
+            suggestion = self._suggest_locally(changes, scope)
+            if suggestion is not None and self._is_confident(suggestion):
+                return suggestion.message
+
+            processed_diff = self._render_diff(parsed)
+            if changes is None:
+                scope = self._likely_scope([f.path for f in parsed.files], deadline)
+            return self._message_for_diff(processed_diff, deadline, suggestion, scope)
+        except DeadlineExceeded as e:
+            logger.warning(f"{e}, using the fallback message")
+            return self._fallback_message(suggestion)
+
+    def _message_for_diff(
+        self,
+        processed_diff: str,
+        deadline: Deadline,
+        suggestion: Optional[Suggestion] = None,
+        scope: Optional[str] = None,
+    ) -> str:
+        """Get the message for a processed diff from the cache or the AI.
+
+        Args:
+            processed_diff: Filtered and truncated diff
+            deadline: Time budget for the API requests
+            suggestion: Local message used if the AI fails
+            scope: Scope inferred from past commits, suggested in the prompt
+
+        Returns:
+            Commit message
+        """
+        cache_key, message = self._cached_message(processed_diff, scope)
+        if message is None:
+            # Generate commit message using AI
+            message = self._generate_with_ai(processed_diff, deadline, scope)
+            message = self._keep_message(cache_key, message, suggestion)
+        return message
+
+    def _read_staged_changes(self, deadline: Deadline) -> List[FileChange]:
+        """List the staged files with their status, detecting renames.
+
+        Args:
+            deadline: Time budget that git must finish within
+
+        Returns:
+            Staged file changes, including excluded files
+
+        Raises:
+            GitError: If git command fails
+            SecurityError: If repository path is invalid
+        """
+        deadline.check("listing the staged files")
+        repo_path = sanitize_repo_path(str(self.config.repo_root))
+        result = secure_subprocess_run(
+            ["git", "diff", "--cached", "--name-status", "-M", "-z"],
+            cwd=repo_path,
+            timeout=deadline.timeout(30),
+        )
+        return parse_name_status(result.stdout)
+
+    def _list_changes(
+        self,
+        read_changes: Callable[[Deadline], List[FileChange]],
+        deadline: Deadline,
+    ) -> Optional[List[FileChange]]:
+        """List the changed files for a local message, unless heuristics are off.
+
+        Args:
+            read_changes: Reader of the changed files
+            deadline: Time budget for reading the changed files
+
+        Returns:
+            Changed files, or None if heuristics are disabled or git failed
+        """
+        if self.config.heuristics_mode == "api":
+            return None
+        try:
+            return read_changes(deadline)
+        except (GitError, SecurityError) as e:
+            logger.debug(f"Could not list the changed files: {e}")
+            return None
+
+    def _suggest_locally(
+        self, changes: Optional[Sequence[FileChange]], scope: Optional[str]
+    ) -> Optional[Suggestion]:
+        """Write a message offline for the changed files.
+
+        Args:
+            changes: Changed files, or None if heuristics are disabled
+            scope: Scope inferred for the files, also used in the prompt
+
+        Returns:
+            Local message, or None
+        """
+        if not changes:
+            return None
+        suggestion = classify(
+            changes,
+            self.config.commit_types,
+            self.config.commit_scopes,
+            self.config.max_chars,
+            scope=scope,
+        )
+        if suggestion:
+            logger.debug(f"Local message: {suggestion}")
+        return suggestion
+
+    def _likely_scope(self, paths: Sequence[str], deadline: Deadline) -> Optional[str]:
+        """Infer the scope of changed files from past commits, if enabled.
+
+        The scope index is brought up to date with the commits added since
+        its last update first.
+
+        Args:
+            paths: Paths of the changed files
+            deadline: Time budget for updating the index
+
+        Returns:
+            Scope most past commits used for these paths, or None if unsure
+        """
+        if not self.config.scope_index_enabled or not paths:
+            return None
+        with self._scope_index_lock:
+            if self._scope_index is None:
+                self._scope_index = ScopeIndex(
+                    self.config.scope_index_file,
+                    self.config.repo_root,
+                    max_commits=self.config.scope_index_max_commits,
+                    min_samples=self.config.scope_index_min_samples,
+                )
+            index = self._scope_index
+
+        deadline.check("updating the scope index")
+        try:
+            index.update(timeout=deadline.timeout(SCOPE_LOG_TIMEOUT))
+        except (GitError, SecurityError) as e:
+            logger.warning(f"Could not update the scope index: {e}")
+
+        likely = index.likely_scope(paths)
+        if likely is None or likely[1] < self.config.scope_index_min_confidence:
+            return None
+        logger.debug(f"Likely scope: {likely[0]} ({likely[1]:.0%} of the files)")
+        return likely[0]
+
+    def _is_confident(self, suggestion: Suggestion) -> bool:
+        """Check if a local message is used without asking the API."""
+        return (
+            self.config.heuristics_mode == "local"
+            and suggestion.confidence >= self.config.heuristics_min_confidence
+        )
+
+    def _fallback_message(self, suggestion: Optional[Suggestion]) -> str:
+        """Get the message used when the AI fails."""
+        if suggestion is None:
+            return self.config.default_message
+        logger.info("Using the local message instead of the default message")
+        return suggestion.message
+
+    async def agenerate_commit_message(
+        self, commit_msg_file: Optional[str] = None
+    ) -> str:
+        """Generate a commit message for staged changes on the running event loop.
+
+        Same as ``generate_commit_message``, but git runs in the loop's
+        executor and AI requests use the async clients, so many generations
+        can share one thread. Requires the optional ``httpx`` dependency.
+
+        Args:
+            commit_msg_file: Path to commit message file (for Git hook usage)
+
+        Returns:
+            Generated commit message
+
+        Raises:
+            GitError: If Git operations fail
+            ConfigError: If configuration is invalid
+            APIError: If AI API calls fail
+        """
+        # Imported here: asyncio is slow to import and only needed when async
+        import asyncio
+
+        logger.info("Starting async commit message generation")
+
+        # Validate configuration
+        self.config.validate()
+        deadline = Deadline(self.config.timeout)
+        loop = asyncio.get_running_loop()
+
+        # Check if this is a merge commit
+        if self._is_merge_commit():
+            logger.info("Merge commit detected, skipping AI generation")
+            return ""
+
+        suggestion = None
+        try:
+            changes = await loop.run_in_executor(
+                None, self._list_changes, self._read_staged_changes, deadline
+            )
+            scope = await loop.run_in_executor(
+                None, self._likely_scope, [c.path for c in changes or ()], deadline
+            )
+            suggestion = self._suggest_locally(changes, scope)
+            if suggestion is not None and self._is_confident(suggestion):
+                return self._write_message(suggestion.message, commit_msg_file)
+
+            parsed = await loop.run_in_executor(None, self._read_staged_diff, deadline)
+            if not parsed and not await loop.run_in_executor(
+                None, self._has_staged_changes, deadline
+            ):
+                logger.info("No staged changes found")
+                return ""
+
+            processed_diff = self._render_diff(parsed)
+            if changes is None:
+                scope = await loop.run_in_executor(
+                    None, self._likely_scope, [f.path for f in parsed.files], deadline
+                )
+
+            cache_key, message = self._cached_message(processed_diff, scope)
+            if message is None:
+                message = await self._agenerate_with_ai(processed_diff, deadline, scope)
+                message = self._keep_message(cache_key, message, suggestion)
+        except DeadlineExceeded as e:
+            logger.warning(f"{e}, using the fallback message")
+            message = self._fallback_message(suggestion)
+
+        return self._write_message(message, commit_msg_file)
+
     def _is_merge_commit(self) -> bool:
         """Check if this is a merge commit."""
         try:
@@ -198,31 +655,93 @@ class CommitGenerator:
         """Get the diff of staged changes.
 
         Returns:
-            Git diff output as string
+            Filtered git diff output, at most one line past the size budget
+
+        Raises:
+            GitError: If git command fails
+            SecurityError: If repository path is invalid
+        """
+        return self._read_staged_diff().text
+
+    def _read_staged_diff(self, deadline: Optional[Deadline] = None) -> ParsedDiff:
+        """Read and parse the diff of staged changes.
+
+        Exclude patterns are passed to git as pathspecs so excluded files are
+        never generated. Git's output is streamed into the parser: any
+        remaining excluded files are dropped as they arrive, and git is
+        stopped as soon as the size budget is exceeded, so large staged
+        files are never buffered in full.
+
+        Args:
+            deadline: Time budget that git must finish within
+
+        Returns:
+            Parsed diff of the included files
 
         Raises:
             GitError: If git command fails
             SecurityError: If repository path is invalid
+            DeadlineExceeded: If git is stopped because the budget is spent
         """
+        deadline = deadline or Deadline(None)
         try:
             # Validate and sanitize repository path
             repo_path = sanitize_repo_path(str(self.config.repo_root))
 
-            # Use secure subprocess wrapper
-            result = secure_subprocess_run(
-                ["git", "diff", "--cached"],
-                cwd=repo_path,
-                timeout=30
+            # Let git skip excluded files; the parser filters the rest
+            cmd = ["git", "diff", "--cached"]
+            pathspecs = exclude_pathspecs(self.config.exclude_patterns)
+            if pathspecs:
+                cmd += ["--", *pathspecs]
+
+            # Use secure streaming subprocess wrapper
+            deadline.check("reading the staged diff")
+            lines = secure_subprocess_lines(
+                cmd, cwd=repo_path, timeout=deadline.timeout(30)
             )
-            return result.stdout
-        except (SecurityError, GitError):
-            # Re-raise security and git errors as-is
+            size_limit = self._diff_size_limit()
+            file_size_limit = None
+            if self.config.truncate_files:
+                # Read far enough to see every file, keeping one budget per file
+                size_limit, file_size_limit = self.config.max_read_size, size_limit
+
+            with contextlib.closing(lines):
+                parsed = parse_diff(
+                    lines,
+                    exclude=self._exclude_predicate(),
+                    size_limit=size_limit,
+                    file_size_limit=file_size_limit,
+                )
+            if parsed.truncated:
+                logger.debug("Diff size budget reached, stopped git early")
+            return parsed
+        except SecurityError:
+            if deadline.expired:
+                raise DeadlineExceeded(
+                    f"Time budget of {deadline.seconds}s exceeded reading the diff"
+                )
+            raise
+        except (GitError, DeadlineExceeded):
+            # Re-raise git and deadline errors as-is
             raise
         except FileNotFoundError:
             raise GitError("Git command not found. Please ensure Git is installed.")
         except Exception as e:
             raise GitError(f"Failed to get staged diff: {e}")
 
+    def _has_staged_changes(self, deadline: Optional[Deadline] = None) -> bool:
+        """Check whether anything is staged, including excluded files."""
+        deadline = deadline or Deadline(None)
+        deadline.check("checking for staged changes")
+        repo_path = sanitize_repo_path(str(self.config.repo_root))
+        result = secure_subprocess_run(
+            ["git", "diff", "--cached", "--quiet"],
+            cwd=repo_path,
+            timeout=deadline.timeout(30),
+            check=False,
+        )
+        return result.returncode == 1
+
     def _process_diff(self, diff: str) -> str:
         """Process and filter the diff content.
 
@@ -232,19 +751,88 @@ class CommitGenerator:
         Returns:
             Processed diff content
         """
-        # Filter out excluded patterns
-        filtered_diff = self._filter_excluded_files(diff)
+        return self._render_diff(self._parse_diff_text(diff))
+
+    def _parse_diff_text(self, diff: str) -> ParsedDiff:
+        """Parse diff text, dropping excluded files.
+
+        Args:
+            diff: Raw git diff output
+
+        Returns:
+            Parsed diff of the included files
+        """
+        return parse_diff(split_lines(diff), exclude=self._exclude_predicate())
+
+    def _render_diff(self, parsed: ParsedDiff) -> str:
+        """Render a parsed diff as prompt text within the size limit.
+
+        With ``truncate_files`` every file keeps its header and its densest
+        hunks within a fair share of the budget; otherwise the diff is cut
+        once at the limit.
+
+        Args:
+            parsed: Parsed diff of the included files
+
+        Returns:
+            Processed diff content
+        """
+        if not self.config.truncate_files:
+            return self._truncate_diff(parsed.text)
+
+        rendered = render_budgeted(
+            parsed, self._diff_size_limit(), self.config.max_file_lines
+        )
+        # File headers alone can still exceed the budget on very wide commits
+        return self._truncate_diff(rendered)
+
+    def _truncate_diff(self, diff: str) -> str:
+        """Truncate a filtered diff to the size limit.
+
+        Args:
+            diff: Filtered git diff content
+
+        Returns:
+            Diff content within the size limit
+        """
+        # Large diffs are summarized later instead of cut at the prompt budget
+        size_limit = self._diff_size_limit()
 
         # Truncate if too large
-        if len(filtered_diff) > self.config.max_diff_size:
+        if len(diff) > size_limit:
             logger.debug(
-                f"Diff size ({len(filtered_diff)}) exceeds limit ({self.config.max_diff_size}), truncating"
-            )
-            filtered_diff = (
-                filtered_diff[: self.config.max_diff_size] + "\n... [truncated]"
+                f"Diff size ({len(diff)}) exceeds limit ({size_limit}), truncating"
             )
+            diff = diff[:size_limit] + "\n... [truncated]"
+
+        return diff
 
-        return filtered_diff
+    def _diff_size_limit(self) -> int:
+        """Get the number of diff characters kept before truncating."""
+        if self.config.summarize_enabled:
+            return max(self._prompt_diff_budget(), self.config.summarize_max_input_size)
+        return self._prompt_diff_budget()
+
+    def _prompt_diff_budget(self) -> int:
+        """Get the number of diff characters that fit in one prompt.
+
+        In ``tokens`` mode the prompt is filled up to the model's context
+        window (or ``max_prompt_tokens``), leaving room for the template and
+        the answer; otherwise ``max_diff_size`` characters are used. Either
+        way the diff never exceeds ``max_diff_size``, the security cap.
+        """
+        if self.config.budget_unit != "tokens":
+            return self.config.max_diff_size
+
+        model = self.config.model
+        target = self.config.context_window - self.config.reserve_output_tokens
+        if self.config.max_prompt_tokens:
+            target = min(target, self.config.max_prompt_tokens)
+
+        # Keep a margin for the estimator's error
+        target = int(target * TOKEN_SAFETY_MARGIN)
+        overhead = estimate_tokens(self._build_prompt(""), model)
+        return min(tokens_to_chars(target - overhead, model), self.config.max_diff_size)
 
     def _filter_excluded_files(self, diff: str) -> str:
         """Filter out files matching exclude patterns.
@@ -255,30 +843,13 @@ class CommitGenerator:
         Returns:
             Filtered diff content
         """
-        if not self.config.exclude_patterns:
-            return diff
-
-        lines = diff.split("\n")
-        filtered_lines = []
-        current_file = None
-        skip_file = False
-
-        for line in lines:
-            # Check for file headers
-            if line.startswith("diff --git"):
-                # Extract filename from diff header
-                match = re.search(r"diff --git a/(.*?) b/", line)
-                if match:
-                    current_file = match.group(1)
-                    skip_file = self._should_exclude_file(current_file)
-                else:
-                    skip_file = False
+        return self._parse_diff_text(diff).text
 
-            # Include line if not skipping current file
-            if not skip_file:
-                filtered_lines.append(line)
-
-        return "\n".join(filtered_lines)
+    def _exclude_predicate(self) -> Optional[Callable[[str], bool]]:
+        """Get the file exclusion check, or None when nothing is excluded."""
+        if not self.config.exclude_patterns:
+            return None
+        return self._should_exclude_file
 
     def _should_exclude_file(self, filename: str) -> bool:
         """Check if a file should be excluded based on patterns.
@@ -289,74 +860,455 @@ class CommitGenerator:
         Returns:
             True if file should be excluded
         """
-        for pattern in self.config.exclude_patterns:
-            if fnmatch.fnmatch(filename, pattern):
-                logger.debug(f"Excluding file {filename} (matches pattern {pattern})")
-                return True
+        if self.config.exclude_matcher.matches(filename):
+            logger.debug(f"Excluding file {filename}")
+            return True
         return False
 
-    def _generate_with_ai(self, diff: str) -> str:
+    def _generate_with_ai(
+        self,
+        diff: str,
+        deadline: Optional[Deadline] = None,
+        scope: Optional[str] = None,
+    ) -> str:
         """Generate commit message using AI API.
 
+        Retrying failed requests is left to the client; the prompt is only sent
+        again when the model's answer fails validation and cannot be repaired.
+
         Args:
             diff: Processed git diff content
+            deadline: Time budget shared by all API requests
+            scope: Scope inferred from past commits, suggested in the prompt
 
         Returns:
             Generated commit message
 
         Raises:
             APIError: If AI generation fails after all retries
+            DeadlineExceeded: If the budget is spent before a request is sent
         """
+        deadline = deadline or Deadline(None)
+        client = self._get_client()
+
+        # Replace diffs too large for one prompt with per-file summaries
+        if len(diff) > self._prompt_diff_budget() and self.config.summarize_enabled:
+            deadline.check("summarizing the diff")
+            diff = self._summarize_diff(diff, deadline)
+
         # Build prompt
-        prompt = self._build_prompt(diff)
+        prompt = self._build_prompt(diff, scope)
+
+        # Ask again only when the answer is invalid; transport errors were
+        # already retried by the client within its deadline
+        for attempt in range(self.config.max_retries + 1):
+            deadline.check("sending the prompt")
+            try:
+                if self.config.hedge_enabled:
+                    message = self._ask_hedged(prompt, deadline)
+                else:
+                    message = self._ask(client, prompt, deadline)
+            except APIError as e:
+                logger.error(f"AI generation failed: {e}")
+                return self.config.default_message
+
+            if message:
+                return message
+            logger.warning(f"No valid message on attempt {attempt + 1}")
+
+        logger.error("No generated message passed validation")
+        return self.config.default_message
+
+    def _ask(
+        self,
+        client: APIClient,
+        prompt: str,
+        deadline: Deadline,
+        tracker: Optional[LatencyTracker] = None,
+    ) -> Optional[str]:
+        """Send the prompt to one provider and clean and validate the answer.
+
+        Args:
+            client: API client to ask
+            prompt: Prompt to send
+            deadline: Time budget for the request
+            tracker: Records the request latency if given
+
+        Returns:
+            Valid commit message, or None if the answer failed validation
+
+        Raises:
+            APIError: If the request fails
+        """
+        start = time.monotonic()
+        message = client.generate_commit_message(
+            prompt,
+            timeout=deadline.remaining(),
+            stop=first_line_stop(self.config.max_chars),
+        )
+        if tracker:
+            tracker.record(client.provider, time.monotonic() - start)
+        return self._accept_message(client.provider, message)
+
+    def _accept_message(self, provider: str, message: str) -> Optional[str]:
+        """Clean and validate a provider's answer, repairing near misses.
+
+        Answers that fail validation are repaired locally when possible (see
+        ``MessageValidator.repair``), so only answers beyond repair cost
+        another request. Unsafe answers are never repaired and count as
+        invalid.
+
+        Args:
+            provider: Provider that answered
+            message: Raw answer
+
+        Returns:
+            Valid commit message, or None if the answer failed validation
+        """
+        validator = self._validator
+        result = validator.check(message)
+        if result.valid:
+            return result.message
+        if not result.safe:
+            logger.warning(f"Unsafe message from {provider}: {result.error}")
+            return None
+
+        repaired = validator.repair(message)
+        if repaired.valid:
+            logger.info(f"Repaired message from {provider}: {repaired.message}")
+            return repaired.message
+        logger.warning(f"Message from {provider} failed validation: {result.message}")
+        return None
+
+    def _ask_hedged(self, prompt: str, deadline: Deadline) -> Optional[str]:
+        """Ask the primary provider, hedging with backups when it is slow.
+
+        Backup providers are asked once the primary has taken longer than the
+        configured percentile of its recorded latencies; the first valid
+        answer wins.
+
+        Args:
+            prompt: Prompt to send
+            deadline: Time budget for all requests
+
+        Returns:
+            Valid commit message, or None if no answer was valid
+
+        Raises:
+            APIError: If every request fails
+        """
+        tracker = LatencyTracker.load(self.config.latency_file)
+        delay = tracker.delay(
+            self.config.provider,
+            self.config.hedge_percentile,
+            self.config.hedge_initial_delay,
+            self.config.hedge_min_samples,
+        )
+        logger.debug(f"Hedging after {delay:.2f}s")
+
+        calls = [
+            functools.partial(self._ask, client, prompt, deadline, tracker)
+            for client in [self._get_client(), *self._get_hedge_clients()]
+        ]
+        try:
+            return race(calls, delay, timeout=deadline.remaining())
+        finally:
+            tracker.save()
+
+    def _get_cache(self) -> Optional[MessageCache]:
+        """Get the message cache, or None if caching is disabled."""
+        if not (self.use_cache and self.config.cache_enabled):
+            return None
+        return MessageCache(
+            self.config.cache_dir,
+            max_entries=self.config.cache_max_entries,
+            max_age_days=self.config.cache_max_age_days,
+        )
+
+    def _cache_key(self, diff: str, scope: Optional[str] = None) -> str:
+        """Build the cache key for a processed diff under the current settings.
+
+        Args:
+            diff: Processed git diff content
+            scope: Scope suggested in the prompt, if any
+
+        Returns:
+            Cache key
+        """
+        return MessageCache.make_key(
+            diff,
+            self.config.get_prompt_template(),
+            self.config.provider,
+            self.config.model,
+            self.config.commit_types,
+            scopes=self.config.commit_scopes,
+            max_chars=self.config.max_chars,
+            scope=scope,
+        )
+
+    def _cached_message(
+        self, processed_diff: str, scope: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Look up a message generated earlier for the same diff and settings.
+
+        Args:
+            processed_diff: Filtered and truncated diff
+            scope: Scope suggested in the prompt, if any
+
+        Returns:
+            Cache key (None if caching is disabled) and the cached message,
+            or None on a miss
+        """
+        cache = self._get_cache()
+        if cache is None:
+            return None, None
+        cache_key = self._cache_key(processed_diff, scope)
+        return cache_key, cache.get(cache_key)
+
+    def _keep_message(
+        self, cache_key: Optional[str], message: str, suggestion: Optional[Suggestion]
+    ) -> str:
+        """Cache a generated message, or fall back if generation failed.
+
+        Args:
+            cache_key: Key from ``_cached_message``, None if caching is disabled
+            message: Generated message, the default message on failure
+            suggestion: Local message used instead of the default message
+
+        Returns:
+            Commit message
+        """
+        if message == self.config.default_message:
+            return self._fallback_message(suggestion)
+        cache = self._get_cache()
+        if cache is not None and cache_key is not None:
+            cache.put(cache_key, message)
+        return message
 
-        # Create API client
-        client = create_client(
-            provider=self.config.provider,
-            api_key=self.config.api_key,
-            model=self.config.model,
+    def _get_client(self) -> APIClient:
+        """Get the API client, creating it on first use.
+
+        The client is kept for the lifetime of the generator, and its HTTP
+        session is shared process-wide, so repeated generations reuse open
+        connections.
+
+        Returns:
+            Configured API client
+        """
+        if self._client is None:
+            self._client = self._create_client(self.config.provider)
+        return self._client
+
+    def _get_hedge_clients(self) -> List[APIClient]:
+        """Get the backup provider clients used for hedged requests."""
+        if self._hedge_clients is None:
+            self._hedge_clients = [
+                self._create_client(provider)
+                for provider in self.config.hedge_providers
+            ]
+        return self._hedge_clients
+
+    def _create_client(self, provider: str) -> APIClient:
+        """Create an API client for a provider with the configured settings."""
+        keys = self.config.api_keys_for(provider)
+        key_pool = get_key_pool(
+            provider,
+            keys,
+            rate_limiter_for=functools.partial(self._rate_limiter, provider),
+            cooldown=self.config.key_cooldown,
+            auth_cooldown=self.config.key_auth_cooldown,
+        )
+        return create_client(
+            provider=provider,
+            api_key=keys[0],
+            model=self.config.model_for(provider),
             max_retries=self.config.max_retries,
             retry_delay=self.config.retry_delay,
+            pool_size=self.config.pool_size,
+            max_retry_delay=self.config.max_retry_delay,
+            deadline=self.config.retry_deadline,
+            stream=self.config.stream,
+            key_pool=key_pool,
         )
 
-        # Try to generate message with retries
-        last_error = None
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                message = client.generate_commit_message(prompt)
+    def _rate_limiter(self, provider: str, api_key: str) -> Optional[RateLimiter]:
+        """Get the shared quota of a provider API key, if rate limiting is on."""
+        if not self.config.rate_limit_enabled:
+            return None
+        return get_limiter(
+            provider,
+            api_key,
+            requests_per_minute=self.config.requests_per_minute,
+            tokens_per_minute=self.config.tokens_per_minute,
+            state_dir=self.config.rate_limit_dir,
+        )
 
-                # Clean and validate message
-                cleaned_message = self._clean_message(message)
-                if self._validate_message(cleaned_message):
-                    return cleaned_message
-                else:
-                    logger.warning(
-                        f"Generated message failed validation: {cleaned_message}"
-                    )
+    def _get_async_clients(self) -> List["AsyncAPIClient"]:
+        """Get async clients for the primary and any hedge providers.
+
+        They wrap the blocking clients, sharing their request building,
+        response parsing and retry policy.
+
+        Returns:
+            Async clients, primary provider first
+        """
+        # Imported here: httpx is optional and slow to import
+        from .async_clients import AsyncAPIClient
+
+        if self._async_clients is None:
+            clients = [self._get_client()]
+            if self.config.hedge_enabled:
+                clients += self._get_hedge_clients()
+            self._async_clients = [
+                AsyncAPIClient(client, self.config.max_concurrency)
+                for client in clients
+            ]
+        return self._async_clients
+
+    async def _agenerate_with_ai(
+        self,
+        diff: str,
+        deadline: Optional[Deadline] = None,
+        scope: Optional[str] = None,
+    ) -> str:
+        """Async version of ``_generate_with_ai``.
 
+        Args:
+            diff: Processed git diff content
+            deadline: Time budget shared by all API requests
+            scope: Scope inferred from past commits, suggested in the prompt
+
+        Returns:
+            Generated commit message
+
+        Raises:
+            DeadlineExceeded: If the budget is spent before a request is sent
+        """
+        deadline = deadline or Deadline(None)
+        clients = self._get_async_clients()
+
+        # Replace diffs too large for one prompt with per-file summaries
+        if len(diff) > self._prompt_diff_budget() and self.config.summarize_enabled:
+            deadline.check("summarizing the diff")
+            summary = await self._summarizer(clients[0]).asummarize(diff, deadline)
+            diff = self._fit_summary(summary)
+
+        prompt = self._build_prompt(diff, scope)
+
+        for attempt in range(self.config.max_retries + 1):
+            deadline.check("sending the prompt")
+            try:
+                message = await self._aask_hedged(clients, prompt, deadline)
             except APIError as e:
-                last_error = e
-                logger.warning(f"API attempt {attempt + 1} failed: {e}")
-                if attempt < self.config.max_retries:
-                    logger.info(f"Retrying in {self.config.retry_delay} seconds...")
-                    import time
+                logger.error(f"AI generation failed: {e}")
+                return self.config.default_message
 
-                    time.sleep(self.config.retry_delay)
+            if message:
+                return message
+            logger.warning(f"No valid message on attempt {attempt + 1}")
 
-        # If all attempts failed, return fallback message
-        logger.error(f"All AI generation attempts failed. Last error: {last_error}")
+        logger.error("No generated message passed validation")
         return self.config.default_message
 
-    def _build_prompt(self, diff: str) -> str:
+    async def _aask(
+        self,
+        client: "AsyncAPIClient",
+        prompt: str,
+        deadline: Deadline,
+        tracker: Optional[LatencyTracker] = None,
+    ) -> Optional[str]:
+        """Async version of ``_ask``."""
+        start = time.monotonic()
+        message = await client.generate_commit_message(
+            prompt,
+            timeout=deadline.remaining(),
+            stop=first_line_stop(self.config.max_chars),
+        )
+        if tracker:
+            tracker.record(client.provider, time.monotonic() - start)
+        return self._accept_message(client.provider, message)
+
+    async def _aask_hedged(
+        self, clients: List["AsyncAPIClient"], prompt: str, deadline: Deadline
+    ) -> Optional[str]:
+        """Ask the primary async client, hedging with backups when enabled.
+
+        Args:
+            clients: Async clients, primary provider first
+            prompt: Prompt to send
+            deadline: Time budget for all requests
+
+        Returns:
+            Valid commit message, or None if no answer was valid
+
+        Raises:
+            APIError: If every request fails
+        """
+        if len(clients) == 1:
+            return await self._aask(clients[0], prompt, deadline)
+
+        tracker = LatencyTracker.load(self.config.latency_file)
+        delay = tracker.delay(
+            self.config.provider,
+            self.config.hedge_percentile,
+            self.config.hedge_initial_delay,
+            self.config.hedge_min_samples,
+        )
+        calls = [
+            functools.partial(self._aask, client, prompt, deadline, tracker)
+            for client in clients
+        ]
+        try:
+            return await arace(calls, delay, timeout=deadline.remaining())
+        finally:
+            tracker.save()
+
+    def _summarize_diff(self, diff: str, deadline: Optional[Deadline] = None) -> str:
+        """Summarize a large diff chunk by chunk with concurrent API calls.
+
+        Args:
+            diff: Filtered git diff content
+            deadline: Time budget shared by all summary requests
+
+        Returns:
+            Per-file summaries to use in place of the diff
+        """
+        summary = self._summarizer(self._get_client()).summarize(diff, deadline)
+        return self._fit_summary(summary)
+
+    def _summarizer(self, client: Any) -> DiffSummarizer:
+        """Create a diff summarizer with the configured limits."""
+        return DiffSummarizer(
+            client,
+            max_workers=self.config.summarize_max_workers,
+            chunk_size=self.config.summarize_chunk_size,
+            max_chunks=self.config.summarize_max_chunks,
+        )
+
+    def _fit_summary(self, summary: str) -> str:
+        """Cut a summary to the prompt budget."""
+        # The summary itself must still fit the prompt budget
+        budget = self._prompt_diff_budget()
+        if len(summary) > budget:
+            summary = summary[:budget] + "\n... [truncated]"
+        return summary
+
+    def _build_prompt(self, diff: str, scope: Optional[str] = None) -> str:
         """Build the prompt for AI generation.
 
         Args:
             diff: Git diff content
+            scope: Scope inferred from past commits, if any
 
         Returns:
             Formatted prompt string
         """
         template = self.config.get_prompt_template()
+        scope_hint = (
+            f' Past commits changing these files used the scope "{scope}".'
+            if scope
+            else ""
+        )
 
         # Format template with configuration values
         return template.format(
@@ -364,8 +1316,14 @@ class CommitGenerator:
             max_chars=self.config.max_chars,
             types=", ".join(self.config.commit_types),
             scopes=", ".join(self.config.commit_scopes),
+            scope_hint=scope_hint,
         )
 
+    @property
+    def _validator(self) -> MessageValidator:
+        """Get the message validator compiled for the configuration."""
+        return get_validator(tuple(self.config.commit_types), self.config.max_chars)
+
     def _clean_message(self, message: str) -> str:
         """Clean and normalize the generated message with security validation.
 
@@ -378,49 +1336,10 @@ class CommitGenerator:
         Raises:
             SecurityError: If message contains suspicious content
         """
-        if not message or not isinstance(message, str):
-            raise SecurityError("Invalid message input")
-
-        # Remove leading/trailing whitespace
-        message = message.strip()
-
-        # Take only the first line
-        message = message.split("\n")[0]
-
-        # Remove quotes if present
-        message = message.strip("\"'")
-
-        # Security validation - check for suspicious patterns
-        suspicious_patterns = [
-            r'<script',
-            r'javascript:',
-            r'data:',
-            r'vbscript:',
-            r'onload=',
-            r'onerror=',
-            r'\x00',  # Null bytes
-            r'\.\./',  # Path traversal
-            r'\\\\',   # UNC paths
-            r'[;&|`$]',  # Command injection characters
-        ]
-
-        for pattern in suspicious_patterns:
-            if re.search(pattern, message, re.IGNORECASE):
-                logger.warning(f"Suspicious pattern detected in message: {pattern}")
-                raise SecurityError(f"Message contains suspicious content")
-
-        # Remove potentially dangerous characters
-        message = re.sub(r'[^\w\s\(\)\:\-\.\,\!]', '', message)
-
-        # Validate length constraints
-        if len(message) < 5:
-            raise SecurityError("Message too short (minimum 5 characters)")
-
-        # Ensure it doesn't exceed max length
-        if len(message) > self.config.max_chars:
-            message = message[:self.config.max_chars].rstrip()
-
-        return message
+        result = self._validator.check(message)
+        if not result.safe:
+            raise SecurityError(result.error)
+        return result.message
 
     def _validate_message(self, message: str) -> bool:
         """Validate the generated commit message.
@@ -431,14 +1350,4 @@ class CommitGenerator:
         Returns:
             True if message is valid
         """
-        if not message or len(message) < 5:
-            return False
-
-        # Check if it follows conventional commit format using configured types
-        types_pattern = "|".join(self.config.commit_types)
-        pattern = rf"^({types_pattern})(\(.+\))?: .+"
-        if not re.match(pattern, message):
-            logger.debug(f"Message doesn't match conventional commit format: {message}")
-            return False
-
-        return True
+        return self._validator.validate(message).valid
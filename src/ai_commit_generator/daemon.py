@@ -0,0 +1,509 @@
+"""Long-lived local daemon for fast commit message generation.
+
+Every commit normally starts a fresh ``smart-commits-ai generate`` process,
+which imports the whole CLI stack, re-parses ``.commitgen.yml`` and opens a
+new TLS connection before the API call even starts. The daemon keeps a warm
+Config, CommitGenerator and HTTP session for one repository and serves
+generation requests over a Unix domain socket.
+
+The Git hook talks to the daemon through the thin client in this module and
+falls back to the regular in-process path when no daemon is running.
+
+Example:
+    python -m ai_commit_generator.daemon serve /path/to/repo
+    python -m ai_commit_generator.daemon client .git/COMMIT_EDITMSG
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
+
+if TYPE_CHECKING:
+    from .core import CommitGenerator
+
+logger = logging.getLogger(__name__)
+
+SOCKET_NAME = "smart-commits-ai.sock"
+PID_NAME = "smart-commits-ai.pid"
+
+# Unix socket paths are limited to ~108 bytes on Linux and 104 on macOS
+MAX_SOCKET_PATH = 100
+
+# Largest request or response accepted over the socket
+MAX_MESSAGE_SIZE = 64 * 1024
+
+# Exit code used by the client when the daemon cannot serve the request,
+# telling the hook to fall back to the in-process path (EX_TEMPFAIL)
+EXIT_UNAVAILABLE = 75
+
+
+class DaemonError(Exception):
+    """Daemon-related errors."""
+
+    pass
+
+
+class DaemonUnavailable(DaemonError):
+    """Raised when no daemon is listening for a repository."""
+
+    pass
+
+
+def socket_path(repo_root: Path) -> Path:
+    """Get the Unix socket path used by the daemon for a repository.
+
+    The socket lives inside ``.git`` when the path is short enough, otherwise
+    in a per-user directory (see ``private_socket_dir``) under a name derived
+    from the repository path.
+
+    Args:
+        repo_root: Root directory of the Git repository
+
+    Returns:
+        Socket path
+    """
+    candidate = repo_root / ".git" / SOCKET_NAME
+    if len(str(candidate).encode("utf-8")) <= MAX_SOCKET_PATH:
+        return candidate
+
+    digest = hashlib.sha256(str(repo_root).encode("utf-8")).hexdigest()[:16]
+    return private_socket_dir() / f"{digest}.sock"
+
+
+def _uid() -> Optional[int]:
+    """Get the current user ID, or None where the platform has none."""
+    return os.getuid() if hasattr(os, "getuid") else None
+
+
+def private_socket_dir() -> Path:
+    """Get the per-user directory for sockets that do not fit in ``.git``.
+
+    It lives in the shared temporary directory, so the path the Git hook was
+    installed with does not depend on the environment; ``ensure_private_dir``
+    keeps other users out of it.
+    """
+    return Path(tempfile.gettempdir()) / f"smart-commits-ai-{_uid() or 0}"
+
+
+def ensure_private_dir(path: Path) -> None:
+    """Create a directory only the current user can access, or verify it.
+
+    Args:
+        path: Directory path
+
+    Raises:
+        DaemonError: If the directory exists but belongs to another user or
+            is accessible to others
+    """
+    try:
+        path.mkdir(mode=0o700, exist_ok=True)
+        stat = os.lstat(path)
+    except OSError as e:
+        raise DaemonError(f"Cannot create socket directory {path}: {e}")
+    uid = _uid()
+    if uid is None:
+        return
+    if not os.path.isdir(path) or os.path.islink(path) or stat.st_uid != uid:
+        raise DaemonError(f"Socket directory {path} belongs to another user")
+    if stat.st_mode & 0o077:
+        raise DaemonError(f"Socket directory {path} is accessible to other users")
+
+
+def check_socket_owner(path: Path) -> None:
+    """Make sure a socket was created by the current user before using it.
+
+    Another local user could otherwise create the socket first and receive
+    the staged diffs.
+
+    Args:
+        path: Daemon socket path
+
+    Raises:
+        DaemonUnavailable: If the socket is missing or owned by another user
+    """
+    try:
+        stat = os.lstat(path)
+    except OSError as e:
+        raise DaemonUnavailable(f"Daemon not reachable at {path}: {e}")
+    uid = _uid()
+    if uid is not None and stat.st_uid != uid:
+        raise DaemonUnavailable(f"Daemon socket {path} belongs to another user")
+
+
+def pid_path(repo_root: Path) -> Path:
+    """Get the PID file path used by the daemon for a repository."""
+    return repo_root / ".git" / PID_NAME
+
+
+def _find_repo_root() -> Path:
+    """Find the Git repository root directory."""
+    current = Path.cwd().resolve()
+    while current != current.parent:
+        if (current / ".git").exists():
+            return current
+        current = current.parent
+    raise DaemonError("Not in a Git repository")
+
+
+def send_request(
+    path: Path, payload: Dict[str, Any], timeout: Optional[float] = 60.0
+) -> Dict[str, Any]:
+    """Send a single JSON request to the daemon and return its response.
+
+    Args:
+        path: Daemon socket path
+        payload: Request payload
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Decoded response payload
+
+    Raises:
+        DaemonUnavailable: If the daemon cannot be reached
+        DaemonError: If the response is malformed
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix sockets are not supported on this platform")
+    check_socket_owner(path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(str(path))
+        except OSError as e:
+            raise DaemonUnavailable(f"Daemon not reachable at {path}: {e}")
+
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+
+        chunks = []
+        received = 0
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+            if received > MAX_MESSAGE_SIZE:
+                raise DaemonError("Daemon response too large")
+            if chunk.endswith(b"\n"):
+                break
+    except socket.timeout:
+        raise DaemonError("Timed out waiting for daemon")
+    except OSError as e:
+        raise DaemonUnavailable(f"Daemon connection failed: {e}")
+    finally:
+        sock.close()
+
+    try:
+        response = json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError as e:
+        raise DaemonError(f"Invalid daemon response: {e}")
+
+    if not isinstance(response, dict):
+        raise DaemonError("Invalid daemon response")
+    return response
+
+
+def request_generation(repo_root: Path, timeout: Optional[float] = 60.0) -> str:
+    """Ask the daemon to generate a commit message for staged changes.
+
+    Args:
+        repo_root: Root directory of the Git repository
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Generated commit message (empty for merge commits or no changes)
+
+    Raises:
+        DaemonUnavailable: If no daemon is running for the repository
+        DaemonError: If the daemon failed to generate a message
+    """
+    response = send_request(socket_path(repo_root), {"action": "generate"}, timeout)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "Unknown daemon error"))
+    return str(response.get("message", ""))
+
+
+def is_running(repo_root: Path) -> bool:
+    """Check whether a daemon is serving the repository."""
+    try:
+        return bool(
+            send_request(socket_path(repo_root), {"action": "ping"}, 2.0).get("ok")
+        )
+    except DaemonError:
+        return False
+
+
+def stop_daemon(repo_root: Path) -> bool:
+    """Ask the daemon serving the repository to shut down.
+
+    Returns:
+        True if a daemon was running and acknowledged the request
+    """
+    try:
+        response = send_request(socket_path(repo_root), {"action": "shutdown"}, 5.0)
+    except DaemonError:
+        return False
+    return bool(response.get("ok"))
+
+
+def start_daemon(
+    repo_root: Path, idle_timeout: Optional[int] = None, wait: float = 5.0
+) -> int:
+    """Start a detached daemon for the repository.
+
+    Args:
+        repo_root: Root directory of the Git repository
+        idle_timeout: Seconds of inactivity before the daemon exits
+        wait: Seconds to wait for the daemon to start accepting requests
+
+    Returns:
+        PID of the daemon process
+
+    Raises:
+        DaemonError: If a daemon is already running or fails to start
+    """
+    if is_running(repo_root):
+        raise DaemonError("Daemon is already running for this repository")
+
+    cmd = [sys.executable, "-m", "ai_commit_generator.daemon", "serve", str(repo_root)]
+    if idle_timeout is not None:
+        cmd += ["--idle-timeout", str(idle_timeout)]
+
+    process = subprocess.Popen(
+        cmd,
+        cwd=repo_root,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        shell=False,
+    )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if is_running(repo_root):
+            return process.pid
+        if process.poll() is not None:
+            raise DaemonError(
+                f"Daemon exited during startup (code {process.returncode})"
+            )
+        time.sleep(0.05)
+
+    raise DaemonError("Daemon did not start in time")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle a single JSON request on the daemon socket."""
+
+    def handle(self) -> None:
+        line = self.rfile.readline(MAX_MESSAGE_SIZE + 1)
+        try:
+            if len(line) > MAX_MESSAGE_SIZE:
+                raise DaemonError("Request too large")
+            request = json.loads(line.decode("utf-8"))
+            if not isinstance(request, dict):
+                raise DaemonError("Request must be a JSON object")
+            server = cast(_UnixServer, self.server)
+            response = server.commit_daemon.dispatch(request)
+        except Exception as e:
+            logger.warning(f"Daemon request failed: {e}")
+            response = {"ok": False, "error": str(e)}
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server that hands requests to its daemon."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, commit_daemon: "CommitDaemon"):
+        super().__init__(path, _RequestHandler)
+        self.commit_daemon = commit_daemon
+
+
+class CommitDaemon:
+    """Serve commit message generation for one repository over a Unix socket."""
+
+    def __init__(self, repo_root: Path, idle_timeout: Optional[int] = None):
+        """Initialize the daemon.
+
+        Args:
+            repo_root: Root directory of the Git repository
+            idle_timeout: Seconds of inactivity before exiting. If None, uses
+                the ``daemon.idle_timeout`` configuration value.
+        """
+        self.repo_root = repo_root.resolve()
+        self.socket_path = socket_path(self.repo_root)
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._generator: Optional["CommitGenerator"] = None
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._last_activity = time.monotonic()
+        self._server: Optional[_UnixServer] = None
+
+    def _config_signature(self) -> Tuple[Any, ...]:
+        """Get a cheap fingerprint of the files the configuration is built from."""
+        signature: List[Optional[Tuple[int, int]]] = []
+        for name in (".commitgen.yml", ".env"):
+            try:
+                stat = (self.repo_root / name).stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _get_generator(self) -> "CommitGenerator":
+        """Get the warm generator, rebuilding it if the configuration changed."""
+        signature = self._config_signature()
+        if self._generator is None or signature != self._signature:
+            from .config import Config
+            from .core import CommitGenerator
+
+            logger.info("Loading configuration for daemon")
+            self._generator = CommitGenerator(Config(repo_root=self.repo_root))
+            self._signature = signature
+        return self._generator
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a decoded request.
+
+        Args:
+            request: Request payload with an ``action`` key
+
+        Returns:
+            Response payload
+        """
+        self._last_activity = time.monotonic()
+        action = request.get("action")
+
+        if action == "ping":
+            return {"ok": True, "pid": os.getpid()}
+
+        if action == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+
+        if action == "generate":
+            with self._lock:
+                message = self._get_generator().generate_commit_message()
+            return {"ok": True, "message": message}
+
+        raise DaemonError(f"Unknown action: {action}")
+
+    def _remove_stale_socket(self) -> None:
+        """Remove a leftover socket file, refusing if a daemon still answers."""
+        if not self.socket_path.exists():
+            return
+        if is_running(self.repo_root):
+            raise DaemonError("Daemon is already running for this repository")
+        self.socket_path.unlink()
+
+    def _watch_idle(self) -> None:
+        """Shut the server down after the idle timeout elapses."""
+        while self._server is not None:
+            idle = time.monotonic() - self._last_activity
+            if self.idle_timeout and idle > self.idle_timeout:
+                logger.info("Daemon idle timeout reached, shutting down")
+                self.shutdown()
+                return
+            time.sleep(1.0)
+
+    def serve_forever(self) -> None:
+        """Bind the socket and serve requests until shut down."""
+        # Load configuration up front so the first commit is already warm
+        generator = self._get_generator()
+        if self.idle_timeout is None:
+            self.idle_timeout = generator.config.daemon_idle_timeout
+
+        if self.socket_path.parent != self.repo_root / ".git":
+            ensure_private_dir(self.socket_path.parent)
+        self._remove_stale_socket()
+
+        # Only the owner may talk to the daemon
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(str(self.socket_path), self)
+        finally:
+            os.umask(old_umask)
+
+        pid_file = pid_path(self.repo_root)
+        pid_file.write_text(str(os.getpid()), encoding="utf-8")
+
+        threading.Thread(target=self._watch_idle, daemon=True).start()
+        logger.info(f"Daemon listening on {self.socket_path}")
+
+        try:
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self._server.server_close()
+            self._server = None
+            for path in (self.socket_path, pid_file):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def shutdown(self) -> None:
+        """Stop serving requests."""
+        server = self._server
+        if server is not None:
+            server.shutdown()
+
+
+def _client_main(commit_msg_file: str, timeout: float) -> int:
+    """Generate a message through the daemon and write it for Git.
+
+    Returns:
+        Process exit code; ``EXIT_UNAVAILABLE`` tells the hook to fall back
+    """
+    try:
+        message = request_generation(_find_repo_root(), timeout=timeout)
+    except DaemonError as e:
+        print(f"smart-commits-ai daemon: {e}", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+
+    if message:
+        with open(commit_msg_file, "w", encoding="utf-8") as f:
+            f.write(message)
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point for ``python -m ai_commit_generator.daemon``."""
+    parser = argparse.ArgumentParser(prog="python -m ai_commit_generator.daemon")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the daemon")
+    serve_parser.add_argument("repo_root", type=Path)
+    serve_parser.add_argument("--idle-timeout", type=int, default=None)
+
+    client_parser = subparsers.add_parser("client", help="Request a message")
+    client_parser.add_argument("commit_msg_file")
+    client_parser.add_argument("--timeout", type=float, default=60.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "client":
+        return _client_main(args.commit_msg_file, args.timeout)
+
+    CommitDaemon(args.repo_root, idle_timeout=args.idle_timeout).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""End-to-end time budget for generating one commit message.
+
+A developer waits on ``git commit`` while the hook runs, so the whole
+generation (reading the diff, building the prompt and every API attempt)
+shares one deadline. Each stage asks the deadline how long it may take
+instead of using its own fixed timeout, and the generator falls back to the
+default message as soon as the budget is spent.
+
+Example:
+    deadline = Deadline(config.timeout)
+    lines = secure_subprocess_lines(cmd, timeout=deadline.timeout(30))
+    deadline.check("prompt building")
+"""
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """The time budget for generating a message is spent."""
+
+    pass
+
+
+class Deadline:
+    """Point in time by which a generation must finish."""
+
+    __slots__ = ("seconds", "_expires")
+
+    def __init__(self, seconds: Optional[float]):
+        """Start the deadline.
+
+        Args:
+            seconds: Time budget from now, or None for no deadline
+        """
+        self.seconds = seconds
+        self._expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """Get the seconds left, or None if there is no deadline."""
+        if self._expires is None:
+            return None
+        return max(self._expires - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Check if the budget is spent."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self, stage: str) -> None:
+        """Raise if the budget is spent.
+
+        Args:
+            stage: Name of the stage about to run, for the error message
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceeded(
+                f"Time budget of {self.seconds}s exceeded before {stage}"
+            )
+
+    def timeout(self, cap: float) -> float:
+        """Get the timeout for a stage that should not outlive the deadline.
+
+        Args:
+            cap: The stage's own maximum timeout in seconds
+
+        Returns:
+            The smaller of ``cap`` and the remaining time
+        """
+        remaining = self.remaining()
+        return cap if remaining is None else min(cap, remaining)
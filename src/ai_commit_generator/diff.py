@@ -0,0 +1,373 @@
+"""Structured representation of git diff output.
+
+The diff is parsed once, in a single pass over git's output lines, into
+files and hunks with their change type and line statistics. Exclusion,
+truncation, summarization and caching all work on this model instead of
+re-scanning the diff text.
+
+Example:
+    parsed = parse_diff(lines, exclude=matcher.matches, size_limit=4000)
+    for diff_file in parsed.files:
+        print(diff_file.path, diff_file.change_type, diff_file.added)
+"""
+
+import re
+from typing import Callable, Iterable, List, Optional
+
+_HEADER_PREFIX = "diff --git"
+_HEADER_RE = re.compile(r"diff --git a/(.*?) b/")
+
+ADDED = "added"
+DELETED = "deleted"
+MODIFIED = "modified"
+RENAMED = "renamed"
+COPIED = "copied"
+
+
+class DiffHunk:
+    """One ``@@`` hunk of a file diff, as offsets into the file's lines."""
+
+    __slots__ = ("start", "end", "added", "removed")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.end = start + 1
+        self.added = 0
+        self.removed = 0
+
+    @property
+    def changes(self) -> int:
+        """Get the number of added and removed lines."""
+        return self.added + self.removed
+
+    @property
+    def length(self) -> int:
+        """Get the number of lines including the ``@@`` header."""
+        return self.end - self.start
+
+
+class DiffFile:
+    """Diff of a single file."""
+
+    __slots__ = (
+        "path",
+        "old_path",
+        "change_type",
+        "binary",
+        "lines",
+        "hunks",
+        "added",
+        "removed",
+        "size",
+        "elided",
+    )
+
+    def __init__(self, header: str):
+        """Start a file from its ``diff --git`` header line."""
+        match = _HEADER_RE.match(header)
+        # The a/ path is what exclusion has always matched against
+        self.old_path = match.group(1) if match else ""
+        self.path = header[match.end() :].rstrip("\n") if match else ""
+        self.change_type = MODIFIED
+        self.binary = False
+        self.lines = [header]
+        self.hunks: List[DiffHunk] = []
+        self.added = 0
+        self.removed = 0
+        self.size = len(header)
+        # Lines counted in the statistics but not kept (over the file limit)
+        self.elided = 0
+
+    def _append(self, line: str) -> None:
+        """Add the next line of this file's diff."""
+        index = len(self.lines)
+        self.lines.append(line)
+        self.size += len(line)
+
+        if line.startswith("@@"):
+            self.hunks.append(DiffHunk(index))
+            return
+
+        if self.hunks:
+            hunk = self.hunks[-1]
+            hunk.end = index + 1
+            if line.startswith("+"):
+                hunk.added += 1
+                self.added += 1
+            elif line.startswith("-"):
+                hunk.removed += 1
+                self.removed += 1
+            return
+
+        # Extended header lines before the first hunk
+        if line.startswith("new file mode"):
+            self.change_type = ADDED
+        elif line.startswith("deleted file mode"):
+            self.change_type = DELETED
+        elif line.startswith("rename to "):
+            self.change_type = RENAMED
+            self.path = line[len("rename to ") :].rstrip("\n")
+        elif line.startswith("copy to "):
+            self.change_type = COPIED
+            self.path = line[len("copy to ") :].rstrip("\n")
+        elif line.startswith(("Binary files ", "GIT binary patch")):
+            self.binary = True
+
+    def _skip(self, line: str) -> None:
+        """Count a line that is over the file's size limit without keeping it."""
+        self.elided += 1
+        if self.hunks:
+            if line.startswith("+"):
+                self.added += 1
+            elif line.startswith("-"):
+                self.removed += 1
+
+    @property
+    def header_end(self) -> int:
+        """Get the index of the first hunk line (or the end of the file)."""
+        return self.hunks[0].start if self.hunks else len(self.lines)
+
+    @property
+    def header(self) -> str:
+        """Get the file's header lines up to the first hunk."""
+        return "".join(self.lines[: self.header_end])
+
+    @property
+    def text(self) -> str:
+        """Get the file's diff text."""
+        return "".join(self.lines)
+
+    def hunk_text(self, hunk: DiffHunk) -> str:
+        """Get the text of one hunk."""
+        return "".join(self.lines[hunk.start : hunk.end])
+
+
+class ParsedDiff:
+    """Parsed diff made of files, in git's output order."""
+
+    __slots__ = ("preamble", "files", "size", "truncated")
+
+    def __init__(self) -> None:
+        self.preamble: List[str] = []
+        self.files: List[DiffFile] = []
+        self.size = 0
+        self.truncated = False
+
+    @property
+    def text(self) -> str:
+        """Get the diff text of all included files."""
+        return "".join(self.preamble) + "".join(f.text for f in self.files)
+
+    @property
+    def added(self) -> int:
+        """Get the total number of added lines."""
+        return sum(f.added for f in self.files)
+
+    @property
+    def removed(self) -> int:
+        """Get the total number of removed lines."""
+        return sum(f.removed for f in self.files)
+
+    def __bool__(self) -> bool:
+        return bool(self.files or self.preamble)
+
+
+def split_lines(text: str) -> List[str]:
+    """Split diff text into lines that keep their ``\\n`` terminators.
+
+    Unlike ``str.splitlines`` this only breaks on ``\\n``, as git does.
+    """
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def parse_diff(
+    lines: Iterable[str],
+    exclude: Optional[Callable[[str], bool]] = None,
+    size_limit: Optional[int] = None,
+    file_size_limit: Optional[int] = None,
+) -> ParsedDiff:
+    """Parse git diff output in a single pass.
+
+    Args:
+        lines: Diff lines including trailing newlines (e.g. streamed from git)
+        exclude: Predicate on a file's ``a/`` path; matching files are skipped
+        size_limit: Stop consuming ``lines`` once the included files' text
+            read so far exceeds this
+        file_size_limit: Keep at most this much text per file; later lines
+            only count towards the file's statistics
+
+    Returns:
+        Parsed diff
+    """
+    parsed = ParsedDiff()
+    current: Optional[DiffFile] = None
+    skip_file = False
+
+    for line in lines:
+        if line.startswith(_HEADER_PREFIX):
+            current = DiffFile(line)
+            skip_file = bool(exclude and current.old_path and exclude(current.old_path))
+            if skip_file:
+                continue
+            parsed.files.append(current)
+            parsed.size += current.size
+        elif skip_file:
+            continue
+        elif current is None:
+            parsed.preamble.append(line)
+            parsed.size += len(line)
+        elif file_size_limit and current.size + len(line) > file_size_limit:
+            current._skip(line)
+            parsed.size += len(line)
+        else:
+            current._append(line)
+            parsed.size += len(line)
+
+        if size_limit is not None and parsed.size > size_limit:
+            parsed.truncated = True
+            break
+
+    return parsed
+
+
+def _elided_marker(count: int) -> str:
+    """Build the marker that replaces omitted lines."""
+    return f"... [{count} lines elided]\n"
+
+
+def _density(hunk: DiffHunk) -> float:
+    """Get the share of changed lines in a hunk."""
+    return hunk.changes / hunk.length
+
+
+def _select_hunks(
+    diff_file: DiffFile, max_lines: Optional[int], max_chars: Optional[int]
+) -> List[DiffHunk]:
+    """Pick the densest hunks that fit the line and character allowance."""
+    # Densest first, earlier hunks on ties
+    ranked = sorted(diff_file.hunks, key=lambda h: (-_density(h), h.start))
+    chosen = []
+    lines = 0
+    chars = len(diff_file.header)
+    for hunk in ranked:
+        hunk_chars = len(diff_file.hunk_text(hunk))
+        if max_lines is not None and lines + hunk.length > max_lines:
+            continue
+        if max_chars is not None and chars + hunk_chars > max_chars:
+            continue
+        chosen.append(hunk)
+        lines += hunk.length
+        chars += hunk_chars
+    return sorted(chosen, key=lambda h: h.start)
+
+
+def _render_partial(
+    diff_file: DiffFile, max_lines: Optional[int], max_chars: Optional[int]
+) -> str:
+    """Render the start of the densest hunk when no whole hunk fits."""
+    header = diff_file.header
+    hunk = min(diff_file.hunks, key=lambda h: (-_density(h), h.start))
+    end = hunk.end if max_lines is None else min(hunk.end, hunk.start + max_lines)
+    room = None if max_chars is None else max_chars - len(header)
+
+    kept = []
+    used = 0
+    for line in diff_file.lines[hunk.start : end]:
+        if room is not None and used + len(line) > room:
+            break
+        kept.append(line)
+        used += len(line)
+
+    omitted = len(diff_file.lines) - diff_file.header_end - len(kept)
+    omitted += diff_file.elided
+    return header + "".join(kept) + (_elided_marker(omitted) if omitted else "")
+
+
+def render_file(
+    diff_file: DiffFile,
+    max_lines: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """Render a file's diff within a line and character allowance.
+
+    The file header is always kept. Hunks are kept densest first, and every
+    run of omitted lines is replaced by an elided-lines marker.
+
+    Args:
+        diff_file: File to render
+        max_lines: Maximum hunk lines kept
+        max_chars: Character allowance for the rendered file
+
+    Returns:
+        Rendered file diff
+    """
+    chosen = _select_hunks(diff_file, max_lines, max_chars)
+    if not chosen and diff_file.hunks:
+        return _render_partial(diff_file, max_lines, max_chars)
+
+    parts = [diff_file.header]
+    position = diff_file.header_end
+    for hunk in chosen:
+        if hunk.start > position:
+            parts.append(_elided_marker(hunk.start - position))
+        parts.append(diff_file.hunk_text(hunk))
+        position = hunk.end
+
+    omitted = len(diff_file.lines) - position + diff_file.elided
+    if omitted:
+        parts.append(_elided_marker(omitted))
+    return "".join(parts)
+
+
+def fair_shares(needs: List[int], budget: int) -> List[int]:
+    """Split a budget across consumers without giving anyone more than needed.
+
+    Small consumers get everything they need; the rest share what is left
+    equally (water-filling).
+
+    Args:
+        needs: Amount each consumer would use
+        budget: Total amount available
+
+    Returns:
+        Allowance per consumer, in input order
+    """
+    allowances = [0] * len(needs)
+    remaining = budget
+    order = sorted(range(len(needs)), key=needs.__getitem__)
+    for position, index in enumerate(order):
+        share = remaining // (len(order) - position)
+        allowances[index] = min(needs[index], share)
+        remaining -= allowances[index]
+    return allowances
+
+
+def render_budgeted(
+    parsed: ParsedDiff, max_chars: int, max_file_lines: Optional[int] = None
+) -> str:
+    """Render a diff so every file gets a fair share of the character budget.
+
+    Args:
+        parsed: Parsed diff
+        max_chars: Total character budget
+        max_file_lines: Maximum hunk lines kept per file
+
+    Returns:
+        Rendered diff covering every parsed file
+    """
+    files = parsed.files
+    needs = [len(render_file(f, max_file_lines)) for f in files]
+    preamble = "".join(parsed.preamble)
+    allowances = fair_shares(needs, max(max_chars - len(preamble), 0))
+
+    rendered = preamble + "".join(
+        render_file(f, max_file_lines, allowance)
+        for f, allowance in zip(files, allowances)
+    )
+    if parsed.truncated:
+        rendered += "... [truncated]\n"
+    return rendered
@@ -0,0 +1,90 @@
+"""Fast console entry point for the Git hook.
+
+The ``prepare-commit-msg`` hook runs ``smart-commits-ai generate --output
+<file>`` on every commit, so its start-up time is paid on every commit. The
+full CLI imports click, rich and the dependencies of every command before
+doing anything. This entry point recognises the hook's command line and runs
+it with the generation code only; any other command line is handed to the
+full CLI unchanged.
+
+Along the fast path, slow imports are deferred until they are needed: the
+HTTP stack on the first API request (never for cached messages), yaml and
+dotenv only when their files exist, asyncio only for async generation.
+``tests/test_importtime.py`` checks this with ``python -X importtime`` and
+fails when the start-up exceeds ``STARTUP_BUDGET_MS``.
+
+Example:
+    smart-commits-ai generate --output .git/COMMIT_EDITMSG
+    python -m ai_commit_generator.fastpath generate --output "$1"
+"""
+
+import sys
+from typing import List, Optional
+
+# Cumulative import time of this module and the generator, in milliseconds
+STARTUP_BUDGET_MS = 150
+
+# Modules the fast path must not import at start-up
+DEFERRED_MODULES = ("click", "rich", "yaml", "dotenv", "requests", "asyncio")
+
+
+def hook_output(argv: List[str]) -> Optional[str]:
+    """Get the output file if the arguments are the hook's generate command.
+
+    Args:
+        argv: Command-line arguments without the program name
+
+    Returns:
+        Commit message file, or None for any other command line
+    """
+    if len(argv) == 3 and argv[0] == "generate" and argv[1] in ("--output", "-o"):
+        return argv[2]
+    if len(argv) == 2 and argv[0] == "generate" and argv[1].startswith("--output="):
+        return argv[1][len("--output=") :] or None
+    return None
+
+
+def generate(output: str) -> int:
+    """Generate the commit message into a file, like ``generate --output``.
+
+    Args:
+        output: Commit message file
+
+    Returns:
+        Process exit code
+    """
+    print("🤖 Generating AI commit message...")
+    try:
+        from .core import CommitGenerator
+
+        message = CommitGenerator().generate_commit_message(commit_msg_file=output)
+    except Exception as e:
+        print(f"❌ Failed to generate commit message: {e}")
+        return 1
+
+    if message:
+        print(f"✅ Generated message: {message}")
+    else:
+        print("⚠️  No staged changes found or merge commit detected")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the hook's command fast, or any other command with the full CLI.
+
+    Args:
+        argv: Command-line arguments without the program name (default:
+            ``sys.argv[1:]``)
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    output = hook_output(argv)
+    if output is None:
+        from .cli import main as cli_main
+
+        cli_main(args=argv)
+        return
+    sys.exit(generate(output))
+
+
+if __name__ == "__main__":
+    main()
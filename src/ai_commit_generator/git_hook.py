@@ -7,6 +7,8 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from .daemon import socket_path
+
 try:
     # Try modern importlib.resources first
     import importlib.resources as pkg_resources
@@ -129,6 +131,7 @@ class GitHookManager:
         """Generate the Git hook script content."""
         # Try to detect if we're in a virtual environment
         python_cmd = self._get_python_command()
+        daemon_socket = socket_path(self.repo_root)
 
         hook_content = f"""#!/bin/bash
 # Smart Commits AI Git Hook
@@ -141,6 +144,13 @@ if [[ "$2" == "merge" ]]; then
     exit 0
 fi
 
+# Fast path: hand the request to a running smart-commits-ai daemon
+if [[ -S "{daemon_socket}" ]]; then
+    if {python_cmd} -m ai_commit_generator.daemon client "$1"; then
+        exit 0
+    fi
+fi
+
 # Try to run smart-commits-ai command directly
 if command -v smart-commits-ai &> /dev/null; then
     smart-commits-ai generate --output "$1"
@@ -150,7 +160,7 @@ fi
 # Fallback: try the Python module directly
 if command -v {python_cmd} &> /dev/null; then
     if {python_cmd} -c "import ai_commit_generator" &> /dev/null; then
-        {python_cmd} -m ai_commit_generator.cli generate --output "$1"
+        {python_cmd} -m ai_commit_generator.fastpath generate --output "$1"
         exit 0
     fi
 fi
@@ -159,7 +169,7 @@ fi
 for cmd in python3 python; do
     if command -v $cmd &> /dev/null; then
         if $cmd -c "import ai_commit_generator" &> /dev/null; then
-            $cmd -m ai_commit_generator.cli generate --output "$1"
+            $cmd -m ai_commit_generator.fastpath generate --output "$1"
             exit 0
         fi
     fi
@@ -0,0 +1,303 @@
+"""Hedged requests across AI providers.
+
+When the primary provider is slow, every commit waits for it. In hedged mode
+the primary provider is asked first; if it has not answered within a high
+percentile of its recorded latency, the same prompt is sent to a backup
+provider, and so on down the list. The first valid answer wins and the other
+requests are abandoned.
+
+Latencies are recorded per provider in ``.git/`` so the hedge delay adapts
+to each provider's observed behaviour across commits.
+
+Example:
+    tracker = LatencyTracker.load(config.latency_file)
+    delay = tracker.delay("groq", percentile=90, default=2.0)
+    message = race([ask_groq, ask_cohere], delay, timeout=10)
+    message = await arace([aask_groq, aask_cohere], delay, timeout=10)
+"""
+
+import json
+import logging
+import math
+import os
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .api_clients import APIError
+
+logger = logging.getLogger(__name__)
+
+# Latencies kept per provider
+MAX_SAMPLES = 100
+
+
+class LatencyTracker:
+    """Recent request latencies per provider, persisted between runs."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        samples: Optional[Dict[str, List[float]]] = None,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            path: JSON file the latencies are saved to, or None
+            samples: Latencies in seconds by provider
+        """
+        self.path = path
+        self._samples: Dict[str, List[float]] = samples or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "LatencyTracker":
+        """Load recorded latencies, starting empty if none can be read.
+
+        Args:
+            path: JSON file holding the latencies
+
+        Returns:
+            Latency tracker
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        samples = {}
+        if isinstance(data, dict):
+            for provider, values in data.items():
+                if isinstance(values, list):
+                    samples[provider] = [
+                        float(v) for v in values if isinstance(v, (int, float))
+                    ][-MAX_SAMPLES:]
+        return cls(path, samples)
+
+    def record(self, provider: str, seconds: float) -> None:
+        """Record the latency of a completed request.
+
+        Args:
+            provider: Provider name
+            seconds: Time the request took
+        """
+        with self._lock:
+            samples = self._samples.setdefault(provider, [])
+            samples.append(seconds)
+            del samples[:-MAX_SAMPLES]
+
+    def percentile(self, provider: str, percentile: float) -> Optional[float]:
+        """Get a latency percentile for a provider (nearest rank).
+
+        Args:
+            provider: Provider name
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None without samples
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(provider, []))
+        if not samples:
+            return None
+        rank = max(math.ceil(percentile / 100 * len(samples)), 1)
+        return samples[rank - 1]
+
+    def delay(
+        self,
+        provider: str,
+        percentile: float,
+        default: float,
+        min_samples: int = 10,
+    ) -> float:
+        """Get how long to wait for a provider before hedging.
+
+        Args:
+            provider: Provider name
+            percentile: Latency percentile to wait for
+            default: Delay used until enough samples are recorded
+            min_samples: Samples needed before the percentile is trusted
+
+        Returns:
+            Delay in seconds
+        """
+        with self._lock:
+            count = len(self._samples.get(provider, []))
+        if count < min_samples:
+            return default
+        value = self.percentile(provider, percentile)
+        return default if value is None else value
+
+    def save(self) -> None:
+        """Write the latencies to disk, ignoring write errors."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = {name: list(values) for name, values in self._samples.items()}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically so concurrent hooks never read a partial file
+            fd, temp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_name, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save provider latencies: {e}")
+
+
+def race(
+    calls: Sequence[Callable[[], Optional[str]]],
+    delay: float,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """Run calls with staggered starts and return the first valid result.
+
+    The first call starts immediately and each following call starts
+    ``delay`` seconds after the previous one, unless a result arrived first.
+    Calls run in daemon threads, so abandoned requests never keep the
+    process alive.
+
+    Args:
+        calls: Functions returning a valid result, or None for an invalid
+            answer; they may raise APIError
+        delay: Seconds to wait before starting the next call
+        timeout: Seconds to wait in total, or None
+
+    Returns:
+        First valid result, or None if no answer was valid
+
+    Raises:
+        APIError: If no call answered at all, with the last error seen
+    """
+    results: "queue.Queue[Tuple[Optional[str], Optional[Exception]]]" = queue.Queue()
+    expires = None if timeout is None else time.monotonic() + timeout
+
+    def run(call: Callable[[], Optional[str]]) -> None:
+        try:
+            results.put((call(), None))
+        except Exception as e:
+            results.put((None, e))
+
+    started = 0
+    finished = 0
+    invalid = 0
+    last_error: Optional[Exception] = None
+    next_start = time.monotonic()
+
+    while finished < len(calls):
+        now = time.monotonic()
+        if started < len(calls) and now >= next_start:
+            threading.Thread(target=run, args=(calls[started],), daemon=True).start()
+            started += 1
+            next_start = now + delay
+            if started > 1:
+                logger.info(f"Hedging request with backup provider {started - 1}")
+
+        if expires is not None and now >= expires:
+            break
+
+        # Wait for a result, or until the next call is due
+        waits = []
+        if started < len(calls):
+            waits.append(next_start - now)
+        if expires is not None:
+            waits.append(expires - now)
+        wait = max(min(waits), 0) if waits else None
+
+        try:
+            result, error = results.get(timeout=wait)
+        except queue.Empty:
+            continue
+
+        finished += 1
+        if result is not None:
+            return result
+        if error is not None:
+            last_error = error
+        else:
+            invalid += 1
+        # Start the next call right away instead of waiting out the delay
+        next_start = time.monotonic()
+
+    if invalid:
+        return None
+    raise APIError(f"All hedged requests failed: {last_error or 'timed out'}")
+
+
+async def arace(
+    calls: Sequence[Callable[[], Awaitable[Optional[str]]]],
+    delay: float,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """Async version of ``race``; requests that lose the race are cancelled.
+
+    Args:
+        calls: Coroutine functions returning a valid result, or None for an
+            invalid answer; they may raise APIError
+        delay: Seconds to wait before starting the next call
+        timeout: Seconds to wait in total, or None
+
+    Returns:
+        First valid result, or None if no answer was valid
+
+    Raises:
+        APIError: If no call answered at all, with the last error seen
+    """
+    # Imported here: asyncio is slow to import and only needed when async
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    expires = None if timeout is None else loop.time() + timeout
+    pending: "Set[asyncio.Future[Optional[str]]]" = set()
+    started = 0
+    invalid = 0
+    last_error: Optional[Exception] = None
+    next_start = loop.time()
+
+    try:
+        while started < len(calls) or pending:
+            now = loop.time()
+            if started < len(calls) and (now >= next_start or not pending):
+                pending.add(asyncio.ensure_future(calls[started]()))
+                started += 1
+                next_start = now + delay
+                if started > 1:
+                    logger.info(f"Hedging request with backup provider {started - 1}")
+
+            if expires is not None and now >= expires:
+                break
+
+            # Wait for a result, or until the next call is due
+            waits = []
+            if started < len(calls):
+                waits.append(next_start - now)
+            if expires is not None:
+                waits.append(expires - now)
+            wait = max(min(waits), 0) if waits else None
+
+            done, pending = await asyncio.wait(
+                pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if result is not None:
+                    return result
+                invalid += 1
+            if done:
+                # Start the next call right away instead of waiting out the delay
+                next_start = loop.time()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if invalid:
+        return None
+    raise APIError(f"All hedged requests failed: {last_error or 'timed out'}")
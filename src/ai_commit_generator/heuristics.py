@@ -0,0 +1,389 @@
+"""Local commit messages for trivial changes.
+
+Many commits only touch documentation, lockfiles, tests or CI files, or only
+rename files. Their message follows from the list of changed files, so it
+can be written offline in well under a millisecond instead of a provider
+round trip. ``classify`` inspects the file list (``git diff --cached
+--name-status -M``) and suggests a conventional message built from the
+configured types and scopes, with a confidence between 0 and 1.
+
+The ``heuristics.mode`` setting decides how suggestions are used:
+
+- ``api``: never (the default)
+- ``local``: a suggestion at least ``min_confidence`` confident is used
+  without calling the API; otherwise it replaces the default message
+  when the API fails
+- ``fallback``: the API is always asked; a suggestion only replaces the
+  default message when the API fails
+
+Example:
+    changes = parse_name_status(output)
+    suggestion = classify(changes, ["docs", "chore"], [], max_chars=72)
+    print(suggestion.message, suggestion.confidence)  # "docs: update README.md" 0.9
+"""
+
+import posixpath
+import re
+from typing import List, Optional, Sequence
+
+from .diff import ADDED, COPIED, DELETED, RENAMED, ParsedDiff
+from .patterns import PathMatcher
+
+HEURISTICS_MODES = ("api", "local", "fallback")
+
+# File categories, checked in order; files in none of them are code.
+# Patterns match the whole path, where ``*`` also matches ``/``.
+CATEGORY_PATTERNS = {
+    "lock": [
+        "*package-lock.json",
+        "*npm-shrinkwrap.json",
+        "*yarn.lock",
+        "*pnpm-lock.yaml",
+        "*poetry.lock",
+        "*Pipfile.lock",
+        "*uv.lock",
+        "*Cargo.lock",
+        "*Gemfile.lock",
+        "*composer.lock",
+        "*go.sum",
+    ],
+    "ci": [
+        ".github/workflows/*",
+        ".gitlab-ci.yml",
+        ".circleci/*",
+        ".travis.yml",
+        "azure-pipelines.yml",
+        "Jenkinsfile",
+    ],
+    "docs": [
+        "*.md",
+        "*.rst",
+        "*.adoc",
+        "docs/*",
+        "doc/*",
+        "*README*",
+        "*CHANGELOG*",
+        "*LICENSE*",
+        "*CONTRIBUTING*",
+    ],
+    "test": [
+        "tests/*",
+        "test/*",
+        "*/tests/*",
+        "*/test/*",
+        "spec/*",
+        "*/__tests__/*",
+    ],
+}
+
+# Patterns matched against the file name only, so that "latest_results.py"
+# is not a test file
+CATEGORY_NAME_PATTERNS = {
+    "test": [
+        "test_*.py",
+        "*_test.py",
+        "*_test.go",
+        "*.test.[jt]s*",
+        "*.spec.[jt]s*",
+    ],
+}
+
+# Dependency manifests, updated together with their lockfiles
+MANIFEST_PATTERNS = [
+    "*package.json",
+    "*requirements*.txt",
+    "*pyproject.toml",
+    "*Pipfile",
+    "*Cargo.toml",
+    "*Gemfile",
+    "*composer.json",
+    "*go.mod",
+]
+
+# Commit type and description noun per category
+CATEGORY_TYPES = {
+    "lock": ("build", "deps", "dependency lockfiles"),
+    "ci": ("ci", None, "CI configuration"),
+    "docs": ("docs", None, "documentation"),
+    "test": ("test", None, "tests"),
+}
+
+# Characters allowed in a file name quoted in a message
+_SAFE_NAME_RE = re.compile(r"^[\w.\-]+$")
+
+_STATUS_BY_CHANGE_TYPE = {ADDED: "A", DELETED: "D", RENAMED: "R", COPIED: "C"}
+
+_CATEGORY_MATCHERS = {
+    category: PathMatcher(patterns) for category, patterns in CATEGORY_PATTERNS.items()
+}
+_CATEGORY_NAME_MATCHERS = {
+    category: PathMatcher(patterns)
+    for category, patterns in CATEGORY_NAME_PATTERNS.items()
+}
+_MANIFEST_MATCHER = PathMatcher(MANIFEST_PATTERNS)
+
+
+class FileChange:
+    """A changed file, as listed by ``git diff --name-status``."""
+
+    __slots__ = ("status", "path", "old_path", "similarity")
+
+    def __init__(
+        self,
+        status: str,
+        path: str,
+        old_path: Optional[str] = None,
+        similarity: Optional[int] = None,
+    ):
+        """Initialize a change.
+
+        Args:
+            status: Status letter (A, C, D, M, R or T)
+            path: Path after the change
+            old_path: Path before a rename or copy
+            similarity: Percentage of unchanged content of a rename or copy
+        """
+        self.status = status
+        self.path = path
+        self.old_path = old_path or path
+        self.similarity = similarity
+
+    @property
+    def pure_rename(self) -> bool:
+        """Check if the file was renamed without changing its content."""
+        return self.status == "R" and self.similarity == 100
+
+
+class Suggestion:
+    """A locally generated commit message."""
+
+    __slots__ = ("message", "confidence", "rule")
+
+    def __init__(self, message: str, confidence: float, rule: str):
+        """Initialize a suggestion.
+
+        Args:
+            message: Conventional commit message
+            confidence: Likelihood that the message is appropriate, 0 to 1
+            rule: Name of the rule that produced the message
+        """
+        self.message = message
+        self.confidence = confidence
+        self.rule = rule
+
+    def __repr__(self) -> str:
+        return f"Suggestion({self.message!r}, {self.confidence}, {self.rule!r})"
+
+
+def parse_name_status(output: str) -> List[FileChange]:
+    """Parse ``git diff --name-status -M -z`` output.
+
+    Args:
+        output: NUL-separated status letters and paths
+
+    Returns:
+        Changed files in git's order
+    """
+    fields = output.split("\0")
+    changes = []
+    i = 0
+    while i + 1 < len(fields) and fields[i]:
+        status = fields[i]
+        similarity = int(status[1:]) if status[1:].isdigit() else None
+        if status[0] in "RC" and i + 2 < len(fields):
+            changes.append(
+                FileChange(status[0], fields[i + 2], fields[i + 1], similarity)
+            )
+            i += 3
+        else:
+            changes.append(FileChange(status[0], fields[i + 1]))
+            i += 2
+    return changes
+
+
+def changes_from_diff(parsed: ParsedDiff) -> List[FileChange]:
+    """List the changed files of a parsed diff.
+
+    Renames without hunks are taken as pure renames.
+
+    Args:
+        parsed: Parsed diff, including excluded files
+
+    Returns:
+        Changed files in diff order
+    """
+    changes = []
+    for diff_file in parsed.files:
+        status = _STATUS_BY_CHANGE_TYPE.get(diff_file.change_type, "M")
+        similarity = 100 if status == "R" and not diff_file.hunks else None
+        changes.append(
+            FileChange(status, diff_file.path, diff_file.old_path, similarity)
+        )
+    return changes
+
+
+def categorize(path: str) -> Optional[str]:
+    """Get the category of a file path.
+
+    Args:
+        path: Repository-relative path
+
+    Returns:
+        Category name, or None for code
+    """
+    name = posixpath.basename(path)
+    for category, matcher in _CATEGORY_MATCHERS.items():
+        name_matcher = _CATEGORY_NAME_MATCHERS.get(category)
+        if matcher.matches(path) or (name_matcher and name_matcher.matches(name)):
+            return category
+    return None
+
+
+def _describe(changes: Sequence[FileChange], noun: str) -> str:
+    """Describe the changed files by name, directory or count."""
+    names = {posixpath.basename(change.path) for change in changes}
+    if len(names) == 1:
+        name = names.pop()
+        if _SAFE_NAME_RE.match(name):
+            return name
+    directories = {posixpath.dirname(change.path) for change in changes}
+    if len(directories) == 1:
+        directory = posixpath.basename(directories.pop())
+        if directory and _SAFE_NAME_RE.match(directory):
+            return f"{noun} in {directory}"
+    return noun
+
+
+def _verb(changes: Sequence[FileChange]) -> str:
+    """Get the verb describing the kind of change of all files."""
+    statuses = {change.status for change in changes}
+    if statuses == {"A"}:
+        return "add"
+    if statuses == {"D"}:
+        return "remove"
+    return "update"
+
+
+def _rename_suggestion(changes: Sequence[FileChange]) -> Suggestion:
+    """Describe files renamed or moved without content changes."""
+    if len(changes) == 1:
+        change = changes[0]
+        old_dir, old_name = posixpath.split(change.old_path)
+        new_dir, new_name = posixpath.split(change.path)
+        if old_dir == new_dir and _SAFE_NAME_RE.match(old_name + new_name):
+            return Suggestion(
+                f"refactor: rename {old_name} to {new_name}", 0.9, "rename"
+            )
+    new_dirs = {posixpath.dirname(change.path) for change in changes}
+    target = posixpath.basename(new_dirs.pop()) if len(new_dirs) == 1 else ""
+    files = "file" if len(changes) == 1 else f"{len(changes)} files"
+    if target and _SAFE_NAME_RE.match(target):
+        return Suggestion(f"refactor: move {files} to {target}", 0.85, "rename")
+    return Suggestion(f"refactor: move {files}", 0.8, "rename")
+
+
+def _category_suggestion(
+    changes: Sequence[FileChange], categories: List[Optional[str]]
+) -> Optional[Suggestion]:
+    """Describe changes confined to one category of files."""
+    kinds = set(categories)
+    if kinds <= {"lock", None} and "lock" in kinds:
+        # Lockfiles with their manifests: a dependency update
+        if all(
+            category == "lock" or _MANIFEST_MATCHER.matches(change.path)
+            for change, category in zip(changes, categories)
+        ):
+            confidence = 0.95 if kinds == {"lock"} else 0.75
+            return Suggestion(
+                "build(deps): update dependencies", confidence, "dependencies"
+            )
+    if len(kinds) != 1:
+        return None
+    category = kinds.pop()
+    if category is None:
+        return None
+
+    commit_type, scope, noun = CATEGORY_TYPES[category]
+    description = f"{_verb(changes)} {_describe(changes, noun)}"
+    prefix = f"{commit_type}({scope})" if scope else commit_type
+    confidence = 0.9 if len(changes) == 1 else 0.85
+    if category == "test":
+        # New test files are usually added together with the code they test
+        confidence -= 0.1
+    return Suggestion(f"{prefix}: {description}", confidence, category)
+
+
+def _generic_suggestion(changes: Sequence[FileChange]) -> Suggestion:
+    """Describe any other changes, with low confidence."""
+    verb = _verb(changes)
+    commit_type = {"add": "feat", "remove": "refactor"}.get(verb, "chore")
+    noun = "1 file" if len(changes) == 1 else f"{len(changes)} files"
+    description = _describe(changes, noun)
+    confidence = 0.4 if verb != "update" else 0.3
+    return Suggestion(f"{commit_type}: {verb} {description}", confidence, "generic")
+
+
+def _conform(
+    suggestion: Suggestion,
+    commit_types: Sequence[str],
+    commit_scopes: Sequence[str],
+    max_chars: int,
+    scope: Optional[str] = None,
+) -> Optional[Suggestion]:
+    """Fit a suggestion to the configured types, scopes and length."""
+    match = re.match(r"(\w+)(?:\((\w+)\))?: (.*)", suggestion.message)
+    if not match:
+        return None
+    commit_type, rule_scope, description = match.groups()
+    confidence = suggestion.confidence
+
+    if commit_type not in commit_types:
+        if "chore" in commit_types:
+            commit_type = "chore"
+        elif commit_types:
+            commit_type = commit_types[0]
+        else:
+            return None
+        confidence *= 0.5
+    if rule_scope in commit_scopes:
+        # Scopes implied by the kind of change win over inferred ones
+        scope = rule_scope
+
+    prefix = f"{commit_type}({scope})" if scope else commit_type
+    message = f"{prefix}: {description}"
+    if len(message) > max_chars:
+        return None
+    return Suggestion(message, round(confidence, 2), suggestion.rule)
+
+
+def classify(
+    changes: Sequence[FileChange],
+    commit_types: Sequence[str],
+    commit_scopes: Sequence[str] = (),
+    max_chars: int = 72,
+    scope: Optional[str] = None,
+) -> Optional[Suggestion]:
+    """Suggest a conventional commit message for a list of changed files.
+
+    Args:
+        changes: Changed files
+        commit_types: Allowed commit types
+        commit_scopes: Allowed commit scopes
+        max_chars: Maximum message length
+        scope: Scope inferred for the files (see scope_index.py), if any
+
+    Returns:
+        Suggested message, or None if nothing changed or no message fits
+    """
+    if not changes:
+        return None
+
+    if all(change.pure_rename for change in changes):
+        suggestion = _rename_suggestion(changes)
+    else:
+        categories = [categorize(change.path) for change in changes]
+        suggestion = _category_suggestion(changes, categories) or _generic_suggestion(
+            changes
+        )
+
+    return _conform(suggestion, commit_types, commit_scopes, max_chars, scope)
@@ -0,0 +1,291 @@
+"""Regenerate commit messages for existing history.
+
+Imported repositories often carry commits with placeholder messages such as
+``chore: update files``. The history rewriter walks a revision range,
+generates a conventional message for each commit and writes a mapping file
+that a ``git filter-repo`` step applies; history itself is never rewritten
+here.
+
+All diffs come from a single streamed ``git log -p`` process instead of one
+git process per commit, and messages are generated concurrently with a
+bounded number of requests in flight. Commits are read only as fast as
+workers free up, so a large range is never held in memory.
+
+The mapping file doubles as the checkpoint: every finished commit is
+appended as one JSON line as soon as it is done, and a rerun skips the
+commits already recorded, so an interrupted run resumes where it stopped.
+
+Example:
+    rewriter = HistoryRewriter(config, max_workers=4)
+    stats = rewriter.run("v1.0..main", Path("history.jsonl"))
+
+    # Then, in git filter-repo:
+    message = load_mapping("history.jsonl").get(commit.original_id.decode())
+"""
+
+import contextlib
+import functools
+import json
+import logging
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from .config import Config
+from .core import (
+    CommitGenerator,
+    GitError,
+    exclude_pathspecs,
+    sanitize_repo_path,
+    secure_subprocess_lines,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+# Seconds allowed for streaming the whole range out of git
+LOG_TIMEOUT = 3600
+
+# Starts every commit header in the log output; never appears in a diff
+_COMMIT_MARKER = "\x00"
+
+
+class HistoryCommit:
+    """A commit of the range, with its diff."""
+
+    __slots__ = ("sha", "subject", "diff")
+
+    def __init__(self, sha: str, subject: str, diff: str):
+        self.sha = sha
+        self.subject = subject
+        self.diff = diff
+
+
+def parse_log(lines: Iterable[str], max_diff_size: int) -> Iterator[HistoryCommit]:
+    """Split ``git log -p`` output into commits.
+
+    Args:
+        lines: Output lines of ``git log -p`` with the history format
+        max_diff_size: Diff characters kept per commit; the rest is skipped
+
+    Yields:
+        Commits in log order
+    """
+    sha: Optional[str] = None
+    subject = ""
+    diff: List[str] = []
+    size = 0
+
+    for line in lines:
+        if line.startswith(_COMMIT_MARKER):
+            if sha is not None:
+                yield HistoryCommit(sha, subject, "".join(diff))
+            sha, _, subject = line[1:].rstrip("\n").partition(" ")
+            diff = []
+            size = 0
+        elif sha is not None and size < max_diff_size and (diff or line.strip()):
+            diff.append(line)
+            size += len(line)
+
+    if sha is not None:
+        yield HistoryCommit(sha, subject, "".join(diff))
+
+
+def read_mapping(path: Path) -> Dict[str, Optional[str]]:
+    """Read a mapping file, ignoring a partially written last line.
+
+    Args:
+        path: JSON Lines mapping file
+
+    Returns:
+        New message by commit SHA; None for commits left unchanged
+    """
+    mapping: Dict[str, Optional[str]] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and isinstance(entry.get("commit"), str):
+                    mapping[entry["commit"]] = entry.get("message")
+    except FileNotFoundError:
+        pass
+    return mapping
+
+
+def _ends_with_newline(path: Path) -> bool:
+    """Check if a non-empty file ends with a newline."""
+    with open(path, "rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
+
+
+@functools.lru_cache(maxsize=None)
+def load_mapping(path: str) -> Dict[str, str]:
+    """Get the new messages of a mapping file, for ``git filter-repo``.
+
+    The file is read once per process, so calling this from a commit
+    callback for every commit stays cheap.
+
+    Args:
+        path: JSON Lines mapping file
+
+    Returns:
+        New message by commit SHA, for the commits to reword
+    """
+    return {sha: msg for sha, msg in read_mapping(Path(path)).items() if msg}
+
+
+class HistoryRewriter:
+    """Generate new messages for the commits of a revision range."""
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        max_workers: int = DEFAULT_WORKERS,
+        use_cache: bool = True,
+    ):
+        """Initialize the rewriter.
+
+        Args:
+            config: Configuration object. If None, will create from current
+                directory.
+            max_workers: Maximum number of messages generated at once
+            use_cache: If False, bypass the message cache
+        """
+        self.config = config or Config()
+        self.max_workers = max_workers
+        self.generator = CommitGenerator(self.config, use_cache=use_cache)
+
+    def commits(self, revision_range: str) -> Iterator[HistoryCommit]:
+        """Stream the commits of a range with their diffs, oldest first.
+
+        Merge commits are skipped, like in the commit hook.
+
+        Args:
+            revision_range: Revision range, e.g. ``v1.0..main``
+
+        Yields:
+            Commits of the range
+
+        Raises:
+            GitError: If the range is invalid or git fails
+        """
+        if not revision_range or revision_range.startswith("-"):
+            raise GitError(f"Invalid revision range: {revision_range!r}")
+
+        repo_path = sanitize_repo_path(str(self.config.repo_root))
+        cmd = [
+            "git",
+            "log",
+            "-p",
+            "--reverse",
+            "--no-merges",
+            "--no-color",
+            "--no-ext-diff",
+            "--format=%x00%H %s",
+            revision_range,
+            "--",
+        ]
+        # Let git skip excluded files; the generator filters the rest
+        cmd += exclude_pathspecs(self.config.exclude_patterns)
+
+        lines = secure_subprocess_lines(cmd, cwd=repo_path, timeout=LOG_TIMEOUT)
+        with contextlib.closing(lines):
+            yield from parse_log(lines, self.config.max_read_size)
+
+    def run(
+        self,
+        revision_range: str,
+        mapping_file: Path,
+        match: Optional[str] = None,
+        on_result: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict[str, int]:
+        """Generate messages for a range, resuming from the mapping file.
+
+        Args:
+            revision_range: Revision range, e.g. ``v1.0..main``
+            mapping_file: JSON Lines file the results are appended to
+            match: Only reword commits whose subject matches this regex
+            on_result: Callback receiving every result record
+
+        Returns:
+            Counts of ``done``, ``skipped`` (already in the mapping file or
+            not matching), ``default`` (the generator fell back to the
+            default message) and ``failed`` commits. Neither of the last two
+            is written to the mapping file, so a rerun asks again.
+
+        Raises:
+            GitError: If the range is invalid or git fails
+        """
+        self.config.validate()
+        pattern = re.compile(match) if match else None
+        finished: Set[str] = set(read_mapping(mapping_file))
+        if finished:
+            logger.info(f"Resuming, {len(finished)} commits already done")
+
+        stats = {"done": 0, "skipped": 0, "default": 0, "failed": 0}
+        mapping_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(mapping_file, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as pool:
+            if out.tell() and not _ends_with_newline(mapping_file):
+                # Terminate a line cut off by an interruption
+                out.write("\n")
+            pending: Set["Future[Optional[Dict[str, Optional[str]]]]"] = set()
+
+            def collect(
+                futures: Iterable["Future[Optional[Dict[str, Optional[str]]]]"],
+            ) -> None:
+                for future in futures:
+                    record = future.result()
+                    # Neither is checkpointed, so a rerun asks again
+                    if record is None:
+                        stats["failed"] += 1
+                        continue
+                    if record["message"] == self.config.default_message:
+                        stats["default"] += 1
+                    else:
+                        out.write(json.dumps(record) + "\n")
+                        out.flush()
+                        stats["done"] += 1
+                    if on_result:
+                        on_result(record)
+
+            for commit in self.commits(revision_range):
+                if commit.sha in finished or (
+                    pattern and not pattern.search(commit.subject)
+                ):
+                    stats["skipped"] += 1
+                    continue
+
+                # Bound the commits held in memory to the work in flight
+                if len(pending) >= self.max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(self._generate, commit))
+
+            collect(wait(pending).done)
+        return stats
+
+    def _generate(self, commit: HistoryCommit) -> Optional[Dict[str, Optional[str]]]:
+        """Generate the new message of one commit.
+
+        Args:
+            commit: Commit with its diff
+
+        Returns:
+            Mapping record, or None if generation failed; the message is None
+            when nothing is left to describe after filtering
+        """
+        try:
+            message = self.generator.generate_from_diff(commit.diff) or None
+        except Exception as e:
+            logger.warning(f"Could not generate message for {commit.sha}: {e}")
+            return None
+        return {"commit": commit.sha, "original": commit.subject, "message": message}
@@ -0,0 +1,195 @@
+"""Pools of API keys per provider.
+
+Bots sharing a single API key serialize on its quota. With several keys
+(``GROQ_API_KEYS=key1,key2,...``) every request attempt picks a key from the
+provider's pool, so throughput grows with the number of keys:
+
+- Keys are picked least recently throttled first, and least recently used
+  among equals, which spreads load round-robin while all keys are healthy.
+- A key answered with HTTP 429 rests for its ``Retry-After`` (or a default
+  cooldown); a key rejected with HTTP 401 or 403 rests much longer, and the
+  attempt is retried with another key.
+- Each key keeps its own rate limiter (see ratelimit.py).
+
+Pools are shared per provider and key set by every client of the process.
+
+Example:
+    pool = get_key_pool("groq", ["key1", "key2"])
+    key = pool.choose()
+    ...
+    pool.report(key, response.status_code, retry_after)
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .ratelimit import RateLimiter, key_id
+
+logger = logging.getLogger(__name__)
+
+# Seconds a key rests after HTTP 429 without a Retry-After header
+DEFAULT_COOLDOWN = 60
+
+# Seconds a key rests after being rejected (HTTP 401 or 403)
+DEFAULT_AUTH_COOLDOWN = 3600
+
+AUTH_FAILURE_CODES = frozenset({401, 403})
+
+
+class PooledKey:
+    """An API key of a pool, with its health and rate limiter."""
+
+    __slots__ = (
+        "key",
+        "rate_limiter",
+        "throttled_at",
+        "cooldown_until",
+        "last_used",
+    )
+
+    def __init__(self, key: str, rate_limiter: Optional[RateLimiter] = None):
+        """Initialize a healthy key.
+
+        Args:
+            key: API key
+            rate_limiter: Quota of the key, or None to send without waiting
+        """
+        self.key = key
+        self.rate_limiter = rate_limiter
+        self.throttled_at = 0.0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+
+    @property
+    def key_id(self) -> str:
+        """Get a fingerprint of the key that is safe to log."""
+        return key_id(self.key)
+
+
+class KeyPool:
+    """API keys of one provider, assigned to request attempts."""
+
+    def __init__(
+        self,
+        keys: Sequence[PooledKey],
+        cooldown: float = DEFAULT_COOLDOWN,
+        auth_cooldown: float = DEFAULT_AUTH_COOLDOWN,
+    ):
+        """Initialize the pool.
+
+        Args:
+            keys: Keys of the pool, in order of preference
+            cooldown: Seconds a key rests after HTTP 429 without Retry-After
+            auth_cooldown: Seconds a key rests after HTTP 401 or 403
+
+        Raises:
+            ValueError: If no keys are given
+        """
+        if not keys:
+            raise ValueError("A key pool needs at least one key")
+        self.keys: List[PooledKey] = list(keys)
+        self.cooldown = cooldown
+        self.auth_cooldown = auth_cooldown
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def choose(self) -> PooledKey:
+        """Pick the key for the next request attempt.
+
+        Returns:
+            The least recently throttled healthy key, or the key whose
+            cooldown ends first if all keys are resting
+        """
+        with self._lock:
+            now = time.monotonic()
+            healthy = [key for key in self.keys if key.cooldown_until <= now]
+            if healthy:
+                chosen = min(healthy, key=lambda k: (k.throttled_at, k.last_used))
+            else:
+                chosen = min(self.keys, key=lambda k: k.cooldown_until)
+            chosen.last_used = now
+            return chosen
+
+    def has_healthy(self) -> bool:
+        """Check if any key is available without waiting for a cooldown."""
+        now = time.monotonic()
+        with self._lock:
+            return any(key.cooldown_until <= now for key in self.keys)
+
+    def report(
+        self, key: PooledKey, status: int, retry_after: Optional[float] = None
+    ) -> None:
+        """Record the outcome of a request made with a key.
+
+        Args:
+            key: Key the request was made with
+            status: HTTP status code of the response
+            retry_after: Parsed ``Retry-After`` header, if any
+        """
+        if status != 429 and status not in AUTH_FAILURE_CODES:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if status == 429:
+                key.throttled_at = now
+                rest = self.cooldown if retry_after is None else retry_after
+            else:
+                rest = self.auth_cooldown
+            key.cooldown_until = max(key.cooldown_until, now + rest)
+        if len(self.keys) > 1:
+            logger.warning(
+                f"API key {key.key_id} answered {status}, resting for {rest:.0f}s"
+            )
+
+
+# Pools shared by the process, keyed by (provider, key fingerprints)
+_pools: Dict[Tuple[str, Tuple[str, ...]], KeyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_key_pool(
+    provider: str,
+    keys: Sequence[str],
+    rate_limiter_for: Optional[Callable[[str], Optional[RateLimiter]]] = None,
+    cooldown: float = DEFAULT_COOLDOWN,
+    auth_cooldown: float = DEFAULT_AUTH_COOLDOWN,
+) -> KeyPool:
+    """Get the process-wide pool of a provider's keys.
+
+    The first call for a key set decides its settings; later calls share the
+    same pool and key health.
+
+    Args:
+        provider: Provider name
+        keys: API keys, in order of preference
+        rate_limiter_for: Factory of the rate limiter of a key, or None
+        cooldown: Seconds a key rests after HTTP 429 without Retry-After
+        auth_cooldown: Seconds a key rests after HTTP 401 or 403
+
+    Returns:
+        Shared key pool
+    """
+    pool_key = (provider, tuple(key_id(key) for key in keys))
+    with _pools_lock:
+        pool = _pools.get(pool_key)
+        if pool is None:
+            pool = KeyPool(
+                [
+                    PooledKey(key, rate_limiter_for(key) if rate_limiter_for else None)
+                    for key in keys
+                ],
+                cooldown=cooldown,
+                auth_cooldown=auth_cooldown,
+            )
+            _pools[pool_key] = pool
+        return pool
+
+
+def reset_key_pools() -> None:
+    """Forget all shared key pools (e.g. after the configuration changed)."""
+    with _pools_lock:
+        _pools.clear()
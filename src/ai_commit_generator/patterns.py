@@ -0,0 +1,135 @@
+"""Compiled matching of file paths against exclude patterns.
+
+Exclude patterns use ``fnmatch`` semantics, where ``*`` also matches ``/``
+(so ``*.lock`` excludes lockfiles at any depth), extended with two
+gitignore-style features:
+
+- ``**/`` matches zero or more leading directories (``**/fixtures/*``)
+- a leading ``!`` re-includes paths excluded by an earlier pattern; as in
+  ``.gitignore``, the last matching pattern wins
+
+All patterns are compiled into a handful of combined regular expressions
+once, so matching a path is a single regex call instead of one ``fnmatch``
+call per pattern.
+
+Example:
+    matcher = PathMatcher(["*.lock", "dist/*", "!dist/keep.js"])
+    matcher.matches("frontend/yarn.lock")  # True
+    matcher.matches("dist/keep.js")  # False
+"""
+
+import os
+import re
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+
+def translate_pattern(pattern: str) -> str:
+    """Translate an exclude pattern into a regular expression.
+
+    Args:
+        pattern: fnmatch-style pattern, optionally using ``**``
+
+    Returns:
+        Regular expression source matching the whole path
+    """
+    i, n = 0, len(pattern)
+    parts = []
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char == "*":
+            if pattern.startswith("*/", i) and (i == 1 or pattern[i - 2] == "/"):
+                # "**/" spans zero or more whole directories
+                parts.append("(?:.*/)?")
+                i += 2
+            else:
+                while i < n and pattern[i] == "*":
+                    i += 1
+                parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        elif char == "[":
+            end = i
+            if end < n and pattern[end] == "!":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            while end < n and pattern[end] != "]":
+                end += 1
+            if end >= n:
+                # Unclosed bracket is a literal, as in fnmatch
+                parts.append("\\[")
+                continue
+            stuff = pattern[i:end].replace("\\", "\\\\")
+            i = end + 1
+            if stuff.startswith("!"):
+                stuff = "^" + stuff[1:]
+            elif stuff.startswith(("^", "[")):
+                stuff = "\\" + stuff
+            parts.append(f"[{stuff}]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+class PathMatcher:
+    """Match paths against a list of exclude patterns in one regex pass."""
+
+    __slots__ = ("patterns", "_segments", "_flags")
+
+    def __init__(self, patterns: Sequence[str]):
+        """Compile the patterns.
+
+        Args:
+            patterns: Exclude patterns; a leading ``!`` negates a pattern
+        """
+        self.patterns = tuple(patterns)
+        # fnmatch follows the platform's case rules
+        self._flags = re.DOTALL
+        if os.path.normcase("A") == "a":
+            self._flags |= re.IGNORECASE
+
+        # Consecutive patterns with the same sign are merged into one regex
+        self._segments: List[Tuple[bool, Pattern[str]]] = []
+        group: List[str] = []
+        negated: Optional[bool] = None
+        for pattern in self.patterns:
+            is_negated = pattern.startswith("!")
+            body = pattern[1:] if is_negated else pattern
+            if not body:
+                continue
+            if negated is not None and is_negated != negated:
+                self._add_segment(negated, group)
+                group = []
+            negated = is_negated
+            group.append(translate_pattern(body))
+        if group and negated is not None:
+            self._add_segment(negated, group)
+
+    def _add_segment(self, negated: bool, regexes: List[str]) -> None:
+        """Compile one run of same-sign patterns."""
+        combined = "|".join(f"(?:{regex})" for regex in regexes)
+        self._segments.append((negated, re.compile(f"(?:{combined})\\Z", self._flags)))
+
+    @property
+    def has_negation(self) -> bool:
+        """Check if any pattern re-includes paths."""
+        return any(negated for negated, _ in self._segments)
+
+    def matches(self, path: str) -> bool:
+        """Check whether a path is excluded.
+
+        Args:
+            path: Repository-relative file path
+
+        Returns:
+            True if the last matching pattern excludes the path
+        """
+        # Later patterns win, so the last matching segment decides
+        for negated, regex in reversed(self._segments):
+            if regex.match(path):
+                return not negated
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self._segments)
@@ -0,0 +1,406 @@
+"""Client-side rate limiting of provider requests.
+
+Providers limit each API key to a number of requests and tokens per minute.
+Sending blindly and retrying on HTTP 429 wastes requests and time, and
+batch jobs keep bouncing off the limit. A ``RateLimiter`` instead spaces
+requests out so they stay under the quota:
+
+- Two token buckets, one for requests and one for tokens, refill at the
+  configured rates per minute.
+- Rate-limit response headers (remaining quota and time until reset) are
+  learned, so the client never assumes more quota than the provider reports,
+  even without configured limits.
+- A 429 blocks further requests until its ``Retry-After`` has passed.
+
+Limiters are shared per provider and API key by every thread and async task
+of the process (see ``get_limiter``). With a state file they are also shared
+between processes, e.g. concurrent git hooks and batch jobs, through an
+``fcntl`` file lock; where ``fcntl`` is unavailable the state stays local to
+the process.
+
+Example:
+    limiter = get_limiter("groq", api_key, requests_per_minute=30)
+    waited = limiter.acquire(tokens=1200, timeout=10)
+    ...
+    limiter.observe(response.headers)
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:  # pragma: no cover - Windows
+    HAS_FCNTL = False
+
+logger = logging.getLogger(__name__)
+
+# Wait after a 429 without a Retry-After header, in seconds
+DEFAULT_PENALTY = 1.0
+
+# Reset durations such as "1m2.5s", "59.6s" or "120ms"
+_DURATION_RE = re.compile(
+    r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?"
+    r"(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?$"
+)
+
+# Header name suffixes of the request and token quotas; the plain
+# ``x-ratelimit-remaining`` form (OpenRouter) counts requests
+_QUOTAS = {"requests": ("-requests", ""), "tokens": ("-tokens",)}
+
+
+def parse_reset(value: Optional[str], now: float) -> Optional[float]:
+    """Parse a rate-limit reset header into seconds from now.
+
+    Accepts durations (``"7.66s"``, ``"2m59.56s"``, ``"120ms"``), plain
+    seconds, and Unix timestamps in seconds or milliseconds.
+
+    Args:
+        value: Header value
+        now: Current Unix time
+
+    Returns:
+        Seconds until the quota resets, or None if missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        match = _DURATION_RE.match(value)
+        if not match or not any(match.groups()):
+            return None
+        hours, minutes, seconds, millis = (float(g or 0) for g in match.groups())
+        return hours * 3600 + minutes * 60 + seconds + millis / 1000
+    if number > 1e12:  # Timestamp in milliseconds
+        return max(number / 1000 - now, 0.0)
+    if number > 1e9:  # Timestamp in seconds
+        return max(number - now, 0.0)
+    return max(number, 0.0)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """Get a numeric header value, or None."""
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Quota of one kind (requests or tokens) for one API key.
+
+    The bucket is reservation based: taking more than is available drives
+    the level negative and returns how long the caller must wait, so callers
+    queue up in order instead of all waking at the same time.
+    """
+
+    __slots__ = ("rate", "capacity", "level", "updated", "remaining", "reset_at")
+
+    def __init__(self, per_minute: Optional[float] = None, now: Optional[float] = None):
+        """Initialize a full bucket.
+
+        Args:
+            per_minute: Configured quota per minute, or None to rely only on
+                learned response headers
+            now: Current Unix time
+        """
+        self.rate = per_minute / 60 if per_minute else None
+        self.capacity = per_minute or 0.0
+        self.level = per_minute or 0.0
+        self.updated = time.time() if now is None else now
+        # Quota reported by the provider until reset_at
+        self.remaining: Optional[float] = None
+        self.reset_at: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        if self.rate is not None and now > self.updated:
+            self.level = min(
+                self.capacity, self.level + (now - self.updated) * self.rate
+            )
+        self.updated = max(self.updated, now)
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.reset_at = None
+
+    def take(self, amount: float, now: float) -> float:
+        """Reserve quota.
+
+        Args:
+            amount: Quota needed
+            now: Current Unix time
+
+        Returns:
+            Seconds to wait before the reservation may be used
+        """
+        self._refill(now)
+        wait = 0.0
+        if self.rate is not None:
+            # A single request larger than the bucket could never fit
+            self.level -= min(amount, self.capacity)
+            if self.level < 0:
+                wait = -self.level / self.rate
+        if self.remaining is not None and self.reset_at is not None:
+            self.remaining -= amount
+            if self.remaining < 0:
+                wait = max(wait, self.reset_at - now)
+        return wait
+
+    def give_back(self, amount: float) -> None:
+        """Return quota reserved by a request that was never sent."""
+        if self.rate is not None:
+            self.level = min(self.capacity, self.level + min(amount, self.capacity))
+        if self.remaining is not None:
+            self.remaining += amount
+
+    def learn(self, remaining: float, reset: Optional[float], now: float) -> None:
+        """Adopt the quota reported by the provider.
+
+        Args:
+            remaining: Quota left according to the provider
+            reset: Seconds until the provider's quota resets, if known
+            now: Current Unix time
+        """
+        self._refill(now)
+        if self.rate is not None:
+            self.level = min(self.level, remaining)
+        if reset is not None:
+            self.remaining = remaining
+            self.reset_at = now + reset
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the mutable state, for sharing between processes."""
+        return {
+            "level": self.level,
+            "updated": self.updated,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+        }
+
+    def load(self, state: Dict[str, Any]) -> None:
+        """Restore state written by ``to_dict``."""
+        self.level = float(state.get("level", self.level))
+        self.updated = float(state.get("updated", self.updated))
+        self.remaining = state.get("remaining")
+        self.reset_at = state.get("reset_at")
+
+
+class RateLimiter:
+    """Request and token quotas of one API key."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        state_file: Optional[Path] = None,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Configured request quota, or None
+            tokens_per_minute: Configured token quota, or None
+            state_file: File shared with other processes, or None to keep
+                the state in this process
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self.state_file = state_file if HAS_FCNTL else None
+        if state_file is not None and not HAS_FCNTL:
+            logger.warning("File locking unavailable, rate limits are per process")
+        self._lock = threading.Lock()
+
+    def reserve(
+        self, tokens: float, max_wait: Optional[float] = None
+    ) -> Optional[float]:
+        """Reserve quota for one request.
+
+        Args:
+            tokens: Estimated tokens of the request, including the answer
+            max_wait: Longest acceptable wait in seconds, or None
+
+        Returns:
+            Seconds to wait before sending, or None if the wait would exceed
+            ``max_wait`` (nothing is reserved then)
+        """
+        with self._state() as now:
+            wait = max(
+                self.requests.take(1, now),
+                self.tokens.take(tokens, now),
+                self.blocked_until - now,
+            )
+            if max_wait is not None and wait > 0 and wait >= max_wait:
+                self.requests.give_back(1)
+                self.tokens.give_back(tokens)
+                return None
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.2f}s before sending")
+        return wait
+
+    def acquire(
+        self, tokens: float, timeout: Optional[float] = None
+    ) -> Optional[float]:
+        """Wait until a request fits the quota.
+
+        Args:
+            tokens: Estimated tokens of the request, including the answer
+            timeout: Longest acceptable wait in seconds, or None
+
+        Returns:
+            Seconds waited, or None if the quota does not allow sending
+            within ``timeout``
+        """
+        wait = self.reserve(tokens, timeout)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(
+        self, tokens: float, timeout: Optional[float] = None
+    ) -> Optional[float]:
+        """Async version of ``acquire``, waiting without blocking the loop."""
+        # Imported here: asyncio is slow to import and only needed when async
+        import asyncio
+
+        wait = self.reserve(tokens, timeout)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Learn the remaining quota from rate-limit response headers.
+
+        Understands the ``x-ratelimit-{remaining,reset}-{requests,tokens}``
+        headers (Groq, OpenAI style) and the plain
+        ``x-ratelimit-{remaining,reset}`` pair (OpenRouter).
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        with self._state() as now:
+            for kind, suffixes in _QUOTAS.items():
+                bucket = self.requests if kind == "requests" else self.tokens
+                for suffix in suffixes:
+                    remaining = _header_number(
+                        headers, f"x-ratelimit-remaining{suffix}"
+                    )
+                    if remaining is not None:
+                        reset = parse_reset(
+                            headers.get(f"x-ratelimit-reset{suffix}"), now
+                        )
+                        bucket.learn(remaining, reset, now)
+                        break
+
+    def penalize(self, retry_after: Optional[float]) -> None:
+        """Hold back all requests after the provider rejected one (HTTP 429).
+
+        Args:
+            retry_after: Seconds the provider asked to wait, if given
+        """
+        delay = DEFAULT_PENALTY if retry_after is None else retry_after
+        with self._state() as now:
+            self.blocked_until = max(self.blocked_until, now + delay)
+
+    @contextlib.contextmanager
+    def _state(self) -> Iterator[float]:
+        """Lock the state, loading and saving it when shared.
+
+        Yields:
+            Current Unix time
+        """
+        with self._lock:
+            if self.state_file is None:
+                yield time.time()
+                return
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_file, "a+", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    self._load(f.read())
+                    yield time.time()
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(self._dump(), f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self, text: str) -> None:
+        """Restore shared state, keeping the current state if unreadable."""
+        try:
+            state = json.loads(text) if text else {}
+            self.requests.load(state.get("requests", {}))
+            self.tokens.load(state.get("tokens", {}))
+            self.blocked_until = float(state.get("blocked_until", 0.0))
+        except (ValueError, TypeError, AttributeError):
+            logger.debug("Ignoring unreadable rate limit state")
+
+    def _dump(self) -> Dict[str, Any]:
+        """Get the state shared with other processes."""
+        return {
+            "requests": self.requests.to_dict(),
+            "tokens": self.tokens.to_dict(),
+            "blocked_until": self.blocked_until,
+        }
+
+
+# Limiters shared by the process, keyed by (provider, key fingerprint)
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def key_id(api_key: str) -> str:
+    """Get a short fingerprint of an API key that is safe to log and store."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def get_limiter(
+    provider: str,
+    api_key: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    state_dir: Optional[Path] = None,
+) -> RateLimiter:
+    """Get the process-wide limiter of a provider API key.
+
+    The first call for a key decides its limits; later calls share the same
+    limiter.
+
+    Args:
+        provider: Provider name
+        api_key: API key the quota belongs to
+        requests_per_minute: Configured request quota, or None
+        tokens_per_minute: Configured token quota, or None
+        state_dir: Directory of state files shared with other processes, or
+            None to limit within this process only
+
+    Returns:
+        Shared rate limiter
+    """
+    key = (provider, key_id(api_key))
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            state_file = None
+            if state_dir is not None:
+                state_file = Path(state_dir) / f"ratelimit-{provider}-{key[1]}.json"
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute, state_file)
+            _limiters[key] = limiter
+        return limiter
+
+
+def reset_limiters() -> None:
+    """Forget all shared limiters (e.g. after the configuration changed)."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,274 @@
+"""Retry engine for AI provider requests.
+
+All retrying of provider requests happens here, in the client layer: one
+loop with jittered exponential backoff that honours ``Retry-After`` and stops
+once a total deadline across all attempts is spent. This bounds the worst
+case latency a git hook can see, instead of multiplying transport-level and
+application-level retries.
+
+Every attempt is reported to an ``on_attempt`` callback for instrumentation.
+
+Example:
+    policy = RetryPolicy(max_retries=3, base_delay=1, deadline=20)
+    data = call_with_retry(send, policy, is_retryable, on_attempt=log_attempt)
+    data = await async_call_with_retry(asend, policy, is_retryable)
+"""
+
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    """Limits for retrying one logical request."""
+
+    __slots__ = ("max_retries", "base_delay", "max_delay", "deadline")
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1,
+        max_delay: float = 10,
+        deadline: Optional[float] = 20,
+    ):
+        """Initialize the policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt
+            base_delay: Backoff delay before the first retry in seconds
+            max_delay: Upper bound of a single backoff delay in seconds
+            deadline: Total seconds allowed across all attempts, or None
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def within(self, seconds: Optional[float]) -> "RetryPolicy":
+        """Get a copy of the policy whose deadline is at most ``seconds``.
+
+        Args:
+            seconds: Caller's remaining time budget, or None
+
+        Returns:
+            Policy with the tighter of the two deadlines
+        """
+        if seconds is None:
+            return self
+        deadline = seconds if self.deadline is None else min(self.deadline, seconds)
+        return RetryPolicy(self.max_retries, self.base_delay, self.max_delay, deadline)
+
+    def backoff(self, retry: int) -> float:
+        """Get the jittered delay before a retry ("full jitter").
+
+        Args:
+            retry: Number of the retry, starting at 0
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2**retry))
+        return random.uniform(0, ceiling)
+
+
+class Attempt:
+    """Outcome of one attempt, reported to ``on_attempt`` callbacks."""
+
+    __slots__ = ("number", "elapsed", "error", "delay")
+
+    def __init__(
+        self,
+        number: int,
+        elapsed: float,
+        error: Optional[Exception] = None,
+        delay: Optional[float] = None,
+    ):
+        """Record an attempt.
+
+        Args:
+            number: Attempt number, starting at 1
+            elapsed: Seconds spent on this attempt
+            error: Error raised by the attempt, or None on success
+            delay: Seconds waited before the next attempt, or None if the
+                attempt is final
+        """
+        self.number = number
+        self.elapsed = elapsed
+        self.error = error
+        self.delay = delay
+
+    @property
+    def succeeded(self) -> bool:
+        """Check if the attempt succeeded."""
+        return self.error is None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header value.
+
+    Args:
+        value: Header value in seconds or as an HTTP date
+
+    Returns:
+        Seconds to wait, or None if missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    # Imported here: only needed for the rare HTTP date form
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def call_with_retry(
+    func: Callable[[Optional[float]], T],
+    policy: RetryPolicy,
+    is_retryable: Callable[[Exception], bool],
+    on_attempt: Optional[Callable[[Attempt], None]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call a function, retrying retryable errors within the policy.
+
+    Args:
+        func: Function to call; it receives the seconds left before the
+            deadline (or None) so it can bound its own timeout
+        policy: Retry limits
+        is_retryable: Predicate deciding whether an error is worth retrying;
+            errors may carry a ``retry_after`` attribute in seconds
+        on_attempt: Callback receiving every attempt
+        sleep: Sleep function (replaceable in tests)
+
+    Returns:
+        Result of the first successful call
+
+    Raises:
+        Exception: The last error once retries or the deadline are exhausted
+    """
+    start = time.monotonic()
+    number = 0
+    while True:
+        number += 1
+        attempt_start = time.monotonic()
+        try:
+            result = func(_remaining(policy, start))
+        except Exception as e:
+            delay = _next_delay(policy, number, e, start, is_retryable)
+            if on_attempt:
+                on_attempt(Attempt(number, time.monotonic() - attempt_start, e, delay))
+            if delay is None:
+                raise
+            sleep(delay)
+            continue
+
+        if on_attempt:
+            on_attempt(Attempt(number, time.monotonic() - attempt_start))
+        return result
+
+
+async def async_call_with_retry(
+    func: Callable[[Optional[float]], Awaitable[T]],
+    policy: RetryPolicy,
+    is_retryable: Callable[[Exception], bool],
+    on_attempt: Optional[Callable[[Attempt], None]] = None,
+    sleep: Optional[Callable[[float], Awaitable[None]]] = None,
+) -> T:
+    """Await a coroutine function, retrying retryable errors within the policy.
+
+    Same behaviour as ``call_with_retry``, waiting with ``asyncio.sleep`` so
+    the event loop keeps serving other requests during backoff.
+
+    Args:
+        func: Coroutine function receiving the seconds left before the deadline
+        policy: Retry limits
+        is_retryable: Predicate deciding whether an error is worth retrying
+        on_attempt: Callback receiving every attempt
+        sleep: Async sleep function (replaceable in tests), defaults to
+            ``asyncio.sleep``
+
+    Returns:
+        Result of the first successful call
+
+    Raises:
+        Exception: The last error once retries or the deadline are exhausted
+    """
+    if sleep is None:
+        # Imported here: asyncio is slow to import and only needed when async
+        import asyncio
+
+        sleep = asyncio.sleep
+
+    start = time.monotonic()
+    number = 0
+    while True:
+        number += 1
+        attempt_start = time.monotonic()
+        try:
+            result = await func(_remaining(policy, start))
+        except Exception as e:
+            delay = _next_delay(policy, number, e, start, is_retryable)
+            if on_attempt:
+                on_attempt(Attempt(number, time.monotonic() - attempt_start, e, delay))
+            if delay is None:
+                raise
+            await sleep(delay)
+            continue
+
+        if on_attempt:
+            on_attempt(Attempt(number, time.monotonic() - attempt_start))
+        return result
+
+
+def _remaining(policy: RetryPolicy, start: float) -> Optional[float]:
+    """Get the seconds left before the policy's deadline, or None."""
+    if policy.deadline is None:
+        return None
+    return policy.deadline - (time.monotonic() - start)
+
+
+def _next_delay(
+    policy: RetryPolicy,
+    number: int,
+    error: Exception,
+    start: float,
+    is_retryable: Callable[[Exception], bool],
+) -> Optional[float]:
+    """Get the delay before retrying a failed attempt.
+
+    Args:
+        policy: Retry limits
+        number: Number of the failed attempt, starting at 1
+        error: Error raised by the attempt
+        start: Monotonic time the first attempt started
+        is_retryable: Predicate deciding whether an error is worth retrying
+
+    Returns:
+        Seconds to wait, or None if the error should not be retried
+    """
+    if number > policy.max_retries or not is_retryable(error):
+        return None
+
+    delay = policy.backoff(number - 1)
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+
+    left = _remaining(policy, start)
+    # Not worth retrying if the wait eats the rest of the budget
+    if left is not None and delay >= left:
+        return None
+    return delay
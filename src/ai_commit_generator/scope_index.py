@@ -0,0 +1,264 @@
+"""Index of the commit scopes used for each part of a repository.
+
+The prompt lists the configured scopes and leaves the choice to the model.
+Past conventional commits show which scope a team actually uses for which
+directories: the index counts, per directory prefix (up to ``MAX_DEPTH``
+levels), the scopes of the commits that touched it. The likely scope of new
+changes is looked up locally and suggested in the prompt and used by the
+local heuristics.
+
+The index is stored under ``.git/`` with the last indexed commit. Updates
+only read the commits added since (``git log <last>..HEAD``), so keeping it
+current costs one ``git rev-parse`` per generation and a short ``git log``
+per new commit. Only the newest ``max_commits`` commits are read when the
+index is first built or after history was rewritten, which bounds the cost
+on very large repositories.
+
+Example:
+    index = ScopeIndex(config.scope_index_file, config.repo_root)
+    index.update()
+    index.likely_scope(["src/auth/jwt.py"])  # ("auth", 0.92)
+"""
+
+import contextlib
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the index format changes; older indexes are rebuilt
+INDEX_VERSION = 1
+
+# Directory levels indexed per path ("src/", "src/auth/", "src/auth/jwt/")
+MAX_DEPTH = 3
+
+# Seconds allowed for reading the history
+LOG_TIMEOUT = 60
+
+# Scope of a conventional commit subject, e.g. "feat(auth): ..."
+SCOPE_RE = re.compile(r"^\w+\(([\w.\-]+)\)!?: ")
+
+
+def path_prefixes(path: str, max_depth: int = MAX_DEPTH) -> List[str]:
+    """Get the directory prefixes of a path, shortest first.
+
+    Args:
+        path: Repository-relative file path
+        max_depth: Maximum number of directory levels
+
+    Returns:
+        Prefixes ending with ``/``; empty for files at the top level
+    """
+    parts = path.split("/")[:-1][:max_depth]
+    return ["/".join(parts[: i + 1]) + "/" for i in range(len(parts))]
+
+
+def parse_log(lines: Iterable[str]) -> Iterable[Tuple[str, List[str]]]:
+    """Split ``git log --format=%x00%s --name-only`` output into commits.
+
+    Args:
+        lines: Output lines
+
+    Yields:
+        Subject and changed paths of each commit
+    """
+    subject: Optional[str] = None
+    paths: List[str] = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("\x00"):
+            if subject is not None:
+                yield subject, paths
+            subject, paths = line[1:], []
+        elif line and subject is not None:
+            paths.append(line)
+    if subject is not None:
+        yield subject, paths
+
+
+class ScopeIndex:
+    """Counts of commit scopes per directory prefix, updated incrementally."""
+
+    def __init__(
+        self,
+        index_file: Path,
+        repo_root: Path,
+        max_commits: int = 10000,
+        min_samples: int = 3,
+    ):
+        """Initialize the index, loading it from disk if present.
+
+        Args:
+            index_file: JSON file holding the index
+            repo_root: Root directory of the Git repository
+            max_commits: Commits read when building the index from scratch
+            min_samples: Scoped commits a prefix needs before it is trusted
+        """
+        self.index_file = index_file
+        self.repo_root = repo_root
+        self.max_commits = max_commits
+        self.min_samples = min_samples
+        self.head: Optional[str] = None
+        self.prefixes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Read the index file, starting empty if it is missing or invalid."""
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        self.head = data.get("head")
+        self.prefixes = data.get("prefixes") or {}
+
+    def save(self) -> None:
+        """Write the index file atomically."""
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=self.index_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": INDEX_VERSION,
+                        "head": self.head,
+                        "prefixes": self.prefixes,
+                    },
+                    f,
+                    separators=(",", ":"),
+                )
+            os.replace(temp_name, self.index_file)
+        except OSError as e:
+            logger.warning(f"Could not write scope index: {e}")
+
+    def add(self, subject: str, paths: Sequence[str]) -> bool:
+        """Count the scope of one commit for the prefixes of its paths.
+
+        Args:
+            subject: Commit subject
+            paths: Paths changed by the commit
+
+        Returns:
+            True if the subject has a scope
+        """
+        match = SCOPE_RE.match(subject)
+        if not match:
+            return False
+        scope = match.group(1).lower()
+        # Count a commit once per prefix, however many files it touched there
+        prefixes = {prefix for path in paths for prefix in path_prefixes(path)}
+        for prefix in prefixes:
+            counts = self.prefixes.setdefault(prefix, {})
+            counts[scope] = counts.get(scope, 0) + 1
+        return True
+
+    def update(self, timeout: float = LOG_TIMEOUT) -> int:
+        """Index the commits added since the last update.
+
+        Args:
+            timeout: Seconds allowed for git
+
+        Returns:
+            Number of commits read
+
+        Raises:
+            GitError: If git fails
+            SecurityError: If git times out or the repository path is unsafe
+        """
+        with self._lock:
+            result = self._git("rev-parse", "--verify", "-q", "HEAD")
+            head = result.stdout.strip() if result.returncode == 0 else ""
+            if not head or head == self.head:
+                return 0
+
+            incremental = bool(self.head and self._is_ancestor(self.head))
+            revisions = f"{self.head}..{head}" if incremental else head
+            # Read everything first, so a failed read leaves the index as it was
+            commits = list(self._read_log(revisions, timeout))
+
+            if not incremental:
+                # First build, or history was rewritten: start over
+                self.prefixes = {}
+            for subject, paths in commits:
+                self.add(subject, paths)
+
+            self.head = head
+            self.save()
+            logger.debug(f"Indexed scopes of {len(commits)} commits up to {head[:10]}")
+            return len(commits)
+
+    def likely_scope(self, paths: Sequence[str]) -> Optional[Tuple[str, float]]:
+        """Find the scope past commits most often used for these paths.
+
+        Each path votes with the scope distribution of its most specific
+        prefix that has at least ``min_samples`` scoped commits.
+
+        Args:
+            paths: Paths of the changed files
+
+        Returns:
+            Scope and the share of votes it got, or None if unknown
+        """
+        votes: Dict[str, float] = defaultdict(float)
+        for path in paths:
+            for prefix in reversed(path_prefixes(path)):
+                counts = self.prefixes.get(prefix)
+                total = sum(counts.values()) if counts else 0
+                if counts and total >= self.min_samples:
+                    for scope, count in counts.items():
+                        votes[scope] += count / total
+                    break
+        if not votes:
+            return None
+        scope = max(votes, key=votes.__getitem__)
+        return scope, round(votes[scope] / len(paths), 2)
+
+    def _git(self, *args: str) -> "subprocess.CompletedProcess":
+        """Run a short git command, leaving the exit status to the caller."""
+        # Imported here: core imports this module
+        from .core import sanitize_repo_path, secure_subprocess_run
+
+        return secure_subprocess_run(
+            ["git", *args], cwd=sanitize_repo_path(str(self.repo_root)), check=False
+        )
+
+    def _is_ancestor(self, commit: str) -> bool:
+        """Check if a commit is an ancestor of HEAD."""
+        return self._git("merge-base", "--is-ancestor", commit, "HEAD").returncode == 0
+
+    def _read_log(
+        self, revisions: str, timeout: float
+    ) -> Iterable[Tuple[str, List[str]]]:
+        """Stream the subjects and paths of non-merge commits."""
+        # Imported here: core imports this module
+        from .core import sanitize_repo_path, secure_subprocess_lines
+
+        cmd = [
+            "git",
+            "-c",
+            "core.quotepath=false",
+            "log",
+            "--no-merges",
+            "--no-renames",
+            "--name-only",
+            "--format=%x00%s",
+            f"--max-count={self.max_commits}",
+            revisions,
+            "--",
+        ]
+        lines = secure_subprocess_lines(
+            cmd, cwd=sanitize_repo_path(str(self.repo_root)), timeout=timeout
+        )
+        with contextlib.closing(lines):
+            yield from parse_log(lines)
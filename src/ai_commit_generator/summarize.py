@@ -0,0 +1,234 @@
+"""Map-reduce summarization of large diffs.
+
+When the filtered diff is larger than ``max_diff_size``, blind truncation
+shows the model only the first file or two. In map-reduce mode the diff is
+split into per-file (or per-hunk) chunks, each chunk is summarized by the AI
+provider concurrently within a budget of parallel requests, and the short
+summaries replace the diff in the final commit message prompt.
+
+The summarizer works with a blocking client (a thread per request) or, with
+``asummarize``, an async client on the running event loop.
+
+Example:
+    summarizer = DiffSummarizer(client, max_workers=4, chunk_size=3000)
+    summary = summarizer.summarize(diff)
+"""
+
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from .api_clients import APIError, first_line_stop
+from .deadline import Deadline
+from .diff import parse_diff, split_lines
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """Summarize the following part of a git diff in one short sentence.
+
+Describe WHAT changed (files, functions, behaviour), not HOW.
+
+Git diff:
+{chunk}
+
+Respond with ONLY the summary, no explanations or additional text."""
+
+
+class DiffChunk:
+    """Part of a diff sent in one summary request."""
+
+    __slots__ = ("path", "text", "added", "removed")
+
+    def __init__(self, path: str, text: str, added: int, removed: int):
+        self.path = path
+        self.text = text
+        self.added = added
+        self.removed = removed
+
+
+def split_diff(diff: str, chunk_size: int) -> List[DiffChunk]:
+    """Split a diff into chunks of at most ``chunk_size`` characters.
+
+    Each file becomes one chunk. Files larger than the chunk size are split
+    at hunk boundaries with the file header repeated, and single hunks that
+    are still too large are truncated.
+
+    Args:
+        diff: Filtered git diff content
+        chunk_size: Maximum characters per chunk
+
+    Returns:
+        List of chunks in diff order
+    """
+    chunks = []
+
+    for diff_file in parse_diff(split_lines(diff)).files:
+        path = diff_file.path
+        if diff_file.size <= chunk_size:
+            chunks.append(
+                DiffChunk(path, diff_file.text, diff_file.added, diff_file.removed)
+            )
+            continue
+
+        header = diff_file.header
+        current = DiffChunk(path, header, 0, 0)
+        for hunk in diff_file.hunks:
+            hunk_text = diff_file.hunk_text(hunk)
+            has_hunks = current.text != header
+            if has_hunks and len(current.text) + len(hunk_text) > chunk_size:
+                chunks.append(current)
+                current = DiffChunk(path, header, 0, 0)
+            current.text += hunk_text
+            current.added += hunk.added
+            current.removed += hunk.removed
+            if len(current.text) > chunk_size:
+                current.text = current.text[:chunk_size] + "\n... [truncated]"
+                chunks.append(current)
+                current = DiffChunk(path, header, 0, 0)
+        if current.text != header or not diff_file.hunks:
+            current.text = current.text[:chunk_size]
+            chunks.append(current)
+
+    return chunks
+
+
+def _merge_small_chunks(chunks: List[DiffChunk], chunk_size: int) -> List[DiffChunk]:
+    """Pack consecutive small chunks together to save API calls."""
+    merged: List[DiffChunk] = []
+    for chunk in chunks:
+        if merged and len(merged[-1].text) + len(chunk.text) <= chunk_size:
+            last = merged[-1]
+            if last.path != chunk.path:
+                last.path = f"{last.path}, {chunk.path}"
+            last.text += chunk.text
+            last.added += chunk.added
+            last.removed += chunk.removed
+        else:
+            merged.append(DiffChunk(chunk.path, chunk.text, chunk.added, chunk.removed))
+    return merged
+
+
+class DiffSummarizer:
+    """Summarize a large diff with concurrent per-chunk API calls."""
+
+    def __init__(
+        self,
+        client: Any,
+        max_workers: int = 4,
+        chunk_size: int = 3000,
+        max_chunks: int = 32,
+    ):
+        """Initialize the summarizer.
+
+        Args:
+            client: API client used for the summary requests; an async client
+                for ``asummarize``
+            max_workers: Maximum number of summary requests in flight
+            chunk_size: Maximum characters sent per summary request
+            max_chunks: Maximum number of summary requests per diff
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+
+    def _summarize_chunk(
+        self, chunk: DiffChunk, deadline: Optional[Deadline] = None
+    ) -> str:
+        """Summarize one chunk, falling back to its change statistics."""
+        try:
+            summary = self.client.generate_commit_message(
+                SUMMARY_PROMPT.format(chunk=chunk.text),
+                timeout=deadline.remaining() if deadline else None,
+                stop=first_line_stop(),
+            )
+            return _format_summary(chunk, summary)
+        except APIError as e:
+            logger.warning(f"Could not summarize {chunk.path}: {e}")
+            return _format_summary(chunk, "")
+
+    async def _asummarize_chunk(
+        self,
+        chunk: DiffChunk,
+        semaphore: "asyncio.Semaphore",
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        """Summarize one chunk with the async client."""
+        try:
+            async with semaphore:
+                summary = await self.client.generate_commit_message(
+                    SUMMARY_PROMPT.format(chunk=chunk.text),
+                    timeout=deadline.remaining() if deadline else None,
+                    stop=first_line_stop(),
+                )
+            return _format_summary(chunk, summary)
+        except APIError as e:
+            logger.warning(f"Could not summarize {chunk.path}: {e}")
+            return _format_summary(chunk, "")
+
+    def _chunks(self, diff: str) -> Tuple[List[DiffChunk], List[DiffChunk]]:
+        """Split a diff into the chunks to summarize and the skipped ones."""
+        chunks = _merge_small_chunks(split_diff(diff, self.chunk_size), self.chunk_size)
+        logger.debug(
+            f"Summarizing {min(len(chunks), self.max_chunks)} diff chunks "
+            f"with {self.max_workers} workers"
+        )
+        return chunks[: self.max_chunks], chunks[self.max_chunks :]
+
+    def summarize(self, diff: str, deadline: Optional[Deadline] = None) -> str:
+        """Summarize a diff into a short per-file list of changes.
+
+        Args:
+            diff: Filtered git diff content
+            deadline: Time budget shared by all summary requests
+
+        Returns:
+            Summary text to use in place of the diff in the prompt
+        """
+        chunks, skipped = self._chunks(diff)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            summarize_chunk = functools.partial(
+                self._summarize_chunk, deadline=deadline
+            )
+            summaries = list(pool.map(summarize_chunk, chunks))
+        return _join_summaries(summaries, skipped)
+
+    async def asummarize(self, diff: str, deadline: Optional[Deadline] = None) -> str:
+        """Summarize a diff with an async client on the running event loop.
+
+        Args:
+            diff: Filtered git diff content
+            deadline: Time budget shared by all summary requests
+
+        Returns:
+            Summary text to use in place of the diff in the prompt
+        """
+        # Imported here: asyncio is slow to import and only needed when async
+        import asyncio
+
+        chunks, skipped = self._chunks(diff)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        summaries = await asyncio.gather(
+            *(self._asummarize_chunk(chunk, semaphore, deadline) for chunk in chunks)
+        )
+        return _join_summaries(list(summaries), skipped)
+
+
+def _format_summary(chunk: DiffChunk, summary: str) -> str:
+    """Format one chunk's summary line, falling back to its statistics."""
+    lines = summary.strip().splitlines()
+    if lines:
+        return f"- {chunk.path}: {lines[0]}"
+    return f"- {chunk.path}: changed (+{chunk.added}/-{chunk.removed} lines)"
+
+
+def _join_summaries(summaries: List[str], skipped: List[DiffChunk]) -> str:
+    """Join chunk summaries, listing the files that were not summarized."""
+    if skipped:
+        paths = sorted({chunk.path for chunk in skipped})
+        summaries.append(f"- Also changed: {', '.join(paths)}")
+    return "Summary of changes by file:\n" + "\n".join(summaries)
@@ -0,0 +1,113 @@
+"""Offline token estimation and per-model context limits.
+
+Providers bill and limit requests in tokens, while ``max_diff_size`` counts
+characters. This module estimates token counts locally, with a
+characters-per-token ratio per model family measured on source code diffs,
+and knows the context window of the configured models, so the prompt can be
+filled up to a token budget instead of a fixed character count.
+
+The estimate is deliberately conservative: it only needs to be close enough
+to keep requests inside the context window, not to match the provider's
+tokenizer exactly.
+
+Example:
+    window = context_window("mixtral-8x7b-32768")  # 32768
+    tokens = estimate_tokens(prompt, "llama3-8b-8192")
+"""
+
+import math
+import re
+from typing import Mapping, Optional
+
+# Average characters per token on code diffs, by model family. Lower values
+# are more conservative (more tokens per character).
+CHARS_PER_TOKEN = {
+    "llama": 3.5,
+    "mixtral": 3.0,
+    "mistral": 3.0,
+    "gemma": 3.5,
+    "command": 3.5,
+    "claude": 3.2,
+    "gpt": 3.6,
+    "gemini": 3.6,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.0
+
+# Context windows of known models, in tokens
+CONTEXT_WINDOWS = {
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "gemma-7b-it": 8192,
+    "meta-llama/llama-3.1-70b-instruct": 131072,
+    "anthropic/claude-3.5-sonnet": 200000,
+    "google/gemini-pro-1.5": 1000000,
+    "mistralai/mixtral-8x7b-instruct": 32768,
+    "command-r-plus": 128000,
+    "command-r": 128000,
+    "command-light": 4096,
+}
+DEFAULT_CONTEXT_WINDOW = 4096
+
+_WINDOW_SUFFIX_RE = re.compile(r"-(\d{4,7})$")
+
+
+def model_family(model: str) -> str:
+    """Get the family of a model name (e.g. ``llama`` for ``llama3-8b-8192``).
+
+    Args:
+        model: Model name, optionally prefixed with ``vendor/``
+
+    Returns:
+        Family name, or an empty string if unknown
+    """
+    name = model.lower().rsplit("/", 1)[-1]
+    for family in CHARS_PER_TOKEN:
+        if name.startswith(family):
+            return family
+    return ""
+
+
+def chars_per_token(model: str) -> float:
+    """Get the average characters per token for a model."""
+    return CHARS_PER_TOKEN.get(model_family(model), DEFAULT_CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str, model: str) -> int:
+    """Estimate the number of tokens a model needs for a text.
+
+    Args:
+        text: Text to estimate
+        model: Model name
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(len(text) / chars_per_token(model))
+
+
+def tokens_to_chars(tokens: int, model: str) -> int:
+    """Get the number of characters that fit in a token count."""
+    return max(int(tokens * chars_per_token(model)), 0)
+
+
+def context_window(model: str, overrides: Optional[Mapping[str, int]] = None) -> int:
+    """Get the context window of a model in tokens.
+
+    Args:
+        model: Model name
+        overrides: Configured context windows that take precedence
+
+    Returns:
+        Context window size in tokens
+    """
+    if overrides and model in overrides:
+        return int(overrides[model])
+    if model in CONTEXT_WINDOWS:
+        return CONTEXT_WINDOWS[model]
+
+    # Groq-style names end with the window size (e.g. "-8192")
+    match = _WINDOW_SUFFIX_RE.search(model)
+    if match:
+        return int(match.group(1))
+    return DEFAULT_CONTEXT_WINDOW
@@ -0,0 +1,313 @@
+"""Sanitization and validation of generated commit messages.
+
+Every provider answer is cleaned (first line only, quotes and unsafe
+characters removed, suspicious content rejected) and then checked against
+the conventional commit grammar built from the configured types. Batch
+runs and history rewrites do this for thousands of answers, so the
+patterns are compiled once per configuration: all suspicious patterns are
+scanned for in a single pass of one alternation, and the grammar is a
+single precompiled expression with named groups.
+
+Results are structured: ``MessageValidator.check`` returns the cleaned
+message, its type, scope and subject, and the list of violations, so
+callers can tell unsafe answers from merely malformed ones.
+
+Answers that only just miss the grammar ("Feat: ...", "feature(api) ...",
+a message inside a code fence or bullet list, a preamble line before it)
+are common. ``MessageValidator.repair`` rewrites them into a valid message
+locally, which is much cheaper than asking the provider again.
+
+Example:
+    validator = get_validator(("feat", "fix"), 72)
+    result = validator.check('"feat(api): add endpoint"\\nMore text')
+    result.valid, result.type, result.scope  # True, "feat", "api"
+"""
+
+import functools
+import logging
+import re
+from typing import Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Shortest acceptable message
+MIN_LENGTH = 5
+
+# Content never allowed in a message, checked case-insensitively
+SUSPICIOUS_PATTERNS = (
+    r"<script",
+    r"javascript:",
+    r"data:",
+    r"vbscript:",
+    r"onload=",
+    r"onerror=",
+    r"\x00",  # Null bytes
+    r"\.\./",  # Path traversal
+    r"\\\\",  # UNC paths
+    r"[;&|`$]",  # Command injection characters
+)
+
+# Violations; the first three make a message unsafe to use at all
+EMPTY = "empty"
+SUSPICIOUS = "suspicious"
+TOO_SHORT = "too_short"
+FORMAT = "format"
+
+SECURITY_ERRORS = {
+    EMPTY: "Invalid message input",
+    SUSPICIOUS: "Message contains suspicious content",
+    TOO_SHORT: f"Message too short (minimum {MIN_LENGTH} characters)",
+}
+
+# One group per pattern, so the match tells which one was found
+_SUSPICIOUS_RE = re.compile(
+    "|".join(f"({pattern})" for pattern in SUSPICIOUS_PATTERNS), re.IGNORECASE
+)
+_UNSAFE_CHARS_RE = re.compile(r"[^\w\s\(\)\:\-\.\,\!]")
+
+# Lines read when looking for a message in a longer answer
+MAX_REPAIR_LINES = 10
+
+# Type names models use instead of the conventional ones
+TYPE_SYNONYMS = {
+    "feature": "feat",
+    "features": "feat",
+    "add": "feat",
+    "bug": "fix",
+    "bugfix": "fix",
+    "hotfix": "fix",
+    "doc": "docs",
+    "documentation": "docs",
+    "tests": "test",
+    "testing": "test",
+    "refactoring": "refactor",
+    "performance": "perf",
+    "styles": "style",
+    "chores": "chore",
+    "deps": "build",
+}
+
+# Code fence markers, which wrap a message in markdown but are not part of it
+_FENCE_RE = re.compile(r"^\s*(?:```|~~~)[\w+-]*\s*$")
+# Code fences, blank lines and preambles such as "Here is the message:"
+_FILLER_RE = re.compile(r"^\s*(?:```|~~~|$)|:\s*$")
+# Bullets, numbering, headings, quote markers and labels before a message
+_LINE_PREFIX_RE = re.compile(
+    r"^\s*(?:[-*+>#]+\s*|\d+[.)]\s+|\*\*)*(?:commit(?: message)?:\s*)?",
+    re.IGNORECASE,
+)
+# A header with any capitalization, spacing, separator and breaking marker
+_LOOSE_HEADER_RE = re.compile(
+    r"(?P<type>[A-Za-z]+)\s*(?:\(\s*(?P<scope>[^()]*?)\s*\))?\s*!?"
+    r"\s*(?P<separator>[:\-]?)\s*(?P<subject>.+)"
+)
+
+
+def is_filler(line: str) -> bool:
+    """Check if an answer line cannot hold the message itself.
+
+    Args:
+        line: One line of a provider answer
+
+    Returns:
+        True for blank lines, code fences and lines ending with a colon
+    """
+    return bool(_FILLER_RE.search(line))
+
+
+def _is_suspicious(text: str) -> bool:
+    """Check text for suspicious patterns, logging the one found."""
+    match = _SUSPICIOUS_RE.search(text)
+    if not match:
+        return False
+    pattern = SUSPICIOUS_PATTERNS[(match.lastindex or 1) - 1]
+    logger.warning(f"Suspicious pattern detected in message: {pattern}")
+    return True
+
+
+class ValidationResult:
+    """Outcome of cleaning and validating one message."""
+
+    __slots__ = ("message", "type", "scope", "subject", "violations")
+
+    def __init__(
+        self,
+        message: str,
+        type: Optional[str] = None,
+        scope: Optional[str] = None,
+        subject: Optional[str] = None,
+        violations: Tuple[str, ...] = (),
+    ):
+        """Initialize a result.
+
+        Args:
+            message: Cleaned message, empty if it was rejected as unsafe
+            type: Commit type, if the message follows the grammar
+            scope: Commit scope, if any
+            subject: Description after the colon
+            violations: Problems found, in the order they were detected
+        """
+        self.message = message
+        self.type = type
+        self.scope = scope
+        self.subject = subject
+        self.violations = violations
+
+    @property
+    def valid(self) -> bool:
+        """Check if the message can be used as it is."""
+        return not self.violations
+
+    @property
+    def safe(self) -> bool:
+        """Check if the message passed the security checks."""
+        return self.error is None
+
+    @property
+    def error(self) -> Optional[str]:
+        """Get the reason the message is unsafe, or None if it is safe."""
+        for violation in self.violations:
+            if violation in SECURITY_ERRORS:
+                return SECURITY_ERRORS[violation]
+        return None
+
+    def __repr__(self) -> str:
+        return (
+            f"ValidationResult({self.message!r}, type={self.type!r}, "
+            f"scope={self.scope!r}, violations={self.violations!r})"
+        )
+
+
+class MessageValidator:
+    """Cleans and validates messages for one set of commit types."""
+
+    def __init__(self, commit_types: Sequence[str], max_chars: int):
+        """Compile the grammar.
+
+        Args:
+            commit_types: Allowed commit types
+            max_chars: Maximum message length; longer messages are truncated
+        """
+        self.commit_types = tuple(commit_types)
+        self.max_chars = max_chars
+        types = "|".join(re.escape(commit_type) for commit_type in self.commit_types)
+        self._grammar = re.compile(
+            rf"(?P<type>{types})(?:\((?P<scope>.+)\))?: (?P<subject>.+)"
+        )
+
+    def check(self, message: str) -> ValidationResult:
+        """Clean a raw provider answer and validate the result.
+
+        Args:
+            message: Raw answer
+
+        Returns:
+            Result holding the cleaned message and any violations
+        """
+        if not message or not isinstance(message, str):
+            return ValidationResult("", violations=(EMPTY,))
+
+        # The first line is the message; fence markers around it are not
+        lines = message.strip().split("\n")
+        message = next((line for line in lines if not _FENCE_RE.match(line)), "")
+        message = message.strip().strip("\"'")
+
+        if _is_suspicious(message):
+            return ValidationResult("", violations=(SUSPICIOUS,))
+
+        message = _UNSAFE_CHARS_RE.sub("", message)
+        if len(message) < MIN_LENGTH:
+            return ValidationResult(message, violations=(TOO_SHORT,))
+        if len(message) > self.max_chars:
+            message = message[: self.max_chars].rstrip()
+
+        return self.validate(message)
+
+    def validate(self, message: str) -> ValidationResult:
+        """Validate an already cleaned message against the grammar.
+
+        Args:
+            message: Commit message
+
+        Returns:
+            Result with the parsed type, scope and subject
+        """
+        if not message or len(message) < MIN_LENGTH:
+            return ValidationResult(message or "", violations=(TOO_SHORT,))
+
+        match = self._grammar.match(message)
+        if not match:
+            logger.debug(f"Message doesn't match conventional commit format: {message}")
+            return ValidationResult(message, violations=(FORMAT,))
+        return ValidationResult(
+            message, match.group("type"), match.group("scope"), match.group("subject")
+        )
+
+    def repair(self, message: str) -> ValidationResult:
+        """Rewrite an answer that only just misses the grammar.
+
+        The first lines of the answer are tried in order, skipping fences and
+        preambles. Bullets, headings and labels are removed, the type is
+        lowercased and mapped from common synonyms, and a missing colon is
+        added. The first line that then passes ``check`` wins. Answers with
+        suspicious content in any of these lines are never repaired.
+
+        Args:
+            message: Raw answer that failed ``check``
+
+        Returns:
+            Result of the repaired message, or the violations of the first
+            candidate line if no line could be repaired
+        """
+        if not message or not isinstance(message, str):
+            return ValidationResult("", violations=(EMPTY,))
+
+        lines = message.strip().split("\n")[:MAX_REPAIR_LINES]
+        if any(_is_suspicious(line) for line in lines if not _FENCE_RE.match(line)):
+            return ValidationResult("", violations=(SUSPICIOUS,))
+
+        first: Optional[ValidationResult] = None
+        for line in lines:
+            if is_filler(line):
+                continue
+            candidate = self._normalize(line)
+            if candidate is None:
+                continue
+            result = self.check(candidate)
+            if result.valid:
+                return result
+            first = first or result
+        return first or ValidationResult("", violations=(FORMAT,))
+
+    def _normalize(self, line: str) -> Optional[str]:
+        """Rewrite one line into a conventional header, if it looks like one."""
+        line = _LINE_PREFIX_RE.sub("", line).replace("**", "")
+        line = line.strip().strip("`_\"'").strip()
+        match = _LOOSE_HEADER_RE.fullmatch(line)
+        if not match:
+            return None
+        commit_type = match.group("type").lower()
+        commit_type = TYPE_SYNONYMS.get(commit_type, commit_type)
+        if commit_type not in self.commit_types:
+            return None
+        scope = match.group("scope")
+        if not (match.group("separator") or scope is not None):
+            # Without colon or scope, only a known type makes this a header
+            if match.group("type").lower() not in self.commit_types:
+                return None
+        prefix = f"{commit_type}({scope})" if scope else commit_type
+        return f"{prefix}: {match.group('subject').strip()}"
+
+
+@functools.lru_cache(maxsize=16)
+def get_validator(commit_types: Tuple[str, ...], max_chars: int) -> MessageValidator:
+    """Get the validator for a configuration, compiling it on first use.
+
+    Args:
+        commit_types: Allowed commit types
+        max_chars: Maximum message length
+
+    Returns:
+        Shared validator
+    """
+    return MessageValidator(commit_types, max_chars)
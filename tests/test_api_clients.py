@@ -0,0 +1,166 @@
+"""Tests for API client connection pooling and streaming."""
+
+import json
+
+import pytest
+import requests
+
+from ai_commit_generator import api_clients
+from ai_commit_generator.api_clients import (
+    close_sessions,
+    create_client,
+    first_line_stop,
+    get_session,
+)
+
+
+def sse(*contents: str) -> list:
+    """Build OpenAI-compatible server-sent events for text deltas."""
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": c}}]}) + "\n\n"
+        for c in contents
+    ]
+    return events + ["data: [DONE]\n\n"]
+
+
+class EventStream:
+    """Raw response body that hands out one event per read."""
+
+    def __init__(self, events: list):
+        self.events = [event.encode("utf-8") for event in events]
+        self.reads = 0
+
+    def read(self, amt=None, **kwargs):
+        if not self.events:
+            return b""
+        self.reads += 1
+        return self.events.pop(0)
+
+    def close(self):
+        pass
+
+
+class StreamAdapter(requests.adapters.BaseAdapter):
+    """Transport adapter answering every request with an event stream."""
+
+    def __init__(self, body: EventStream):
+        super().__init__()
+        self.body = body
+        self.payloads = []
+
+    def send(self, request, **kwargs):
+        self.payloads.append(json.loads(request.body))
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = self.body
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions():
+    """Start and end each test without pooled sessions."""
+    close_sessions()
+    yield
+    close_sessions()
+
+
+class TestSessionPool:
+    """Test the process-wide HTTP session pool."""
+
+    def test_clients_share_session(self):
+        """Test that clients for the same provider reuse one session."""
+        first = create_client("groq", "key", "llama3-8b-8192")
+        second = create_client("groq", "other-key", "llama3-70b-8192")
+
+        assert first.session is second.session
+
+    def test_providers_get_separate_sessions(self):
+        """Test that each provider endpoint has its own pool."""
+        groq = create_client("groq", "key", "llama3-8b-8192")
+        cohere = create_client("cohere", "key", "command-r")
+
+        assert groq.session is not cohere.session
+
+    def test_pool_size(self):
+        """Test that the pool size is applied to the adapter."""
+        client = create_client("groq", "key", "llama3-8b-8192", pool_size=3)
+        adapter = client.session.get_adapter(client.base_url)
+
+        assert adapter._pool_maxsize == 3
+
+    def test_close_sessions(self):
+        """Test that closed sessions are replaced on next use."""
+        session = get_session("groq", "https://api.groq.com/openai/v1")
+        close_sessions()
+
+        assert get_session("groq", "https://api.groq.com/openai/v1") is not session
+
+
+class TestStreaming:
+    """Test streamed responses with early termination."""
+
+    def _client(self, monkeypatch, provider, events):
+        body = EventStream(events)
+        adapter = StreamAdapter(body)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        monkeypatch.setattr(api_clients, "get_session", lambda *args: session)
+        client = create_client(provider, "key", "model", stream=True)
+        return client, body, adapter
+
+    def test_stops_at_first_line(self, monkeypatch):
+        """Test that reading stops once the first line is complete."""
+        events = sse("feat(api): add", " streaming\n", "This commit adds", " more")
+        client, body, adapter = self._client(monkeypatch, "groq", events)
+
+        message = client.generate_commit_message("prompt", stop=first_line_stop(72))
+
+        assert message == "feat(api): add streaming"
+        assert adapter.payloads[0]["stream"] is True
+        assert body.events  # the explanation was never read
+
+    def test_stops_at_max_chars(self, monkeypatch):
+        """Test that a first line longer than max_chars is cut off."""
+        events = sse(*(["word " * 4] * 20))
+        client, body, _ = self._client(monkeypatch, "openrouter", events)
+
+        message = client.generate_commit_message("prompt", stop=first_line_stop(20))
+
+        assert len(message) < 60
+        assert body.events
+
+    def test_stop_skips_fences_and_preambles(self):
+        """Test that fences and preambles do not end the stream."""
+        stop = first_line_stop(72)
+        assert not stop("```\n")
+        assert not stop("Here is the message:\n\n")
+        assert not stop("```\nfeat: add")
+        assert stop("```\nfeat: add login\n")
+
+    def test_reads_everything_without_stop(self, monkeypatch):
+        """Test that the whole answer is read without a stop predicate."""
+        client, body, _ = self._client(monkeypatch, "groq", sse("fix: a\n", "b"))
+
+        assert client.generate_commit_message("prompt") == "fix: a\nb"
+        assert not body.events
+
+    def test_cohere_stream(self, monkeypatch):
+        """Test Cohere's JSON-lines stream events."""
+        events = [
+            json.dumps({"event_type": "stream-start"}) + "\n",
+            json.dumps({"event_type": "text-generation", "text": "docs: update"})
+            + "\n",
+            json.dumps({"event_type": "text-generation", "text": "\nWhy"}) + "\n",
+            json.dumps({"event_type": "stream-end"}) + "\n",
+        ]
+        client, body, _ = self._client(monkeypatch, "cohere", events)
+
+        message = client.generate_commit_message("prompt", stop=first_line_stop())
+
+        assert message == "docs: update\nWhy"
+        assert len(body.events) == 1
@@ -0,0 +1,131 @@
+"""Tests for the async client layer."""
+
+import asyncio
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from ai_commit_generator import async_clients  # noqa: E402
+from ai_commit_generator.api_clients import APIError, first_line_stop  # noqa: E402
+from ai_commit_generator.async_clients import create_async_client  # noqa: E402
+from ai_commit_generator.config import Config  # noqa: E402
+from ai_commit_generator.core import CommitGenerator  # noqa: E402
+
+
+class FakeGroq:
+    """Mock transport handler answering like the Groq API."""
+
+    def __init__(self, statuses=(), delay: float = 0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.requests = 0
+
+    async def __call__(self, request):
+        self.requests += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0), headers={"Retry-After": "0"})
+        prompt = json.loads(request.content)["messages"][0]["content"]
+        scope = "core" if "app.py" in prompt else "misc"
+        message = {"content": f"feat({scope}): add greeting"}
+        return httpx.Response(200, json={"choices": [{"message": message}]})
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """Route async requests to a fake Groq API."""
+    handler = FakeGroq()
+
+    def get_session(provider, base_url, pool_size):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(async_clients, "get_async_session", get_session)
+    return handler
+
+
+class TestAsyncClients:
+    """Test async generation with bounded concurrency."""
+
+    def test_concurrency_is_bounded(self, fake_groq):
+        """Test that requests in flight never exceed max_concurrency."""
+        fake_groq.delay = 0.02
+        client = create_async_client("groq", "key", "llama3-8b-8192", max_concurrency=4)
+
+        async def run():
+            return await asyncio.gather(
+                *(client.generate_commit_message(f"prompt {i}") for i in range(20))
+            )
+
+        messages = asyncio.run(run())
+
+        assert len(messages) == 20
+        assert fake_groq.peak == 4
+
+    def test_retries_server_errors(self, fake_groq):
+        """Test that the shared retry policy applies to async requests."""
+        fake_groq.statuses = [503, 429]
+        client = create_async_client("groq", "key", "llama3-8b-8192", retry_delay=0)
+
+        message = asyncio.run(client.generate_commit_message("prompt"))
+
+        assert message == "feat(misc): add greeting"
+        assert fake_groq.requests == 3
+
+    def test_invalid_key_not_retried(self, fake_groq):
+        """Test that non-retryable errors are raised at once."""
+        fake_groq.statuses = [401]
+        client = create_async_client("groq", "key", "llama3-8b-8192")
+
+        with pytest.raises(APIError, match="Invalid API key"):
+            asyncio.run(client.generate_commit_message("prompt"))
+        assert fake_groq.requests == 1
+
+    def test_streaming_stops_at_first_line(self, monkeypatch):
+        """Test that async streaming stops reading after the first line."""
+        sent = []
+
+        async def events():
+            for content in ["chore: bump", " deps\n", "Explanation", " follows"]:
+                sent.append(content)
+                event = {"choices": [{"delta": {"content": content}}]}
+                yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+
+        def handler(request):
+            return httpx.Response(200, content=events())
+
+        def get_session(provider, base_url, pool_size):
+            return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        monkeypatch.setattr(async_clients, "get_async_session", get_session)
+        client = create_async_client("groq", "key", "llama3-8b-8192", stream=True)
+
+        message = asyncio.run(
+            client.generate_commit_message("prompt", stop=first_line_stop(72))
+        )
+
+        assert message == "chore: bump deps"
+        assert "follows" not in sent
+
+    def test_agenerate_commit_message(self, fake_groq, monkeypatch):
+        """Test the async entry point of the generator."""
+        monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+            (repo_dir / "app.py").write_text("print('hello')\n")
+            subprocess.run(["git", "add", "app.py"], cwd=repo_dir, check=True)
+
+            generator = CommitGenerator(Config(repo_root=repo_dir), use_cache=False)
+            message = asyncio.run(generator.agenerate_commit_message())
+
+        assert message == "feat(core): add greeting"
@@ -0,0 +1,153 @@
+"""Tests for batch generation."""
+
+import json
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from ai_commit_generator.batch import run_batch
+from ai_commit_generator.cli import main
+from ai_commit_generator.config import Config
+from ai_commit_generator.core import CommitGenerator
+
+
+class FakeClient:
+    """API client stand-in naming the first changed file."""
+
+    provider = "groq"
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def generate_commit_message(self, prompt, timeout=None, stop=None):
+        with FakeClient.lock:
+            FakeClient.active += 1
+            FakeClient.peak = max(FakeClient.peak, FakeClient.active)
+        time.sleep(0.05)
+        with FakeClient.lock:
+            FakeClient.active -= 1
+        name = prompt.split("diff --git a/", 1)[1].split(".", 1)[0]
+        return f"feat({name}): add {name}"
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch):
+    """Answer every generation with the fake client."""
+    monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+    monkeypatch.setattr(CommitGenerator, "_get_client", lambda self: FakeClient())
+    FakeClient.peak = 0
+
+
+def make_repo(root: Path, name: str) -> Path:
+    """Create a repository with one staged file named after it."""
+    repo_dir = root / name
+    repo_dir.mkdir()
+    subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+    (repo_dir / f"{name}.py").write_text("print('hello')\n")
+    subprocess.run(["git", "add", "."], cwd=repo_dir, check=True)
+    return repo_dir
+
+
+DIFF = """diff --git a/billing.py b/billing.py
+--- a/billing.py
++++ b/billing.py
+@@ -1 +1 @@
+-old
++new
+"""
+
+
+class TestBatch:
+    """Test batch processing of repositories and diff files."""
+
+    def test_repos_and_diffs(self):
+        """Test that every input gets a result in input order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repos = [make_repo(root, name) for name in ("api", "web", "cli")]
+            diff_file = root / "billing.diff"
+            diff_file.write_text(DIFF)
+            config = Config(repo_root=repos[0])
+
+            results = list(run_batch([*repos, diff_file], max_workers=4, config=config))
+
+        assert [r["message"] for r in results] == [
+            "feat(api): add api",
+            "feat(web): add web",
+            "feat(cli): add cli",
+            "feat(billing): add billing",
+        ]
+        assert [r["type"] for r in results] == ["repo"] * 3 + ["diff"]
+        assert all(r["ok"] and r["provider"] == "groq" for r in results)
+        assert all(r["seconds"] is not None for r in results)
+        assert FakeClient.peak > 1
+
+    def test_failed_item_does_not_stop_batch(self):
+        """Test that an invalid repository is reported and the rest continue."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            not_a_repo = root / "plain"
+            not_a_repo.mkdir()
+            repo = make_repo(root, "api")
+
+            results = list(run_batch([not_a_repo, repo], max_workers=2))
+
+        assert not results[0]["ok"]
+        assert results[0]["error"]
+        assert results[1]["message"] == "feat(api): add api"
+
+    def test_each_repo_uses_its_own_env_file(self, monkeypatch):
+        """Test that every repository's .env keys are used for its requests."""
+        monkeypatch.delenv("GROQ_API_KEY")
+        keys = {}
+
+        class KeyClient(FakeClient):
+            def __init__(self, api_key):
+                self.api_key = api_key
+
+            def generate_commit_message(self, prompt, timeout=None, stop=None):
+                message = super().generate_commit_message(prompt, timeout, stop)
+                keys[message] = self.api_key
+                return message
+
+        monkeypatch.setattr(
+            CommitGenerator, "_get_client", lambda self: KeyClient(self.config.api_key)
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repos = [make_repo(root, name) for name in ("api", "web")]
+            for repo in repos:
+                (repo / ".env").write_text(f"GROQ_API_KEY=gsk_{repo.name * 10}\n")
+
+            results = list(run_batch(repos, max_workers=2, use_cache=False))
+
+        assert all(r["ok"] for r in results)
+        assert keys == {
+            "feat(api): add api": "gsk_" + "api" * 10,
+            "feat(web): add web": "gsk_" + "web" * 10,
+        }
+
+    def test_cli_writes_json_lines(self):
+        """Test that the batch command emits one JSON object per item."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repos = [str(make_repo(root, name)) for name in ("api", "web")]
+
+            result = CliRunner().invoke(main, ["batch", *repos])
+
+        assert result.exit_code == 0, result.output
+        # Older click versions mix the stderr progress into the output
+        lines = [
+            json.loads(line)
+            for line in result.stdout.splitlines()
+            if line.startswith("{")
+        ]
+        assert [line["message"] for line in lines] == [
+            "feat(api): add api",
+            "feat(web): add web",
+        ]
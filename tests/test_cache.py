@@ -0,0 +1,86 @@
+"""Tests for the generated message cache."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from ai_commit_generator.cache import MessageCache
+
+
+class TestMessageCache:
+    """Test cache keys, lookups and eviction."""
+
+    def test_key_depends_on_inputs(self):
+        """Test that every input changes the cache key."""
+        base = ("diff", "template", "groq", "llama3-70b-8192", ["feat", "fix"])
+        key = MessageCache.make_key(*base)
+
+        assert key == MessageCache.make_key(*base)
+        assert key != MessageCache.make_key("other", *base[1:])
+        assert key != MessageCache.make_key(*base[:2], "cohere", *base[3:])
+        assert key != MessageCache.make_key(*base[:3], "llama3-8b-8192", base[4])
+        assert key != MessageCache.make_key(*base[:4], ["feat"])
+        assert key != MessageCache.make_key(*base, max_chars=50)
+
+    def test_put_and_get(self):
+        """Test storing and retrieving a message."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = MessageCache(Path(temp_dir))
+            key = MessageCache.make_key("diff", "t", "groq", "m", ["feat"])
+
+            assert cache.get(key) is None
+            cache.put(key, "feat: add cache")
+            assert cache.get(key) == "feat: add cache"
+            assert cache.stats()["entries"] == 1
+
+    def test_expired_entries_are_ignored(self):
+        """Test that entries older than max age are not returned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = MessageCache(Path(temp_dir), max_age_days=0)
+            key = MessageCache.make_key("diff", "t", "groq", "m", ["feat"])
+            cache.put(key, "feat: add cache")
+            time.sleep(0.01)
+
+            assert cache.get(key) is None
+
+    def test_corrupt_entries_are_misses(self):
+        """Test that entries with a malformed timestamp are dropped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = MessageCache(Path(temp_dir))
+            key = MessageCache.make_key("diff", "t", "groq", "m", ["feat"])
+            cache.put(key, "feat: add cache")
+            path = cache._entry_path(key)
+            path.write_text('{"message": "feat: add cache", "created": "now"}')
+
+            assert cache.get(key) is None
+            assert not path.exists()
+
+    def test_eviction_keeps_most_recent(self):
+        """Test that the least recently used entries are evicted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = MessageCache(Path(temp_dir), max_entries=2)
+            keys = [
+                MessageCache.make_key(f"diff {i}", "t", "groq", "m", ["feat"])
+                for i in range(3)
+            ]
+            for i, key in enumerate(keys):
+                cache.put(key, f"feat: change {i}")
+                path = cache._entry_path(key)
+                os.utime(path, (time.time() + i, time.time() + i))
+
+            cache.put(keys[2], "feat: change 2")
+
+            assert cache.get(keys[0]) is None
+            assert cache.get(keys[2]) == "feat: change 2"
+            assert cache.stats()["entries"] == 2
+
+    def test_clear(self):
+        """Test clearing the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = MessageCache(Path(temp_dir))
+            cache.put(MessageCache.make_key("a", "t", "g", "m", []), "feat: a")
+            cache.put(MessageCache.make_key("b", "t", "g", "m", []), "feat: b")
+
+            assert cache.clear() == 2
+            assert cache.stats()["entries"] == 0
@@ -7,7 +7,14 @@ from pathlib import Path
 import pytest
 import yaml
 
-from ai_commit_generator.config import Config, ConfigError
+from ai_commit_generator import config as config_module
+from ai_commit_generator.config import (
+    Config,
+    ConfigError,
+    ConfigSnapshot,
+    config_cache_file,
+    reset_snapshots,
+)
 
 
 class TestConfig:
@@ -141,3 +148,115 @@ class TestConfig:
                     Config()  # Don't pass repo_root so it tries to find it
             finally:
                 os.chdir(old_cwd)
+
+
+class TestConfigSnapshot:
+    """Test compiled configuration snapshots and their caches."""
+
+    @pytest.fixture
+    def repo_dir(self):
+        reset_snapshots()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            (repo_dir / ".git").mkdir()
+            yield repo_dir
+        reset_snapshots()
+
+    def write_config(self, repo_dir: Path, settings: dict) -> None:
+        with open(repo_dir / ".commitgen.yml", "w") as f:
+            yaml.dump(settings, f)
+
+    def test_snapshot_is_immutable(self, repo_dir):
+        """Test that settings cannot be changed after loading."""
+        snapshot = Config(repo_root=repo_dir).snapshot
+
+        assert isinstance(snapshot.commit_types, tuple)
+        with pytest.raises(AttributeError):
+            snapshot.max_chars = 10
+        with pytest.raises(AttributeError):
+            snapshot.extra = 1
+
+    def test_nested_settings_are_immutable(self, repo_dir):
+        """Test that nested settings cannot change the defaults."""
+        self.write_config(repo_dir, {"api": {"keys": {"env": {"groq": ["A"]}}}})
+        snapshot = Config(repo_root=repo_dir).snapshot
+
+        with pytest.raises(TypeError):
+            snapshot.models["groq"]["default"] = "other-model"
+        with pytest.raises(TypeError):
+            snapshot.context_windows["model"] = 1
+        with pytest.raises(TypeError):
+            snapshot.env["GROQ_API_KEY"] = "key"
+        assert snapshot.key_env["groq"] == ("A",)
+
+        # The merged settings kept for pickling are a copy too
+        snapshot._settings["api"]["models"]["groq"]["default"] = "other-model"
+        default_models = Config.DEFAULT_CONFIG["api"]["models"]["groq"]
+        assert default_models["default"] != "other-model"
+
+    def test_snapshot_shared_until_files_change(self, repo_dir):
+        """Test that unchanged files are not parsed again."""
+        self.write_config(repo_dir, {"commit": {"max_chars": 50}})
+        first = Config(repo_root=repo_dir)
+        assert Config(repo_root=repo_dir).snapshot is first.snapshot
+
+        self.write_config(repo_dir, {"commit": {"max_chars": 60}})
+        second = Config(repo_root=repo_dir)
+
+        assert second.snapshot is not first.snapshot
+        assert second.max_chars == 60
+
+    def test_parsed_files_cached_on_disk(self, repo_dir, monkeypatch):
+        """Test that a new process reuses the parsed files from .git."""
+        self.write_config(repo_dir, {"commit": {"max_chars": 50}})
+        (repo_dir / ".env").write_text("SNAPSHOT_TEST_VAR=from_env_file\n")
+        monkeypatch.delenv("SNAPSHOT_TEST_VAR", raising=False)
+        Config(repo_root=repo_dir)
+        assert config_cache_file(repo_dir).exists()
+
+        def fail(file_path):
+            raise AssertionError("configuration parsed again")
+
+        reset_snapshots()
+        monkeypatch.setattr(config_module, "secure_yaml_load", fail)
+        config = Config(repo_root=repo_dir)
+
+        assert config.max_chars == 50
+        assert config.getenv("SNAPSHOT_TEST_VAR") == "from_env_file"
+
+    def test_disk_cache_private(self, repo_dir):
+        """Test that the cached .env variables are readable by the owner only."""
+        (repo_dir / ".env").write_text("GROQ_API_KEY=gsk_secret\n")
+        Config(repo_root=repo_dir)
+        assert config_cache_file(repo_dir).stat().st_mode & 0o777 == 0o600
+
+    def test_disk_cache_disabled(self, repo_dir):
+        """Test that cache.config false keeps .git untouched."""
+        self.write_config(repo_dir, {"cache": {"config": False}})
+        Config(repo_root=repo_dir)
+        assert not config_cache_file(repo_dir).exists()
+
+    def test_env_file_does_not_override(self, repo_dir, monkeypatch):
+        """Test that variables already set win over the .env file."""
+        (repo_dir / ".env").write_text("SNAPSHOT_TEST_VAR=from_env_file\n")
+        monkeypatch.setenv("SNAPSHOT_TEST_VAR", "from_environment")
+        config = Config(repo_root=repo_dir)
+        assert config.getenv("SNAPSHOT_TEST_VAR") == "from_environment"
+
+    def test_env_file_stays_out_of_environment(self, repo_dir, monkeypatch):
+        """Test that .env values are not copied into the process environment."""
+        (repo_dir / ".env").write_text("SNAPSHOT_TEST_VAR=from_env_file\n")
+        monkeypatch.delenv("SNAPSHOT_TEST_VAR", raising=False)
+        config = Config(repo_root=repo_dir)
+        assert config.getenv("SNAPSHOT_TEST_VAR") == "from_env_file"
+        assert "SNAPSHOT_TEST_VAR" not in os.environ
+
+    def test_snapshot_pickles(self, repo_dir):
+        """Test that snapshots can be sent to worker processes."""
+        import pickle
+
+        snapshot = Config(repo_root=repo_dir).snapshot
+        copy = pickle.loads(pickle.dumps(snapshot))
+
+        assert isinstance(copy, ConfigSnapshot)
+        assert copy.exclude_patterns == snapshot.exclude_patterns
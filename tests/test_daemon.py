@@ -0,0 +1,97 @@
+"""Tests for the generation daemon."""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_commit_generator.daemon import (
+    CommitDaemon,
+    DaemonError,
+    DaemonUnavailable,
+    ensure_private_dir,
+    is_running,
+    private_socket_dir,
+    request_generation,
+    socket_path,
+    stop_daemon,
+)
+
+
+class TestDaemon:
+    """Test daemon socket handling and client fallback."""
+
+    def test_socket_path_inside_git_dir(self):
+        """Test that short repository paths keep the socket in .git."""
+        repo_dir = Path("/tmp/repo")
+        assert socket_path(repo_dir) == repo_dir / ".git" / "smart-commits-ai.sock"
+
+    def test_socket_path_falls_back_for_long_paths(self):
+        """Test that long repository paths use a short temporary socket."""
+        repo_dir = Path("/tmp") / ("x" * 120)
+        path = socket_path(repo_dir)
+        assert len(str(path)) <= 100
+        assert path.parent == private_socket_dir()
+        assert path.parent.name.startswith("smart-commits-ai-")
+
+    def test_private_dir_is_owner_only(self):
+        """Test that the socket directory is created for the owner only."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "sockets"
+            ensure_private_dir(path)
+            assert path.stat().st_mode & 0o777 == 0o700
+
+            path.chmod(0o755)
+            with pytest.raises(DaemonError, match="accessible"):
+                ensure_private_dir(path)
+
+    def test_foreign_socket_is_not_used(self, monkeypatch):
+        """Test that a socket created by another user is never connected to."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            (repo_dir / ".git").mkdir()
+            socket_path(repo_dir).write_text("")
+            monkeypatch.setattr(os, "getuid", lambda: os.stat(temp_dir).st_uid + 1)
+            monkeypatch.setattr(
+                socket.socket,
+                "connect",
+                lambda *args: pytest.fail("connected to a foreign socket"),
+            )
+
+            with pytest.raises(DaemonUnavailable, match="another user"):
+                request_generation(repo_dir, timeout=1.0)
+
+    def test_client_without_daemon(self):
+        """Test that the client reports an unavailable daemon."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            (repo_dir / ".git").mkdir()
+
+            assert not is_running(repo_dir)
+            with pytest.raises(DaemonUnavailable):
+                request_generation(repo_dir, timeout=1.0)
+
+    def test_serve_and_stop(self):
+        """Test that a daemon answers pings and shuts down on request."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            (repo_dir / ".git").mkdir()
+
+            daemon = CommitDaemon(repo_dir, idle_timeout=60)
+            thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+            thread.start()
+
+            for _ in range(100):
+                if is_running(repo_dir):
+                    break
+                time.sleep(0.02)
+
+            assert is_running(repo_dir)
+            assert stop_daemon(repo_dir)
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+            assert not socket_path(repo_dir).exists()
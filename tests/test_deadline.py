@@ -0,0 +1,81 @@
+"""Tests for the end-to-end generation time budget."""
+
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from ai_commit_generator.config import Config
+from ai_commit_generator.core import CommitGenerator
+from ai_commit_generator.deadline import Deadline, DeadlineExceeded
+
+
+class SlowClient:
+    """API client stand-in that answers slowly with an invalid message."""
+
+    provider = "groq"
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.timeouts = []
+
+    def generate_commit_message(self, prompt: str, timeout=None, stop=None) -> str:
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return "not a conventional commit"
+
+
+def make_repo(temp_dir: str, timeout: int) -> Path:
+    """Create a repository with one staged file and a time budget."""
+    repo_dir = Path(temp_dir)
+    subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+    (repo_dir / "app.py").write_text("print('hello')\n")
+    subprocess.run(["git", "add", "app.py"], cwd=repo_dir, check=True)
+    with open(repo_dir / ".commitgen.yml", "w") as f:
+        yaml.dump({"security": {"timeout": timeout}, "cache": {"enabled": False}}, f)
+    return repo_dir
+
+
+class TestDeadline:
+    """Test the deadline and its use by the generator."""
+
+    def test_no_deadline(self):
+        """Test that a deadline without a budget never expires."""
+        deadline = Deadline(None)
+
+        assert deadline.remaining() is None
+        assert deadline.timeout(30) == 30
+        deadline.check("anything")
+
+    def test_expired_deadline(self):
+        """Test that a spent budget raises and caps stage timeouts."""
+        deadline = Deadline(0)
+
+        assert deadline.expired
+        assert deadline.timeout(30) == 0
+        try:
+            deadline.check("sending the prompt")
+        except DeadlineExceeded as e:
+            assert "sending the prompt" in str(e)
+        else:
+            raise AssertionError("DeadlineExceeded not raised")
+
+    def test_generator_falls_back_when_budget_spent(self, monkeypatch):
+        """Test that generation stops at the budget with the default message."""
+        monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config(repo_root=make_repo(temp_dir, timeout=1))
+            generator = CommitGenerator(config)
+            client = SlowClient(delay=0.6)
+            generator._client = client
+
+            start = time.monotonic()
+            message = generator.generate_commit_message()
+            elapsed = time.monotonic() - start
+
+        assert message == config.default_message
+        assert elapsed < 1.5
+        assert all(timeout <= 1 for timeout in client.timeouts)
+        assert len(client.timeouts) == 2
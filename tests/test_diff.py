@@ -0,0 +1,164 @@
+"""Tests for the structured diff model."""
+
+from ai_commit_generator.diff import (
+    ADDED,
+    DELETED,
+    MODIFIED,
+    RENAMED,
+    fair_shares,
+    parse_diff,
+    render_budgeted,
+    render_file,
+    split_lines,
+)
+
+DIFF = """diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,3 +1,4 @@
+ import os
+-import sys
++import re
++import json
+ 
+@@ -20,2 +21,2 @@ def main():
+-    pass
++    run()
+diff --git a/new.txt b/new.txt
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ b/new.txt
+@@ -0,0 +1 @@
++hello
+diff --git a/old.txt b/old.txt
+deleted file mode 100644
+index 4444444..0000000
+--- a/old.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+diff --git a/before.py b/after.py
+similarity index 100%
+rename from before.py
+rename to after.py
+diff --git a/logo.png b/logo.png
+index 5555555..6666666 100644
+Binary files a/logo.png and b/logo.png differ
+"""
+
+
+class TestParseDiff:
+    """Test single-pass diff parsing."""
+
+    def test_files_and_change_types(self):
+        """Test that files, paths and change types are recognised."""
+        parsed = parse_diff(split_lines(DIFF))
+
+        assert [f.path for f in parsed.files] == [
+            "src/app.py",
+            "new.txt",
+            "old.txt",
+            "after.py",
+            "logo.png",
+        ]
+        assert [f.change_type for f in parsed.files] == [
+            MODIFIED,
+            ADDED,
+            DELETED,
+            RENAMED,
+            MODIFIED,
+        ]
+        assert parsed.files[3].old_path == "before.py"
+        assert parsed.files[4].binary
+        assert parsed.text == DIFF
+
+    def test_hunk_statistics(self):
+        """Test per-hunk and per-file line counts."""
+        app = parse_diff(split_lines(DIFF)).files[0]
+
+        assert (app.added, app.removed) == (3, 2)
+        assert [(h.added, h.removed) for h in app.hunks] == [(2, 1), (1, 1)]
+        assert app.hunk_text(app.hunks[1]).startswith("@@ -20,2 +21,2 @@")
+        assert app.header.endswith("+++ b/src/app.py\n")
+
+    def test_exclusion(self):
+        """Test that excluded files are dropped while parsing."""
+        parsed = parse_diff(split_lines(DIFF), exclude=lambda p: p.endswith(".txt"))
+
+        assert [f.path for f in parsed.files] == ["src/app.py", "after.py", "logo.png"]
+
+    def test_size_limit_stops_consuming(self):
+        """Test that parsing stops once the size limit is exceeded."""
+        consumed = []
+
+        def lines():
+            for line in split_lines(DIFF):
+                consumed.append(line)
+                yield line
+
+        parsed = parse_diff(lines(), size_limit=100)
+
+        assert parsed.truncated
+        assert parsed.size > 100
+        assert len(consumed) < len(split_lines(DIFF))
+
+
+def make_file(path: str, hunks: list) -> str:
+    """Build a file diff whose hunks have the given (context, changed) sizes."""
+    text = f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+    for i, (context, changed) in enumerate(hunks):
+        text += f"@@ -{i * 100},1 +{i * 100},1 @@\n"
+        text += "".join(f" context {i}.{j}\n" for j in range(context))
+        text += "".join(f"+changed {i}.{j}\n" for j in range(changed))
+    return text
+
+
+class TestBudgetedRendering:
+    """Test per-file budgeted truncation."""
+
+    def test_fair_shares(self):
+        """Test that small needs are met and the rest is split evenly."""
+        assert fair_shares([10, 500, 1000], 610) == [10, 300, 300]
+        assert fair_shares([10, 20], 100) == [10, 20]
+        assert fair_shares([], 100) == []
+
+    def test_max_file_lines_keeps_densest_hunks(self):
+        """Test that the line cap keeps dense hunks and marks elided lines."""
+        diff_file = parse_diff(
+            split_lines(make_file("a.py", [(20, 1), (1, 5), (20, 1)]))
+        ).files[0]
+
+        rendered = render_file(diff_file, max_lines=10)
+
+        assert "+changed 1.0" in rendered
+        assert "+changed 0.0" not in rendered
+        assert "... [22 lines elided]" in rendered
+        assert rendered.startswith("diff --git a/a.py b/a.py")
+
+    def test_every_file_is_covered(self):
+        """Test that one huge file cannot crowd out the others."""
+        text = make_file("huge.sql", [(0, 400)] * 5)
+        text += make_file("small.py", [(2, 2)])
+        text += make_file("other.py", [(2, 2)])
+        parsed = parse_diff(split_lines(text))
+
+        rendered = render_budgeted(parsed, max_chars=1500, max_file_lines=100)
+
+        assert len(rendered) <= 1600
+        assert "+changed 0.1" in rendered
+        for path in ("huge.sql", "small.py", "other.py"):
+            assert f"diff --git a/{path} b/{path}" in rendered
+        assert "lines elided" in rendered
+
+    def test_file_size_limit_keeps_statistics(self):
+        """Test that lines over the per-file limit still count."""
+        parsed = parse_diff(
+            split_lines(make_file("big.txt", [(0, 100)])), file_size_limit=200
+        )
+        big = parsed.files[0]
+
+        assert big.added == 100
+        assert big.elided > 0
+        assert big.size <= 200
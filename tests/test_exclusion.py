@@ -0,0 +1,150 @@
+"""Equivalence tests for git pathspec exclusion and the Python diff filter."""
+
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from ai_commit_generator.config import Config
+from ai_commit_generator.core import CommitGenerator, exclude_pathspecs
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+FILES = [
+    "README.md",
+    "src/app.py",
+    "src/nested/deep/module.py",
+    "yarn.lock",
+    "packages/web/package-lock.json",
+    "packages/web/yarn.lock",
+    "debug.log",
+    "logs/server.log",
+    "node_modules/left-pad/index.js",
+    "node_modules/@scope/pkg/lib/deep.js",
+    "web/node_modules/pkg/index.js",
+    "dist/bundle.js",
+    "build/output.txt",
+    "static/app.min.js",
+    "static/app.min.css",
+    "static/app.js",
+    ".env.local",
+    "config/.env.production",
+    "secrets/token.txt",
+    "secrets/nested/key.txt",
+    "certs/server.pem",
+    "certs/client.key",
+    "keystore.p12",
+    "docs/file with spaces.md",
+    "docs/file[1].md",
+    "docs/a.md",
+]
+
+PATTERN_SETS = [
+    Config.DEFAULT_CONFIG["processing"]["exclude_patterns"],
+    ["*.lock", "*.log", "node_modules/*", "dist/*", "*.min.js"],
+    ["src/*/deep/*", "static/app.?s", "docs/file[0-9]*"],
+    ["*/node_modules/*", "packages/*"],
+    ["**/deep/*", "**/*.js", "static/**"],
+    ["*.md", "secrets/*", "!docs/*", "*.lock", "!packages/*"],
+    ["docs", "secrets", "yarn.lock", "static/app.js"],
+    [],
+]
+
+
+def make_repo(temp_dir: str, patterns: list, **processing) -> Path:
+    """Create a repository with every test file staged."""
+    repo_dir = Path(temp_dir)
+    subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+    for name in FILES:
+        path = repo_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"content of {name}\n")
+    subprocess.run(["git", "add", "-f", "--", *FILES], cwd=repo_dir, check=True)
+
+    config_file = repo_dir / ".commitgen.yml"
+    with open(config_file, "w") as f:
+        yaml.dump(
+            {
+                "processing": {
+                    "exclude_patterns": patterns,
+                    "max_diff_size": 50000,
+                    **processing,
+                }
+            },
+            f,
+        )
+    return repo_dir
+
+
+class TestPathspecExclusion:
+    """Test that git-side exclusion matches the Python filter."""
+
+    @pytest.mark.parametrize("patterns", PATTERN_SETS)
+    def test_pathspec_matches_python_filter(self, patterns):
+        """Test that pushing patterns down to git yields the same diff."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = make_repo(temp_dir, patterns)
+            generator = CommitGenerator(Config(repo_root=repo_dir))
+
+            raw_diff = subprocess.run(
+                ["git", "diff", "--cached"],
+                cwd=repo_dir,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+            # The split/join filter drops the final newline when the last
+            # file is excluded; the streamed diff keeps whole lines
+            expected = generator._filter_excluded_files(raw_diff).rstrip("\n")
+            assert generator._get_staged_diff().rstrip("\n") == expected
+
+    def test_truncated_diff_matches(self):
+        """Test that the size budget cuts both paths at the same point."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = make_repo(
+                temp_dir, PATTERN_SETS[0], max_diff_size=700, truncate_files=False
+            )
+            generator = CommitGenerator(Config(repo_root=repo_dir))
+
+            raw_diff = subprocess.run(
+                ["git", "diff", "--cached"],
+                cwd=repo_dir,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+            streamed = generator._truncate_diff(generator._get_staged_diff())
+            assert streamed == generator._process_diff(raw_diff)
+            assert streamed.endswith("... [truncated]")
+
+    def test_untranslatable_patterns_are_left_to_python(self):
+        """Test that patterns git interprets differently are not pushed down."""
+        pathspecs = exclude_pathspecs(
+            ["*.lock", ":(top)x", "a\\b", "[^a]*", "docs", "yarn.lock"]
+        )
+
+        assert pathspecs == [".", ":(exclude)*.lock"]
+
+    def test_negated_patterns_limit_pushdown(self):
+        """Test that only patterns after the last negation are pushed down."""
+        pathspecs = exclude_pathspecs(["dist/*", "!dist/keep.js", "*.lock"])
+
+        assert pathspecs == [".", ":(exclude)*.lock"]
+
+    def test_no_patterns_means_no_pathspecs(self):
+        """Test that an empty pattern list adds no pathspecs."""
+        assert exclude_pathspecs([]) == []
+
+    def test_only_excluded_files_still_counts_as_staged(self):
+        """Test that staging only excluded files is not reported as empty."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = make_repo(temp_dir, ["*"])
+            generator = CommitGenerator(Config(repo_root=repo_dir))
+
+            assert generator._get_staged_diff() == ""
+            assert generator._has_staged_changes()
@@ -0,0 +1,108 @@
+"""Tests for hedged provider requests."""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_commit_generator.api_clients import APIError
+from ai_commit_generator.hedge import LatencyTracker, race
+
+
+def answer(message, delay=0.0, calls=None):
+    """Build a call that answers after a delay."""
+
+    def call():
+        if calls is not None:
+            calls.append(message)
+        time.sleep(delay)
+        return message
+
+    return call
+
+
+def fail(error="boom"):
+    """Build a call that fails."""
+
+    def call():
+        raise APIError(error)
+
+    return call
+
+
+class TestRace:
+    """Test staggered racing of provider calls."""
+
+    def test_fast_primary_skips_backup(self):
+        """Test that the backup is never started when the primary is fast."""
+        calls = []
+        result = race(
+            [answer("primary", 0.01, calls), answer("backup", 0, calls)], delay=0.5
+        )
+
+        assert result == "primary"
+        assert calls == ["primary"]
+
+    def test_slow_primary_is_hedged(self):
+        """Test that a backup answering first wins."""
+        start = time.monotonic()
+        result = race([answer("primary", 1.0), answer("backup", 0.05)], delay=0.1)
+
+        assert result == "backup"
+        assert time.monotonic() - start < 0.5
+
+    def test_failed_primary_starts_backup_at_once(self):
+        """Test that an error fires the next provider without waiting."""
+        start = time.monotonic()
+        result = race([fail(), answer("backup")], delay=5)
+
+        assert result == "backup"
+        assert time.monotonic() - start < 1
+
+    def test_invalid_answers_return_none(self):
+        """Test that invalid answers from every provider give None."""
+        assert race([answer(None), fail()], delay=0) is None
+
+    def test_all_failed(self):
+        """Test that the last error is raised when every call fails."""
+        with pytest.raises(APIError, match="second"):
+            race([fail("first"), fail("second")], delay=0)
+
+    def test_timeout(self):
+        """Test that the race gives up at its timeout."""
+        with pytest.raises(APIError, match="timed out"):
+            race([answer("late", 1.0)], delay=0, timeout=0.1)
+
+
+class TestLatencyTracker:
+    """Test recording and persisting provider latencies."""
+
+    def test_delay_uses_default_until_enough_samples(self):
+        """Test the initial delay and the percentile afterwards."""
+        tracker = LatencyTracker()
+        for seconds in range(1, 11):
+            tracker.record("groq", seconds / 10)
+            if seconds < 10:
+                assert tracker.delay("groq", 90, default=2.0) == 2.0
+
+        assert tracker.delay("groq", 90, default=2.0) == 0.9
+        assert tracker.percentile("groq", 50) == 0.5
+
+    def test_save_and_load(self):
+        """Test that latencies survive between runs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "latency.json"
+            tracker = LatencyTracker(path)
+            tracker.record("cohere", 1.5)
+            tracker.save()
+
+            assert LatencyTracker.load(path).percentile("cohere", 90) == 1.5
+
+    def test_load_ignores_corrupt_file(self):
+        """Test that an unreadable file starts empty."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "latency.json"
+            path.write_text("{not json")
+
+            assert LatencyTracker.load(path).percentile("groq", 90) is None
@@ -0,0 +1,222 @@
+"""Tests for local commit messages."""
+
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from ai_commit_generator.api_clients import APIError
+from ai_commit_generator.config import Config, ConfigError
+from ai_commit_generator.core import CommitGenerator
+from ai_commit_generator.diff import parse_diff, split_lines
+from ai_commit_generator.heuristics import (
+    FileChange,
+    categorize,
+    changes_from_diff,
+    classify,
+    parse_name_status,
+)
+
+TYPES = Config.DEFAULT_CONFIG["commit"]["types"]
+SCOPES = Config.DEFAULT_CONFIG["commit"]["scopes"]
+
+
+def suggest(*changes: FileChange, types=TYPES, max_chars=72):
+    return classify(changes, types, SCOPES, max_chars)
+
+
+class TestClassify:
+    """Test suggesting messages from changed files."""
+
+    @pytest.mark.parametrize(
+        "changes,message",
+        [
+            ([FileChange("M", "README.md")], "docs: update README.md"),
+            (
+                [FileChange("A", "docs/setup.md"), FileChange("A", "docs/usage.md")],
+                "docs: add documentation in docs",
+            ),
+            ([FileChange("M", "yarn.lock")], "build(deps): update dependencies"),
+            (
+                [FileChange("M", "package.json"), FileChange("M", "package-lock.json")],
+                "build(deps): update dependencies",
+            ),
+            ([FileChange("A", "tests/test_api.py")], "test: add test_api.py"),
+            ([FileChange("M", ".github/workflows/ci.yml")], "ci: update ci.yml"),
+            (
+                [FileChange("R", "src/new.py", "src/old.py", 100)],
+                "refactor: rename old.py to new.py",
+            ),
+            (
+                [
+                    FileChange("R", "lib/a.py", "src/a.py", 100),
+                    FileChange("R", "lib/b.py", "src/b.py", 100),
+                ],
+                "refactor: move 2 files to lib",
+            ),
+        ],
+    )
+    def test_trivial_changes(self, changes, message):
+        """Test confident messages for single-category changes."""
+        suggestion = suggest(*changes)
+        assert suggestion.message == message
+        assert suggestion.confidence >= 0.7
+
+    def test_code_changes_not_confident(self):
+        """Test that code changes only get a low-confidence message."""
+        suggestion = suggest(FileChange("M", "src/app.py"), FileChange("M", "a.md"))
+        assert suggestion.message == "chore: update 2 files"
+        assert suggestion.confidence < 0.5
+
+    @pytest.mark.parametrize(
+        "path",
+        ["src/latest_results.py", "src/contest_utils.py", "lib/attest_test.pyc"],
+    )
+    def test_production_files_are_not_tests(self, path):
+        """Test that only file names, not whole paths, mark test files."""
+        assert categorize(path) is None
+        assert suggest(FileChange("M", path)).rule == "generic"
+
+    def test_test_file_names(self):
+        """Test that test files are recognized in any directory."""
+        assert categorize("src/pkg/test_api.py") == "test"
+        assert categorize("cmd/server_test.go") == "test"
+        assert categorize("web/app.spec.ts") == "test"
+
+    def test_edited_rename_is_not_pure(self):
+        """Test that renames with content changes are not refactors."""
+        suggestion = suggest(FileChange("R", "src/new.py", "src/old.py", 80))
+        assert suggestion.rule == "generic"
+
+    def test_unknown_type_replaced(self):
+        """Test that types missing from the configuration are replaced."""
+        suggestion = suggest(FileChange("M", "README.md"), types=["feat", "chore"])
+        assert suggestion.message == "chore: update README.md"
+        assert suggestion.confidence < 0.5
+
+    def test_unsafe_names_not_quoted(self):
+        """Test that file names with unusual characters are left out."""
+        suggestion = suggest(FileChange("M", "docs/$(rm -rf).md"))
+        assert suggestion.message == "docs: update documentation in docs"
+
+    def test_too_long(self):
+        """Test that no message is suggested beyond max_chars."""
+        assert suggest(FileChange("M", "README.md"), max_chars=10) is None
+
+    def test_nothing_changed(self):
+        """Test that an empty change list has no message."""
+        assert suggest() is None
+
+    def test_fast(self):
+        """Test that classifying a large commit stays well below a request."""
+        changes = [FileChange("M", f"docs/page{i}.md") for i in range(500)]
+        start = time.perf_counter()
+        suggest(*changes)
+        # Typically a few milliseconds; the limit leaves room for busy CI
+        assert time.perf_counter() - start < 0.5
+
+
+class TestChangeLists:
+    """Test reading changed files."""
+
+    def test_parse_name_status(self):
+        """Test parsing NUL-separated name-status output."""
+        output = "M\x00README.md\x00R100\x00old.py\x00new.py\x00A\x00a b.txt\x00"
+        changes = parse_name_status(output)
+
+        assert [(c.status, c.old_path, c.path) for c in changes] == [
+            ("M", "README.md", "README.md"),
+            ("R", "old.py", "new.py"),
+            ("A", "a b.txt", "a b.txt"),
+        ]
+        assert changes[1].pure_rename
+
+    def test_changes_from_diff(self):
+        """Test listing changes of a diff file."""
+        diff = (
+            "diff --git a/old.py b/new.py\n"
+            "similarity index 100%\n"
+            "rename from old.py\n"
+            "rename to new.py\n"
+            "diff --git a/doc.md b/doc.md\n"
+            "new file mode 100644\n"
+            "@@ -0,0 +1 @@\n"
+            "+# Doc\n"
+        )
+        changes = changes_from_diff(parse_diff(split_lines(diff)))
+
+        assert [(c.status, c.path) for c in changes] == [
+            ("R", "new.py"),
+            ("A", "doc.md"),
+        ]
+        assert changes[0].pure_rename
+
+
+class FailingClient:
+    """API client stand-in that counts calls and always fails."""
+
+    provider = "groq"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_commit_message(self, prompt, timeout=None, stop=None):
+        self.calls += 1
+        raise APIError("provider down", 503)
+
+
+class TestGeneratorHeuristics:
+    """Test local messages in commit message generation."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+        client = FailingClient()
+        monkeypatch.setattr(CommitGenerator, "_get_client", lambda self: client)
+        return client
+
+    def generator(self, repo_dir: Path, mode: str, *files: str) -> CommitGenerator:
+        subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+        with open(repo_dir / ".commitgen.yml", "w") as f:
+            yaml.dump({"heuristics": {"mode": mode}}, f)
+        for name in files:
+            (repo_dir / name).write_text(f"{name}\n")
+        subprocess.run(["git", "add", *files], cwd=repo_dir, check=True)
+        return CommitGenerator(Config(repo_root=repo_dir), use_cache=False)
+
+    def test_local_skips_api(self, client):
+        """Test that a confident local message is used without the API."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            generator = self.generator(Path(temp_dir), "local", "README.md")
+            assert generator.generate_commit_message() == "docs: add README.md"
+        assert client.calls == 0
+
+    def test_local_asks_api_when_unsure(self, client):
+        """Test that code changes still go to the API in local mode."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            generator = self.generator(Path(temp_dir), "local", "app.py")
+            assert generator.generate_commit_message() == "feat: add app.py"
+        assert client.calls == 1
+
+    def test_fallback_replaces_default_message(self, client):
+        """Test that the local message replaces the default on API failure."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            generator = self.generator(Path(temp_dir), "fallback", "README.md")
+            assert generator.generate_commit_message() == "docs: add README.md"
+        assert client.calls == 1
+
+    def test_api_mode_unchanged(self, client):
+        """Test that the default mode keeps the default message."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            generator = self.generator(Path(temp_dir), "api", "README.md")
+            assert generator.generate_commit_message() == "chore: update files"
+
+    def test_invalid_mode(self, client):
+        """Test that unknown modes fail validation."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            generator = self.generator(Path(temp_dir), "sometimes", "README.md")
+            with pytest.raises(ConfigError, match="heuristics mode"):
+                generator.config.validate()
@@ -0,0 +1,175 @@
+"""Tests for regenerating messages of existing history."""
+
+import json
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from ai_commit_generator.config import Config
+from ai_commit_generator.core import CommitGenerator, GitError
+from ai_commit_generator.history import HistoryRewriter, load_mapping, parse_log
+
+
+class FakeClient:
+    """API client stand-in naming the first changed file."""
+
+    provider = "groq"
+    calls = 0
+    lock = threading.Lock()
+
+    def generate_commit_message(self, prompt, timeout=None, stop=None):
+        with FakeClient.lock:
+            FakeClient.calls += 1
+        name = prompt.split("diff --git a/", 1)[1].split(".", 1)[0]
+        return f"feat({name}): add {name}"
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch):
+    """Answer every generation with the fake client."""
+    monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+    monkeypatch.setattr(CommitGenerator, "_get_client", lambda self: FakeClient())
+    FakeClient.calls = 0
+
+
+def git(repo_dir: Path, *args: str) -> str:
+    """Run git in a test repository."""
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo():
+    """Repository with one commit per file, all with placeholder messages."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_dir = Path(temp_dir)
+        git(repo_dir, "init", "-q")
+        for name in ("api", "web", "cli"):
+            (repo_dir / f"{name}.py").write_text(f"print('{name}')\n")
+            git(repo_dir, "add", ".")
+            git(repo_dir, "commit", "-q", "-m", "chore: update files")
+        (repo_dir / "docs.md").write_text("# Docs\n")
+        git(repo_dir, "add", ".")
+        git(repo_dir, "commit", "-q", "-m", "docs: add docs")
+        yield repo_dir
+
+
+class TestParseLog:
+    """Test splitting git log output into commits."""
+
+    def test_splits_commits(self):
+        """Test that each header starts a new commit with its own diff."""
+        lines = [
+            "\x00aaa first commit\n",
+            "\n",
+            "diff --git a/a.py b/a.py\n",
+            "+a\n",
+            "\x00bbb second\n",
+            "\x00ccc third\n",
+            "\n",
+            "diff --git a/c.py b/c.py\n",
+        ]
+        commits = list(parse_log(lines, max_diff_size=1000))
+
+        assert [(c.sha, c.subject) for c in commits] == [
+            ("aaa", "first commit"),
+            ("bbb", "second"),
+            ("ccc", "third"),
+        ]
+        assert commits[0].diff == "diff --git a/a.py b/a.py\n+a\n"
+        assert commits[1].diff == ""
+
+    def test_caps_diff_size(self):
+        """Test that a huge commit diff is not kept in full."""
+        lines = ["\x00aaa big\n"] + ["+x" * 50 + "\n"] * 1000
+        commit = next(parse_log(lines, max_diff_size=500))
+        assert len(commit.diff) < 1000
+
+
+class TestHistoryRewriter:
+    """Test generating messages for a revision range."""
+
+    def test_writes_mapping(self, repo):
+        """Test that every commit in the range gets a mapping entry."""
+        mapping = repo / "mapping.jsonl"
+        rewriter = HistoryRewriter(Config(repo_root=repo), max_workers=2)
+
+        stats = rewriter.run("HEAD", mapping)
+
+        entries = [json.loads(line) for line in mapping.read_text().splitlines()]
+        assert stats == {"done": 4, "skipped": 0, "default": 0, "failed": 0}
+        assert sorted(e["message"] for e in entries) == [
+            "feat(api): add api",
+            "feat(cli): add cli",
+            "feat(docs): add docs",
+            "feat(web): add web",
+        ]
+        shas = git(repo, "rev-list", "HEAD").split()
+        assert {e["commit"] for e in entries} == set(shas)
+
+    def test_match_selects_commits(self, repo):
+        """Test that only commits with a matching subject are reworded."""
+        mapping = repo / "mapping.jsonl"
+        rewriter = HistoryRewriter(Config(repo_root=repo))
+
+        stats = rewriter.run("HEAD", mapping, match="^chore: update files$")
+
+        assert stats == {"done": 3, "skipped": 1, "default": 0, "failed": 0}
+
+    def test_resumes_from_mapping(self, repo):
+        """Test that commits already in the mapping file are not asked again."""
+        mapping = repo / "mapping.jsonl"
+        first = git(repo, "rev-list", "--reverse", "HEAD").split()[0]
+        mapping.write_text(
+            json.dumps({"commit": first, "message": "feat(api): add api"})
+            + '\n{"commit": "partial'
+        )
+        rewriter = HistoryRewriter(Config(repo_root=repo))
+
+        stats = rewriter.run("HEAD", mapping)
+
+        assert stats == {"done": 3, "skipped": 1, "default": 0, "failed": 0}
+        assert FakeClient.calls == 3
+        assert len(load_mapping(str(mapping))) == 4
+
+    def test_default_messages_are_not_checkpointed(self, repo, monkeypatch):
+        """Test that fallback messages are left out so a rerun retries them."""
+        monkeypatch.setattr(
+            CommitGenerator,
+            "generate_from_diff",
+            lambda self, diff: self.config.default_message,
+        )
+        mapping = repo / "mapping.jsonl"
+
+        stats = HistoryRewriter(Config(repo_root=repo)).run("HEAD", mapping)
+
+        assert stats == {"done": 0, "skipped": 0, "default": 4, "failed": 0}
+        assert mapping.read_text() == ""
+
+    def test_failed_commits_are_not_checkpointed(self, repo, monkeypatch):
+        """Test that commits whose generation raised are counted as failed."""
+
+        def fail(self, diff):
+            raise GitError("boom")
+
+        monkeypatch.setattr(CommitGenerator, "generate_from_diff", fail)
+        mapping = repo / "mapping.jsonl"
+
+        stats = HistoryRewriter(Config(repo_root=repo)).run("HEAD", mapping)
+
+        assert stats == {"done": 0, "skipped": 0, "default": 0, "failed": 4}
+        assert mapping.read_text() == ""
+
+    def test_rejects_option_as_range(self, repo):
+        """Test that a range cannot smuggle options into git."""
+        rewriter = HistoryRewriter(Config(repo_root=repo))
+        with pytest.raises(GitError):
+            list(rewriter.commits("--output=/tmp/x"))
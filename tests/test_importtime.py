@@ -0,0 +1,115 @@
+"""Tests for the start-up cost of the Git hook's fast path."""
+
+import subprocess
+import sys
+
+import pytest
+
+from ai_commit_generator import fastpath
+from ai_commit_generator.core import CommitGenerator
+
+# Imported the way the hook imports them
+STARTUP_IMPORT = "import ai_commit_generator.fastpath, ai_commit_generator.core"
+
+
+def import_times() -> dict:
+    """Import the fast path in a fresh interpreter.
+
+    Returns:
+        Cumulative import time in microseconds by module name
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_IMPORT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    """Test what the hook's fast path imports and how long it takes."""
+
+    def test_defers_slow_modules(self):
+        """Test that slow dependencies are not imported at start-up."""
+        imported = {name.split(".")[0] for name in import_times()}
+        assert not imported & set(fastpath.DEFERRED_MODULES)
+
+    def test_within_budget(self):
+        """Test that the cold start stays within the start-up budget."""
+        # Best of a few runs, so a busy machine does not fail the test
+        best = min(
+            sum(
+                times.get(name, 0)
+                for name in ("ai_commit_generator.fastpath", "ai_commit_generator.core")
+            )
+            for times in (import_times() for _ in range(3))
+        )
+        assert best / 1000 <= fastpath.STARTUP_BUDGET_MS
+
+
+class TestFastPath:
+    """Test the fast console entry point."""
+
+    @pytest.mark.parametrize(
+        "argv,expected",
+        [
+            (["generate", "--output", "msg.txt"], "msg.txt"),
+            (["generate", "-o", "msg.txt"], "msg.txt"),
+            (["generate", "--output=msg.txt"], "msg.txt"),
+            (["generate", "--dry-run"], None),
+            (["generate", "--output", "msg.txt", "--no-cache"], None),
+            (["status"], None),
+            ([], None),
+        ],
+    )
+    def test_hook_output(self, argv, expected):
+        """Test that only the hook's command line takes the fast path."""
+        assert fastpath.hook_output(argv) == expected
+
+    def test_generates_message(self, monkeypatch, capsys, tmp_path):
+        """Test that the fast path writes the message like the CLI."""
+        output = tmp_path / "COMMIT_EDITMSG"
+
+        def generate(self, commit_msg_file=None):
+            with open(commit_msg_file, "w") as f:
+                f.write("feat: add x")
+            return "feat: add x"
+
+        monkeypatch.setattr(CommitGenerator, "__init__", lambda self: None)
+        monkeypatch.setattr(CommitGenerator, "generate_commit_message", generate)
+
+        with pytest.raises(SystemExit) as exit_info:
+            fastpath.main(["generate", "--output", str(output)])
+
+        assert exit_info.value.code == 0
+        assert output.read_text() == "feat: add x"
+        assert "feat: add x" in capsys.readouterr().out
+
+    def test_failure_exits_nonzero(self, monkeypatch, capsys):
+        """Test that a failed generation is reported with exit code 1."""
+
+        def fail(self):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(CommitGenerator, "__init__", fail)
+
+        assert fastpath.generate("msg.txt") == 1
+        assert "boom" in capsys.readouterr().out
+
+    def test_other_commands_use_cli(self, monkeypatch):
+        """Test that any other command line is handed to the full CLI."""
+        from ai_commit_generator import cli
+
+        calls = []
+        monkeypatch.setattr(cli, "main", lambda args: calls.append(args))
+
+        fastpath.main(["status", "--verbose"])
+
+        assert calls == [["status", "--verbose"]]
@@ -0,0 +1,194 @@
+"""Tests for API key pools."""
+
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+import requests
+
+from ai_commit_generator.api_clients import APIError, close_sessions, create_client
+from ai_commit_generator.config import Config, ConfigError, SecurityError
+from ai_commit_generator.keypool import (
+    KeyPool,
+    PooledKey,
+    get_key_pool,
+    reset_key_pools,
+)
+from ai_commit_generator.ratelimit import RateLimiter
+
+
+class KeyAdapter(requests.adapters.BaseAdapter):
+    """Transport adapter answering per API key."""
+
+    def __init__(self, statuses: dict):
+        super().__init__()
+        self.statuses = statuses
+        self.keys = []
+
+    def send(self, request, **kwargs):
+        key = request.headers["Authorization"].split(" ", 1)[1]
+        self.keys.append(key)
+        body = {"choices": [{"message": {"content": f"feat: sent with {key}"}}]}
+        response = requests.Response()
+        response.status_code = self.statuses.get(key, 200)
+        response._content = json.dumps(body).encode("utf-8")
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Start each test without shared pools or sessions."""
+    reset_key_pools()
+    close_sessions()
+    yield
+    reset_key_pools()
+    close_sessions()
+
+
+def make_pool(*keys: str, **kwargs) -> KeyPool:
+    """Build a pool of keys without rate limiters."""
+    return KeyPool([PooledKey(key) for key in keys], **kwargs)
+
+
+class TestKeyPool:
+    """Test assigning keys to requests."""
+
+    def test_round_robin_while_healthy(self):
+        """Test that healthy keys share the load evenly."""
+        pool = make_pool("a", "b", "c")
+        chosen = [pool.choose().key for _ in range(6)]
+        assert sorted(chosen[:3]) == ["a", "b", "c"]
+        assert chosen[3:] == chosen[:3]
+
+    def test_throttled_key_rests(self):
+        """Test that a throttled key is skipped during its cooldown."""
+        pool = make_pool("a", "b")
+        first = pool.choose()
+        pool.report(first, 429, retry_after=30)
+
+        assert {pool.choose().key for _ in range(4)} == {"b"}
+
+    def test_least_recently_throttled(self):
+        """Test the fallback to the key whose cooldown ends first."""
+        pool = make_pool("a", "b")
+        keys = {key.key: key for key in pool.keys}
+        pool.report(keys["a"], 429, retry_after=60)
+        pool.report(keys["b"], 429, retry_after=5)
+
+        assert pool.choose().key == "b"
+        assert not pool.has_healthy()
+
+    def test_auth_failure_rests_longer(self):
+        """Test that a rejected key uses the authentication cooldown."""
+        pool = make_pool("a", "b", cooldown=1, auth_cooldown=1000)
+        keys = {key.key: key for key in pool.keys}
+        pool.report(keys["a"], 401)
+        pool.report(keys["b"], 429)
+
+        assert pool.choose().key == "b"
+
+    def test_success_keeps_health(self):
+        """Test that successful responses do not affect key health."""
+        pool = make_pool("a")
+        key = pool.choose()
+        pool.report(key, 200)
+        assert key.cooldown_until == 0.0
+
+    def test_pools_shared_per_key_set(self):
+        """Test that clients of the same keys share one pool."""
+        pool = get_key_pool("groq", ["a", "b"])
+        assert get_key_pool("groq", ["a", "b"]) is pool
+        assert get_key_pool("groq", ["a"]) is not pool
+
+    def test_rate_limiter_per_key(self):
+        """Test that every key gets its own rate limiter."""
+        pool = get_key_pool(
+            "groq", ["a", "b"], rate_limiter_for=lambda key: RateLimiter()
+        )
+        first, second = pool.keys
+        assert first.rate_limiter is not second.rate_limiter
+
+
+class TestClientKeyPool:
+    """Test key pools in the API clients."""
+
+    def _client(self, pool, statuses, max_retries=0):
+        client = create_client(
+            "groq", "unused", "llama3-8b-8192", max_retries=max_retries, key_pool=pool
+        )
+        adapter = KeyAdapter(statuses)
+        client.session.mount("https://", adapter)
+        return client, adapter
+
+    def test_requests_spread_over_keys(self):
+        """Test that consecutive requests use different keys."""
+        client, adapter = self._client(make_pool("a", "b"), {})
+        for _ in range(4):
+            client.generate_commit_message("prompt")
+        assert adapter.keys == ["a", "b", "a", "b"]
+
+    def test_rejected_key_retried_with_another(self):
+        """Test that an authentication failure moves on to a healthy key."""
+        client, adapter = self._client(make_pool("bad", "good"), {"bad": 401}, 2)
+        client.retry_policy.base_delay = 0
+
+        assert client.generate_commit_message("prompt") == "feat: sent with good"
+        assert adapter.keys == ["bad", "good"]
+
+    def test_single_key_auth_failure_not_retried(self):
+        """Test that a rejected single key fails right away."""
+        client, adapter = self._client(make_pool("bad"), {"bad": 401}, 2)
+        with pytest.raises(APIError, match="Invalid API key"):
+            client.generate_commit_message("prompt")
+        assert adapter.keys == ["bad"]
+
+
+class TestConfigKeys:
+    """Test reading key pools from the environment."""
+
+    @pytest.fixture
+    def repo(self, monkeypatch):
+        for name in ("GROQ_API_KEY", "GROQ_API_KEYS", "BOT_GROQ_KEY"):
+            monkeypatch.delenv(name, raising=False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            subprocess.run(["git", "init", "-q"], cwd=temp_dir, check=True)
+            yield Path(temp_dir)
+
+    def test_collects_keys(self, repo, monkeypatch):
+        """Test that all key sources are combined without duplicates."""
+        key_a, key_b, key_c = ("gsk_" + c * 40 for c in "abc")
+        (repo / ".commitgen.yml").write_text(
+            "api:\n  keys:\n    env:\n      groq: [BOT_GROQ_KEY]\n"
+        )
+        monkeypatch.setenv("GROQ_API_KEY", key_a)
+        monkeypatch.setenv("GROQ_API_KEYS", f"{key_a}, {key_b}")
+        monkeypatch.setenv("BOT_GROQ_KEY", key_c)
+
+        config = Config(repo_root=repo)
+        config.validate()
+
+        assert config.api_keys_for("groq") == [key_a, key_b, key_c]
+        assert config.api_key == key_a
+
+    def test_keys_list_alone(self, repo, monkeypatch):
+        """Test that GROQ_API_KEYS works without GROQ_API_KEY."""
+        monkeypatch.setenv("GROQ_API_KEYS", "gsk_" + "a" * 40)
+        assert Config(repo_root=repo).api_key == "gsk_" + "a" * 40
+
+    def test_validates_every_key(self, repo, monkeypatch):
+        """Test that a malformed key in the pool fails validation."""
+        monkeypatch.setenv("GROQ_API_KEYS", "gsk_" + "a" * 40 + ",short")
+        with pytest.raises(SecurityError):
+            Config(repo_root=repo).validate()
+
+    def test_missing_keys(self, repo):
+        """Test the error when no key is configured."""
+        with pytest.raises(ConfigError, match="GROQ_API_KEY"):
+            Config(repo_root=repo).api_key
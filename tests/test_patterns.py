@@ -0,0 +1,87 @@
+"""Tests for the compiled exclude-pattern matcher."""
+
+import fnmatch
+
+import pytest
+
+from ai_commit_generator.config import Config
+from ai_commit_generator.patterns import PathMatcher
+
+PATHS = [
+    "README.md",
+    "yarn.lock",
+    "frontend/yarn.lock",
+    "node_modules/pkg/index.js",
+    "src/node_modules/pkg/index.js",
+    "dist/app.js",
+    "static/app.min.js",
+    "static/app.min.css",
+    ".env",
+    ".env.local",
+    "config/.env.production",
+    "secrets/token",
+    "secrets/nested/token",
+    "certs/server.pem",
+    "a[1].txt",
+    "file?.txt",
+    "src/app.py",
+]
+
+FNMATCH_PATTERNS = [
+    "*.lock",
+    "node_modules/*",
+    "*.env*",
+    "secrets/*",
+    "*.min.?s",
+    "a[0-9]*",
+    "a[!0-9]*",
+    "[",
+    "file[?].txt",
+    "src/*.py",
+]
+
+
+class TestPathMatcher:
+    """Test pattern compilation and matching."""
+
+    @pytest.mark.parametrize("pattern", FNMATCH_PATTERNS)
+    def test_matches_fnmatch_semantics(self, pattern):
+        """Test that plain patterns behave exactly like fnmatch."""
+        matcher = PathMatcher([pattern])
+        for path in PATHS:
+            assert matcher.matches(path) == fnmatch.fnmatch(path, pattern), path
+
+    def test_default_patterns_match_fnmatch(self):
+        """Test the combined default pattern list against fnmatch."""
+        patterns = Config.DEFAULT_CONFIG["processing"]["exclude_patterns"]
+        matcher = PathMatcher(patterns)
+        for path in PATHS:
+            expected = any(fnmatch.fnmatch(path, p) for p in patterns)
+            assert matcher.matches(path) == expected, path
+
+    def test_double_star_directories(self):
+        """Test that **/ matches zero or more directories."""
+        matcher = PathMatcher(["**/fixtures/*.json", "docs/**"])
+
+        assert matcher.matches("fixtures/a.json")
+        assert matcher.matches("tests/unit/fixtures/a.json")
+        assert matcher.matches("docs/guide/index.md")
+        assert not matcher.matches("fixtures.json")
+        assert not matcher.matches("src/docs.py")
+
+    def test_negation_last_match_wins(self):
+        """Test that ! patterns re-include earlier exclusions."""
+        matcher = PathMatcher(["dist/*", "!dist/keep.js", "dist/keep.js.map"])
+
+        assert matcher.matches("dist/app.js")
+        assert not matcher.matches("dist/keep.js")
+        assert matcher.matches("dist/keep.js.map")
+        assert not matcher.matches("src/app.js")
+        assert matcher.has_negation
+
+    def test_empty_matcher(self):
+        """Test that no patterns match nothing."""
+        matcher = PathMatcher([])
+
+        assert not matcher
+        assert not matcher.matches("anything")
@@ -0,0 +1,212 @@
+"""Tests for client-side rate limiting."""
+
+import json
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from ai_commit_generator.api_clients import APIError, close_sessions, create_client
+from ai_commit_generator.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    get_limiter,
+    parse_reset,
+    reset_limiters,
+)
+
+
+class HeaderAdapter(requests.adapters.BaseAdapter):
+    """Transport adapter answering with fixed status codes and headers."""
+
+    def __init__(self, responses: list):
+        super().__init__()
+        self.responses = list(responses)
+
+    def send(self, request, **kwargs):
+        status, headers = self.responses.pop(0)
+        body = {"choices": [{"message": {"content": "feat: add x"}}]}
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = json.dumps(body).encode("utf-8")
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Start each test without shared limiters or sessions."""
+    reset_limiters()
+    close_sessions()
+    yield
+    reset_limiters()
+    close_sessions()
+
+
+def take_shared(state_file: str, count: int) -> None:
+    """Reserve requests from a shared limiter in another process."""
+    limiter = RateLimiter(requests_per_minute=60, state_file=Path(state_file))
+    for _ in range(count):
+        limiter.reserve(0)
+
+
+class TestParseReset:
+    """Test parsing rate-limit reset headers."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("7.66s", 7.66),
+            ("2m59.56s", 179.56),
+            ("1h2m", 3720),
+            ("120ms", 0.12),
+            ("30", 30),
+            (None, None),
+            ("soon", None),
+        ],
+    )
+    def test_durations(self, value, expected):
+        """Test durations in the formats providers send."""
+        result = parse_reset(value, now=1000.0)
+        assert result == (None if expected is None else pytest.approx(expected))
+
+    def test_timestamps(self):
+        """Test Unix timestamps in seconds and milliseconds."""
+        now = 1700000000.0
+        assert parse_reset("1700000010", now) == pytest.approx(10)
+        assert parse_reset("1700000010000", now) == pytest.approx(10)
+
+
+class TestTokenBucket:
+    """Test the quota bucket."""
+
+    def test_waits_once_empty(self):
+        """Test that requests beyond the quota wait for the refill."""
+        bucket = TokenBucket(per_minute=60, now=0.0)
+        waits = [bucket.take(1, now=0.0) for _ in range(62)]
+
+        assert waits[:60] == [0.0] * 60
+        assert waits[60] == pytest.approx(1.0)
+        assert waits[61] == pytest.approx(2.0)
+
+    def test_refills_over_time(self):
+        """Test that quota comes back at the configured rate."""
+        bucket = TokenBucket(per_minute=60, now=0.0)
+        for _ in range(60):
+            bucket.take(1, now=0.0)
+        assert bucket.take(1, now=5.0) == 0.0
+
+    def test_learned_quota(self):
+        """Test that a reported quota is respected without configured limits."""
+        bucket = TokenBucket(now=0.0)
+        assert bucket.take(1000, now=0.0) == 0.0
+
+        bucket.learn(remaining=2, reset=30.0, now=0.0)
+        assert bucket.take(1, now=1.0) == 0.0
+        assert bucket.take(1, now=1.0) == 0.0
+        assert bucket.take(1, now=1.0) == pytest.approx(29.0)
+        # The provider's window has reset
+        assert bucket.take(1, now=31.0) == 0.0
+
+
+class TestRateLimiter:
+    """Test request and token quotas together."""
+
+    def test_token_quota(self):
+        """Test that large prompts are limited by the token quota."""
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6000)
+        assert limiter.reserve(5000) == 0.0
+        assert limiter.reserve(5000) == pytest.approx(40.0, abs=0.1)
+
+    def test_refuses_waits_beyond_budget(self):
+        """Test that a wait beyond the budget reserves nothing."""
+        limiter = RateLimiter(requests_per_minute=1)
+        limiter.reserve(0)
+        assert limiter.reserve(0, max_wait=5) is None
+        assert limiter.reserve(0) == pytest.approx(60.0, abs=0.1)
+
+    def test_penalty_after_429(self):
+        """Test that Retry-After holds back all requests."""
+        limiter = RateLimiter()
+        limiter.penalize(3.0)
+        assert limiter.reserve(0) == pytest.approx(3.0, abs=0.1)
+
+    def test_observes_headers(self):
+        """Test learning Groq style request and token headers."""
+        limiter = RateLimiter()
+        limiter.observe(
+            requests.structures.CaseInsensitiveDict(
+                {
+                    "X-RateLimit-Remaining-Requests": "0",
+                    "X-RateLimit-Reset-Requests": "2.5s",
+                    "X-RateLimit-Remaining-Tokens": "5000",
+                    "X-RateLimit-Reset-Tokens": "1m",
+                }
+            )
+        )
+        assert limiter.reserve(100) == pytest.approx(2.5, abs=0.1)
+        assert limiter.tokens.remaining == 4900
+
+    def test_shared_between_processes(self):
+        """Test that a state file shares the quota across processes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_file = Path(temp_dir) / "state.json"
+            process = multiprocessing.get_context("spawn").Process(
+                target=take_shared, args=(str(state_file), 60)
+            )
+            process.start()
+            process.join(30)
+
+            limiter = RateLimiter(requests_per_minute=60, state_file=state_file)
+            assert limiter.reserve(0) > 0.5
+
+    def test_limiters_shared_per_key(self):
+        """Test that clients of the same key share one limiter."""
+        first = get_limiter("groq", "key-a", requests_per_minute=30)
+        assert get_limiter("groq", "key-a") is first
+        assert get_limiter("groq", "key-b") is not first
+        assert get_limiter("cohere", "key-a") is not first
+
+
+class TestClientThrottling:
+    """Test rate limiting in the API clients."""
+
+    def _client(self, responses, limiter):
+        client = create_client(
+            "groq", "key", "llama3-8b-8192", max_retries=0, rate_limiter=limiter
+        )
+        client.session.mount("https://", HeaderAdapter(responses))
+        return client
+
+    def test_learns_from_responses(self):
+        """Test that response headers update the shared limiter."""
+        limiter = RateLimiter()
+        headers = {
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "20s",
+        }
+        client = self._client([(200, headers)], limiter)
+
+        assert client.generate_commit_message("prompt") == "feat: add x"
+        assert limiter.requests.remaining == 0
+        with pytest.raises(APIError, match="quota"):
+            client.generate_commit_message("prompt", timeout=5)
+
+    def test_429_blocks_further_requests(self):
+        """Test that a rejected request holds back the next one."""
+        limiter = RateLimiter()
+        client = self._client([(429, {"Retry-After": "0.3"}), (200, {})], limiter)
+
+        with pytest.raises(APIError):
+            client.generate_commit_message("prompt")
+        start = time.monotonic()
+        assert client.generate_commit_message("prompt") == "feat: add x"
+        assert time.monotonic() - start >= 0.2
@@ -0,0 +1,111 @@
+"""Tests for the retry engine."""
+
+import pytest
+
+from ai_commit_generator.api_clients import APIError
+from ai_commit_generator.retry import (
+    RetryPolicy,
+    call_with_retry,
+    parse_retry_after,
+)
+
+
+def _retryable(error):
+    return isinstance(error, APIError) and error.retryable
+
+
+class TestCallWithRetry:
+    """Test retrying with backoff, Retry-After and deadlines."""
+
+    def test_retries_until_success(self):
+        """Test that retryable errors are retried."""
+        calls = []
+        sleeps = []
+
+        def func(remaining):
+            calls.append(remaining)
+            if len(calls) < 3:
+                raise APIError("server error", 503, retryable=True)
+            return "ok"
+
+        policy = RetryPolicy(max_retries=3, base_delay=1, deadline=None)
+        result = call_with_retry(func, policy, _retryable, sleep=sleeps.append)
+
+        assert result == "ok"
+        assert len(calls) == 3
+        assert len(sleeps) == 2
+        assert all(0 <= delay <= 2 for delay in sleeps)
+
+    def test_non_retryable_error_raised_immediately(self):
+        """Test that errors such as an invalid key are not retried."""
+        attempts = []
+
+        def func(remaining):
+            raise APIError("Invalid API key", 401)
+
+        with pytest.raises(APIError):
+            call_with_retry(
+                func,
+                RetryPolicy(max_retries=3),
+                _retryable,
+                on_attempt=attempts.append,
+                sleep=lambda delay: None,
+            )
+
+        assert len(attempts) == 1
+        assert attempts[0].delay is None
+
+    def test_max_retries_bounds_attempts(self):
+        """Test that a persistent outage makes at most max_retries + 1 calls."""
+        attempts = []
+
+        def func(remaining):
+            raise APIError("server error", 500, retryable=True)
+
+        with pytest.raises(APIError):
+            call_with_retry(
+                func,
+                RetryPolicy(max_retries=2, deadline=None),
+                _retryable,
+                on_attempt=attempts.append,
+                sleep=lambda delay: None,
+            )
+
+        assert [a.number for a in attempts] == [1, 2, 3]
+
+    def test_retry_after_honoured(self):
+        """Test that Retry-After sets the minimum delay."""
+        sleeps = []
+        calls = []
+
+        def func(remaining):
+            calls.append(1)
+            if len(calls) == 1:
+                raise APIError("rate limited", 429, retry_after=5, retryable=True)
+            return "ok"
+
+        policy = RetryPolicy(max_retries=1, base_delay=0.1, deadline=None)
+        call_with_retry(func, policy, _retryable, sleep=sleeps.append)
+
+        assert sleeps == [5]
+
+    def test_deadline_stops_retries(self):
+        """Test that a wait longer than the remaining deadline is not taken."""
+
+        def func(remaining):
+            raise APIError("rate limited", 429, retry_after=60, retryable=True)
+
+        with pytest.raises(APIError):
+            call_with_retry(
+                func,
+                RetryPolicy(max_retries=3, deadline=10),
+                _retryable,
+                sleep=lambda delay: pytest.fail("should not sleep"),
+            )
+
+    def test_parse_retry_after(self):
+        """Test parsing seconds and HTTP dates."""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
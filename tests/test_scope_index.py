@@ -0,0 +1,187 @@
+"""Tests for the scope index built from commit history."""
+
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from ai_commit_generator.config import Config
+from ai_commit_generator.core import CommitGenerator
+from ai_commit_generator.heuristics import FileChange, classify
+from ai_commit_generator.scope_index import ScopeIndex, parse_log, path_prefixes
+
+
+def git(repo_dir: Path, *args: str) -> str:
+    """Run git in a test repository."""
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def commit(repo_dir: Path, subject: str, *paths: str) -> None:
+    """Commit changes to some files."""
+    for path in paths:
+        file_path = repo_dir / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "a") as f:
+            f.write(f"{subject}\n")
+    git(repo_dir, "add", *paths)
+    git(repo_dir, "commit", "-q", "-m", subject)
+
+
+@pytest.fixture
+def repo():
+    """Repository whose auth and ui directories have consistent scopes."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_dir = Path(temp_dir)
+        git(repo_dir, "init", "-q")
+        for i in range(3):
+            commit(repo_dir, f"feat(auth): add check {i}", f"src/auth/a{i}.py")
+            commit(repo_dir, f"fix(ui): fix button {i}", "web/ui/button.js")
+        commit(repo_dir, "chore: update files", "src/auth/a0.py")
+        yield repo_dir
+
+
+def make_index(repo_dir: Path, **kwargs) -> ScopeIndex:
+    index_file = repo_dir / ".git" / "smart-commits-ai" / "scopes.json"
+    return ScopeIndex(index_file, repo_dir, **kwargs)
+
+
+class TestParsing:
+    """Test path prefixes and log parsing."""
+
+    def test_path_prefixes(self):
+        """Test that prefixes stop at the maximum depth."""
+        assert path_prefixes("a/b/c/d/e.py") == ["a/", "a/b/", "a/b/c/"]
+        assert path_prefixes("setup.py") == []
+
+    def test_parse_log(self):
+        """Test splitting log output into subjects and paths."""
+        lines = ["\x00feat(a): x\n", "\n", "a/x.py\n", "\x00docs: y\n", "README\n"]
+        assert list(parse_log(lines)) == [
+            ("feat(a): x", ["a/x.py"]),
+            ("docs: y", ["README"]),
+        ]
+
+
+class TestScopeIndex:
+    """Test building and querying the index."""
+
+    def test_likely_scope(self, repo):
+        """Test that directories map to the scopes used for them."""
+        index = make_index(repo)
+        assert index.update() == 7
+
+        assert index.likely_scope(["src/auth/new.py"]) == ("auth", 1.0)
+        assert index.likely_scope(["web/ui/form.js"]) == ("ui", 1.0)
+        assert index.likely_scope(["src/auth/x.py", "web/ui/y.js"])[1] == 0.5
+        assert index.likely_scope(["other/file.py"]) is None
+
+    def test_min_samples(self, repo):
+        """Test that directories with too few scoped commits are ignored."""
+        index = make_index(repo, min_samples=4)
+        index.update()
+        assert index.likely_scope(["src/auth/new.py"]) is None
+
+    def test_incremental_update(self, repo):
+        """Test that only new commits are read, also after reloading."""
+        make_index(repo).update()
+        commit(repo, "feat(api): add endpoint", "src/api/routes.py")
+
+        index = make_index(repo)
+        assert index.update() == 1
+        assert index.update() == 0
+        assert index.prefixes["src/"] == {"auth": 3, "api": 1}
+
+    def test_rewritten_history_rebuilds(self, repo):
+        """Test that the index starts over when its commit is gone."""
+        index = make_index(repo)
+        index.update()
+        git(repo, "reset", "-q", "--hard", "HEAD~3")
+        commit(repo, "feat(db): add table", "db/schema.sql")
+
+        assert index.update() == 5
+        assert index.prefixes["web/"] == {"ui": 2}
+
+    def test_max_commits(self, repo):
+        """Test that a first build reads only the newest commits."""
+        index = make_index(repo, max_commits=2)
+        assert index.update() == 2
+
+    def test_empty_repository(self):
+        """Test that a repository without commits has an empty index."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            git(Path(temp_dir), "init", "-q")
+            index = make_index(Path(temp_dir))
+            assert index.update() == 0
+            assert index.likely_scope(["src/a.py"]) is None
+
+
+class PromptClient:
+    """API client stand-in recording prompts."""
+
+    provider = "groq"
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_commit_message(self, prompt, timeout=None, stop=None):
+        self.prompts.append(prompt)
+        return "feat(auth): add login"
+
+
+class TestGeneratorScopes:
+    """Test inferred scopes in generation."""
+
+    def test_scope_hint_in_prompt(self, repo, monkeypatch):
+        """Test that the likely scope is suggested to the model."""
+        monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+        client = PromptClient()
+        monkeypatch.setattr(CommitGenerator, "_get_client", lambda self: client)
+        (repo / ".commitgen.yml").write_text(
+            yaml.dump({"scope_index": {"enabled": True}})
+        )
+        (repo / "src" / "auth" / "login.py").write_text("login\n")
+        git(repo, "add", "src/auth/login.py")
+
+        generator = CommitGenerator(Config(repo_root=repo), use_cache=False)
+        assert generator.generate_commit_message() == "feat(auth): add login"
+        assert 'used the scope "auth"' in client.prompts[0]
+
+    def test_scope_computed_once(self, repo, monkeypatch):
+        """Test that the local message and the prompt share one scope lookup."""
+        monkeypatch.setenv("GROQ_API_KEY", "gsk_" + "x" * 40)
+        client = PromptClient()
+        monkeypatch.setattr(CommitGenerator, "_get_client", lambda self: client)
+        calls = []
+        likely_scope = CommitGenerator._likely_scope
+        monkeypatch.setattr(
+            CommitGenerator,
+            "_likely_scope",
+            lambda self, *args: calls.append(args) or likely_scope(self, *args),
+        )
+        (repo / ".commitgen.yml").write_text(
+            yaml.dump(
+                {"scope_index": {"enabled": True}, "heuristics": {"mode": "fallback"}}
+            )
+        )
+        (repo / "src" / "auth" / "login.py").write_text("login\n")
+        git(repo, "add", "src/auth/login.py")
+
+        generator = CommitGenerator(Config(repo_root=repo), use_cache=False)
+        assert generator.generate_commit_message() == "feat(auth): add login"
+        assert 'used the scope "auth"' in client.prompts[0]
+        assert len(calls) == 1
+
+    def test_scope_in_local_message(self):
+        """Test that local messages take the inferred scope."""
+        suggestion = classify(
+            [FileChange("M", "src/auth/README.md")], ["docs"], [], scope="auth"
+        )
+        assert suggestion.message == "docs(auth): update README.md"
@@ -0,0 +1,80 @@
+"""Tests for map-reduce diff summarization."""
+
+import threading
+import time
+
+from ai_commit_generator.api_clients import APIError
+from ai_commit_generator.summarize import DiffSummarizer, split_diff
+
+
+def make_file_diff(path: str, hunks: int = 1, lines: int = 3) -> str:
+    """Build a small diff for one file."""
+    text = f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+    for i in range(hunks):
+        text += f"@@ -{i * 10},3 +{i * 10},3 @@\n"
+        text += "".join(f"+line {i}.{j}\n" for j in range(lines))
+    return text
+
+
+class FakeClient:
+    """API client stand-in that records concurrency."""
+
+    def __init__(self, fail_for: str = ""):
+        self.fail_for = fail_for
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate_commit_message(self, prompt: str, timeout=None, stop=None) -> str:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if self.fail_for and self.fail_for in prompt:
+            raise APIError("boom")
+        return "updated things\nextra explanation"
+
+
+class TestSummarize:
+    """Test diff splitting and concurrent summarization."""
+
+    def test_split_per_file(self):
+        """Test that each file becomes its own chunk."""
+        diff = make_file_diff("a.py") + make_file_diff("b.py")
+        chunks = split_diff(diff, 1000)
+
+        assert [chunk.path for chunk in chunks] == ["a.py", "b.py"]
+        assert "".join(chunk.text for chunk in chunks) == diff
+
+    def test_split_large_file_at_hunks(self):
+        """Test that oversized files are split at hunk boundaries."""
+        diff = make_file_diff("big.py", hunks=4, lines=5)
+        chunks = split_diff(diff, 150)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert chunk.path == "big.py"
+            assert chunk.text.startswith("diff --git a/big.py b/big.py")
+        assert sum(chunk.added for chunk in chunks) == 20
+
+    def test_summarize_runs_concurrently(self):
+        """Test that chunks are summarized within the worker budget."""
+        diff = "".join(make_file_diff(f"f{i}.py", lines=20) for i in range(6))
+        client = FakeClient()
+        summary = DiffSummarizer(client, max_workers=3, chunk_size=400).summarize(diff)
+
+        assert client.peak == 3
+        assert summary.count("updated things") == 6
+        assert "extra explanation" not in summary
+
+    def test_failed_chunk_falls_back_to_stats(self):
+        """Test that a failed summary request still lists the file."""
+        diff = make_file_diff("ok.py", lines=20) + make_file_diff("bad.py", lines=20)
+        summary = DiffSummarizer(
+            FakeClient(fail_for="bad.py"), chunk_size=400
+        ).summarize(diff)
+
+        assert "- ok.py: updated things" in summary
+        assert "- bad.py: changed (+20/-0 lines)" in summary
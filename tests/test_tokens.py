@@ -0,0 +1,70 @@
+"""Tests for token estimation and token-based prompt budgets."""
+
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from ai_commit_generator.config import Config
+from ai_commit_generator.core import CommitGenerator
+from ai_commit_generator.tokens import (
+    context_window,
+    estimate_tokens,
+    model_family,
+)
+
+
+class TestTokens:
+    """Test model families, context windows and token budgets."""
+
+    def test_model_family(self):
+        """Test family detection with and without vendor prefixes."""
+        assert model_family("llama3-8b-8192") == "llama"
+        assert model_family("meta-llama/llama-3.1-70b-instruct") == "llama"
+        assert model_family("mistralai/mixtral-8x7b-instruct") == "mixtral"
+        assert model_family("command-r-plus") == "command"
+        assert model_family("unknown-model") == ""
+
+    def test_context_window(self):
+        """Test known, suffixed, overridden and unknown models."""
+        assert context_window("mixtral-8x7b-32768") == 32768
+        assert context_window("llama3-8b-8192") == 8192
+        assert context_window("llama-guard-3-8b-16384") == 16384
+        assert context_window("custom", {"custom": 65536}) == 65536
+        assert context_window("custom") == 4096
+
+    def test_estimate_tokens(self):
+        """Test that estimates scale with text length."""
+        assert estimate_tokens("", "llama3-8b-8192") == 0
+        assert estimate_tokens("x" * 350, "llama3-8b-8192") == 100
+
+    def budget(self, model, **processing):
+        """Get the diff budget of a model in tokens mode."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            (repo_dir / ".git").mkdir()
+            with open(repo_dir / ".commitgen.yml", "w") as f:
+                yaml.dump(
+                    {
+                        "api": {
+                            "models": {"groq": {"default": model}},
+                            "context_windows": {"huge-model": 1_000_000},
+                        },
+                        "processing": {"budget_unit": "tokens", **processing},
+                    },
+                    f,
+                )
+            return CommitGenerator(Config(repo_root=repo_dir))._prompt_diff_budget()
+
+    def test_budget_follows_context_window(self):
+        """Test that larger context windows get larger diff budgets."""
+        small = self.budget("custom", max_diff_size=50000)
+        large = self.budget("llama3-8b-8192", max_diff_size=50000)
+
+        assert 0 < small < 4096 * 3.5
+        assert large > 1.8 * small
+
+    def test_budget_capped_by_max_diff_size(self):
+        """Test that a huge context window never lifts the security cap."""
+        assert self.budget("huge-model", max_diff_size=50000) == 50000
+        assert self.budget("llama3-8b-8192") == 4000